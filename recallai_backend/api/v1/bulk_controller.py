@@ -1,65 +1,127 @@
-from typing import List
+from typing import List, Tuple
 from fastapi import APIRouter, UploadFile, File, Depends
-from openai import OpenAI
-import base64, mimetypes
+from fastapi.concurrency import run_in_threadpool
+import hashlib, mimetypes, os, tempfile
 
 from recallai_backend.di.request_container import (
     RequestContainer,
     get_request_container,
 )
-from recallai_backend.utils.file_extractor import extract_text_local
-from recallai_backend.contracts.note_dtos import NoteCreateDTO, NoteResponseDTO
+from recallai_backend.core.config import settings
+from recallai_backend.utils.extraction_pool import extract_files
+from recallai_backend.utils.file_extractor import (
+    HASH_READ_BYTES,
+    extractor_id,
+    is_image,
+    iter_compressed_text,
+)
+from recallai_backend.contracts.note_dtos import (
+    BulkUploadErrorDTO,
+    BulkUploadResponseDTO,
+    NoteCreateDTO,
+    NoteResponseDTO,
+)
 
 router = APIRouter(prefix="/notes", tags=["notes"])
-client = OpenAI()
-
-IMAGE_EXTS = ["png", "jpg", "jpeg", "gif", "webp"]
 
 
-def is_image(filename: str, content_type: str) -> bool:
-    ext = filename.lower().split(".")[-1]
-    return ext in IMAGE_EXTS or (content_type and content_type.startswith("image/"))
+def _spool_to_disk(file: UploadFile, path: str) -> str:
+    """Small uploads live in memory; workers in another process need a path. Returns the sha256."""
+    digest = hashlib.sha256()
+    file.file.seek(0)
+    with open(path, "wb") as out:
+        while chunk := file.file.read(HASH_READ_BYTES):
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest()
 
 
-@router.post("/bulk", response_model=List[NoteResponseDTO])
+@router.post("/bulk", response_model=BulkUploadResponseDTO)
 async def upload_bulk_notes(
     user_id: int,
     files: List[UploadFile] = File(...),
     c: RequestContainer = Depends(get_request_container),
 ):
     service = c.notes()
-    saved_notes: List[NoteResponseDTO] = []
+    cache = c.extraction_cache()
+    to_create: List[NoteCreateDTO] = []
+    created: List[NoteResponseDTO] = []
+    # Files that yield no notes are reported, not dropped: the others are
+    # still ingested, so failing the whole request would misstate it
+    errors: List[BulkUploadErrorDTO] = []
 
-    for file in files:
-        filename = file.filename or "file"
-        mime = file.content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
-        file_bytes = await file.read()
+    with tempfile.TemporaryDirectory(prefix="bulk-") as tmp:
+        documents: List[Tuple[str, str, str]] = []
+        images: List[Tuple[UploadFile, str, str]] = []
 
-        if is_image(filename, mime):
-            b64 = base64.b64encode(file_bytes).decode()
-            image_url = f"data:{mime};base64,{b64}"
+        for i, file in enumerate(files):
+            filename = file.filename or "file"
+            mime = file.content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
 
-            completion = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "Extract text from this image. Output raw text."},
-                    {"role": "user", "content": [{"type": "input_image", "image_url": image_url}]},
-                ],
-            )
-            extracted_text = completion.choices[0].message.content
-        else:
-            extracted_text = extract_text_local(file_bytes, filename)
+            if is_image(filename, mime):
+                images.append((file, filename, mime))
+                continue
+
+            path = os.path.join(tmp, f"upload-{i}{os.path.splitext(filename)[1]}")
+            content_hash = await run_in_threadpool(_spool_to_disk, file, path)
+            documents.append((path, filename, content_hash))
 
+        # Text extracted before (same bytes, same extractor) is read back
+        # from the cache instead of being parsed again
+        keys = [(h, extractor_id(name, settings.pdf_backend)) for _, name, h in documents]
+        cached = await run_in_threadpool(cache.lookup, keys) if documents else {}
+        misses = []
+        for (path, filename, _), key in zip(documents, keys):
+            if key in cached:
+                created += await run_in_threadpool(
+                    service.ingest_document,
+                    user_id,
+                    filename,
+                    iter_compressed_text(cached[key]),
+                    "bulk_upload",
+                )
+            else:
+                misses.append((path, filename, key))
+
+        # The rest are parsed in the process pool, all at once; each one is
+        # chunked and embedded as soon as its text is ready, and its text is
+        # cached on the way. Ingestion stays sequential because it shares
+        # this request's DB session.
+        if misses:
+            async for result in extract_files(
+                [(path, filename) for path, filename, _ in misses],
+                tmp,
+                timeout=settings.extraction_timeout_seconds,
+                workers=settings.extraction_workers or None,
+                pdf_backend=settings.pdf_backend,
+            ):
+                if result.error:
+                    errors.append(BulkUploadErrorDTO(filename=result.filename, error=result.error))
+                    continue
+                created += await run_in_threadpool(
+                    service.ingest_document,
+                    user_id,
+                    result.filename,
+                    cache.store(misses[result.index][2], result.iter_text()),
+                    "bulk_upload",
+                )
+
+    # Several images per OCR request, requests concurrent (ocr_images)
+    texts = await cache.ocr_many([(await file.read(), mime) for file, _, mime in images])
+    for (_, filename, _), extracted_text in zip(images, texts):
         if extracted_text and extracted_text.strip():
-            saved_notes.append(
-                service.create_note(
-                    NoteCreateDTO(
-                        user_id=user_id,
-                        title=filename,
-                        content=extracted_text,
-                        source="bulk_upload",
-                    )
+            to_create.append(
+                NoteCreateDTO(
+                    user_id=user_id,
+                    title=filename,
+                    content=extracted_text,
+                    source="bulk_upload",
                 )
             )
+        else:
+            errors.append(BulkUploadErrorDTO(filename=filename, error="no text recognized in image"))
 
-    return saved_notes
+    # All image texts embedded together in batched requests
+    if to_create:
+        created += await run_in_threadpool(service.create_notes, to_create)
+    return BulkUploadResponseDTO(notes=created, errors=errors)
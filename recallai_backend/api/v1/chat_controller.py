@@ -1,5 +1,7 @@
 from fastapi import APIRouter, UploadFile, File, Form, Depends
-from typing import List
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Tuple
+import json
 
 from recallai_backend.di.request_container import (
     RequestContainer,
@@ -11,12 +13,48 @@ router = APIRouter(prefix="/chat", tags=["chat"])
 
 
 @router.post("", response_model=ChatResponseDTO)
-def ask_chat(
+async def ask_chat(
     dto: ChatRequestDTO,
     c: RequestContainer = Depends(get_request_container)
 ):
     service = c.chat()
-    return service.ask(dto)
+    return await service.ask(dto)
+
+
+def _sse(events: AsyncIterator[Tuple[str, dict]]) -> AsyncIterator[str]:
+    async def frames():
+        try:
+            async for event, data in events:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            # Client gone → close the service stream now, not at GC time
+            await events.aclose()
+    return frames()
+
+
+@router.post("/stream")
+async def ask_chat_stream(
+    dto: ChatRequestDTO,
+    c: RequestContainer = Depends(get_request_container)
+):
+    """
+    Server-sent events: `sources`, then `delta`* and finally `done`
+    (or `error`).
+
+    Under Mangum (API Gateway + Lambda) the response is buffered and sent
+    as one body, so clients get the same event stream all at once; true
+    incremental delivery needs a Lambda function URL in RESPONSE_STREAM
+    mode (e.g. via Lambda Web Adapter) or a non-Lambda deployment.
+    """
+    service = c.chat()
+    return StreamingResponse(
+        _sse(service.ask_stream(dto)),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",   # don't let proxies hold chunks back
+        },
+    )
 
 
 @router.post("/upload", response_model=ChatResponseDTO)
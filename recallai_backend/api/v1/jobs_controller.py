@@ -0,0 +1,44 @@
+from typing import List
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
+import mimetypes
+
+from recallai_backend.di.request_container import (
+    RequestContainer,
+    get_request_container,
+)
+from recallai_backend.contracts.job_dtos import IngestionJobDTO
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _stored_files(files: List[UploadFile]):
+    # One upload in memory at a time: each is flushed before the next is read
+    for file in files:
+        filename = file.filename or "file"
+        mime = file.content_type or mimetypes.guess_type(filename)[0]
+        file.file.seek(0)
+        yield filename, mime, file.file.read()
+
+
+@router.post("", response_model=IngestionJobDTO, status_code=status.HTTP_202_ACCEPTED)
+def submit_ingestion_job(
+    user_id: int,
+    files: List[UploadFile] = File(...),
+    c: RequestContainer = Depends(get_request_container),
+):
+    """
+    Store the uploads and return at once; IngestionWorker extracts, chunks
+    and embeds them in the background. Poll GET /jobs/{id} for progress.
+    """
+    return c.jobs().submit(user_id, _stored_files(files), source="bulk_upload")
+
+
+@router.get("/{job_id}", response_model=IngestionJobDTO)
+def get_ingestion_job(
+    job_id: int,
+    c: RequestContainer = Depends(get_request_container),
+):
+    job = c.jobs().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
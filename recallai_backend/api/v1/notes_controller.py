@@ -12,6 +12,7 @@ from recallai_backend.contracts.note_dtos import (
     NoteDeleteDTO,
     NoteSearchDTO,
     NoteResponseDTO,
+    NoteHitDTO,
 )
 
 router = APIRouter(prefix="/notes", tags=["notes"])
@@ -42,6 +43,14 @@ def delete_note(dto: NoteDeleteDTO, c: RequestContainer = Depends(get_request_co
     return c.notes().delete_note(dto.note_id)
 
 
-@router.post("/search")
+@router.post("/search", response_model=list[NoteHitDTO])
 def search_notes(dto: NoteSearchDTO, c: RequestContainer = Depends(get_request_container)):
-    return c.notes().search_notes(dto.vector, dto.top_k)
+    return c.notes().search_notes(
+        dto.vector,
+        dto.top_k,
+        user_id=dto.user_id,
+        source=dto.source,
+        created_after=dto.created_after,
+        created_before=dto.created_before,
+        query_text=dto.query,
+    )
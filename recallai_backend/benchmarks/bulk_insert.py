@@ -0,0 +1,126 @@
+"""
+Throughput benchmark: notes + embeddings written per second.
+
+Runs against the configured DATABASE_URL (schema and migrations applied)
+and compares, batch by batch as ingestion writes them:
+
+    per-row   create_note (INSERT + flush) and save_embedding
+              (INSERT ... ON CONFLICT ... RETURNING) for every chunk:
+              two round trips per row
+    bulk      NoteRepository.bulk_create_with_embeddings: id allocation,
+              one multi-row INSERT, one binary COPY, per batch
+
+Each batch is committed, as ingestion does. Vectors are random 1536-dim
+float32; no OpenAI calls are made. A throwaway user is created and
+removed (with all of its rows) afterwards.
+
+    python -m recallai_backend.benchmarks.bulk_insert
+    python -m recallai_backend.benchmarks.bulk_insert --rows 10000 --batch 256 --baseline-rows 2000
+"""
+
+import argparse
+import time
+import uuid
+
+import numpy as np
+from sqlalchemy import text
+
+from recallai_backend.core.config import settings
+from recallai_backend.core.db import SessionLocal
+from recallai_backend.domain.models.note import NewNote
+from recallai_backend.domain.repositories.note_repository import NoteRepository
+
+DIM = 1536
+CHUNK = "Benchmark chunk {n}: " + "the quick brown fox jumps over the lazy dog. " * 40
+
+
+def create_user() -> int:
+    with SessionLocal() as db:
+        user_id = db.execute(
+            text("INSERT INTO users (email, password) VALUES (:email, 'x') RETURNING id"),
+            {"email": f"bulk-insert-{uuid.uuid4().hex}@example.invalid"},
+        ).scalar_one()
+        db.commit()
+    return user_id
+
+
+def drop_user(user_id: int) -> None:
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM notes WHERE user_id = :u"), {"u": user_id})
+        db.execute(text("DELETE FROM users WHERE id = :u"), {"u": user_id})
+        db.commit()
+
+
+def make_batches(rows: int, batch: int, rng: np.random.Generator):
+    for start in range(0, rows, batch):
+        n = min(batch, rows - start)
+        vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+        yield [
+            NewNote(title=f"bench (part {start + i + 1})", content=CHUNK.format(n=start + i), source="bench", vector=v)
+            for i, v in enumerate(vectors)
+        ]
+
+
+# ─────────────────────────────────────────────
+# Runs
+# ─────────────────────────────────────────────
+def time_per_row(user_id: int, rows: int, batch: int, rng: np.random.Generator) -> float:
+    elapsed = 0.0
+    with SessionLocal() as db:
+        repo = NoteRepository(db)
+        for notes in make_batches(rows, batch, rng):
+            started = time.perf_counter()
+            for n in notes:
+                note = repo.create_note(user_id, n.title, n.content, n.source)
+                repo.save_embedding(note.id, n.vector, n.content_hash)
+            db.commit()
+            elapsed += time.perf_counter() - started
+            db.expunge_all()
+    return elapsed
+
+
+def time_bulk(user_id: int, rows: int, batch: int, rng: np.random.Generator) -> float:
+    elapsed = 0.0
+    with SessionLocal() as db:
+        repo = NoteRepository(db)
+        for notes in make_batches(rows, batch, rng):
+            started = time.perf_counter()
+            repo.bulk_create_with_embeddings(user_id, notes)
+            db.commit()
+            elapsed += time.perf_counter() - started
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000, help="chunks written by the bulk path")
+    parser.add_argument("--baseline-rows", type=int, default=1_000, help="chunks written by the per-row path")
+    parser.add_argument("--batch", type=int, default=settings.ingest_batch_chunks, help="chunks per commit")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    user_id = create_user()
+    try:
+        print(f"batch={args.batch} dim={DIM}\n")
+        print(f"{'path':<10}{'rows':>8}{'seconds':>10}{'rows/s':>10}")
+
+        results = []
+        for name, runner, rows in (
+            ("per-row", time_per_row, args.baseline_rows),
+            ("bulk", time_bulk, args.rows),
+        ):
+            if rows <= 0:
+                continue
+            seconds = runner(user_id, rows, args.batch, rng)
+            results.append(rows / seconds)
+            print(f"{name:<10}{rows:>8}{seconds:>10.2f}{rows / seconds:>10.0f}")
+
+        if len(results) == 2:
+            print(f"\nbulk speedup: {results[1] / results[0]:.1f}x")
+    finally:
+        drop_user(user_id)
+
+
+if __name__ == "__main__":
+    main()
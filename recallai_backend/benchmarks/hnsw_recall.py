@@ -0,0 +1,110 @@
+"""
+Recall-vs-latency benchmark: in-process HNSW vs the exact pgvector query.
+
+Runs against the configured DATABASE_URL using one user's embeddings.
+Queries are that user's own vectors plus a little noise, so the exact
+top-k is never trivially "the vector itself".
+
+    python -m recallai_backend.benchmarks.hnsw_recall --user-id 1
+    python -m recallai_backend.benchmarks.hnsw_recall --user-id 1 --ef 16,64,256 --m 32
+"""
+
+import argparse
+import time
+
+import numpy as np
+from sqlalchemy import text
+
+from recallai_backend.core.db import SessionLocal
+from recallai_backend.domain.repositories.hnsw_note_repository import HnswNoteRepository
+from recallai_backend.domain.vector_index.hnsw_index import HnswIndexRegistry
+
+
+# Exact note ranking: each note by its closest chunk
+EXACT_SQL = text("""
+    SELECT e.note_id
+    FROM embeddings e
+    WHERE e.user_id = :user_id
+    GROUP BY e.note_id
+    ORDER BY min(e.vector <-> CAST(:embedding AS vector))
+    LIMIT :top_k
+""")
+
+
+def percentile(samples_ms, p):
+    return float(np.percentile(samples_ms, p)) if samples_ms else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--ef", default="16,32,64,128,256", help="comma-separated ef_search values")
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    db = SessionLocal()
+
+    try:
+        # Force the exact plan even if an ANN index exists on embeddings
+        db.execute(text("SET enable_indexscan = off"))
+
+        loader_repo = HnswNoteRepository(db, registry=HnswIndexRegistry(max_age_seconds=0))
+        labels, vectors = loader_repo.load_user_vectors(args.user_id)
+        if not labels:
+            print(f"No embeddings for user {args.user_id}")
+            return
+
+        picks = rng.integers(0, len(labels), size=args.queries)
+        queries = vectors[picks] + rng.normal(0, args.noise, size=(args.queries, vectors.shape[1])).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        # ── exact pgvector baseline ──
+        exact_ids, exact_ms = [], []
+        for q in queries:
+            t0 = time.perf_counter()
+            rows = db.execute(
+                EXACT_SQL,
+                {"user_id": args.user_id, "embedding": q, "top_k": args.top_k},
+            ).fetchall()
+            exact_ms.append((time.perf_counter() - t0) * 1000)
+            exact_ids.append({r[0] for r in rows})
+
+        print(f"user={args.user_id} vectors={len(labels)} queries={args.queries} top_k={args.top_k}")
+        print(f"{'backend':<22}{'recall@k':>10}{'p50 ms':>10}{'p95 ms':>10}{'build s':>10}")
+        print(f"{'pgvector exact':<22}{1.0:>10.3f}{percentile(exact_ms, 50):>10.2f}{percentile(exact_ms, 95):>10.2f}{'-':>10}")
+
+        # ── HNSW at each ef ──
+        for ef in [int(x) for x in args.ef.split(",") if x.strip()]:
+            registry = HnswIndexRegistry(
+                m=args.m,
+                ef_construction=args.ef_construction,
+                ef_search=ef,
+                max_age_seconds=0,
+            )
+
+            t0 = time.perf_counter()
+            registry.build(args.user_id, lambda _uid: (labels, vectors))
+            build_s = time.perf_counter() - t0
+
+            hits, hnsw_ms = 0, []
+            for q, truth in zip(queries, exact_ids):
+                t0 = time.perf_counter()
+                found = registry.search(args.user_id, q, args.top_k, loader=lambda _uid: (labels, vectors))
+                hnsw_ms.append((time.perf_counter() - t0) * 1000)
+                hits += len(truth.intersection(found))
+
+            recall = hits / max(1, sum(len(t) for t in exact_ids))
+            label = f"hnsw M={args.m} ef={ef}"
+            print(f"{label:<22}{recall:>10.3f}{percentile(hnsw_ms, 50):>10.2f}{percentile(hnsw_ms, 95):>10.2f}{build_s:>10.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark: image preparation before vision calls (utils.image_preprocessor).
+
+For every image, reports the per-stage time of prepare_image (hash,
+decode, resize, encode) and the request payload it saves: the size of the
+base64 data URL, raw vs prepared. With --vision N, also times N OCR
+calls (file_extractor.ocr_image) on each version; that calls OpenAI and
+needs OPENAI_API_KEY.
+
+Without --file, fixtures are generated: a 12 MP phone-style JPEG
+(q95, with EXIF) and a 2880x1800 PNG screenshot of text.
+
+    python -m recallai_backend.benchmarks.image_prep
+    python -m recallai_backend.benchmarks.image_prep --file photo.jpg --file scan.png
+    python -m recallai_backend.benchmarks.image_prep --vision 3
+"""
+
+import argparse
+import io
+import mimetypes
+import statistics
+import time
+from typing import List, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from recallai_backend.utils.image_preprocessor import image_cache, prepare_image
+
+STAGES = ("hash", "decode", "resize", "encode")
+
+
+# ─────────────────────────────────────────────
+# Fixtures
+# ─────────────────────────────────────────────
+def make_photo(rng: np.random.Generator) -> bytes:
+    """4032x3024 smooth gradients plus sensor-like noise, saved like a phone would."""
+    h, w = 3024, 4032
+    y, x = np.mgrid[0:h, 0:w].astype(np.float32)
+    base = np.stack([x / w * 255, y / h * 255, (x + y) / (w + h) * 255], axis=-1)
+    noise = rng.normal(0, 12, (h, w, 3))
+    img = Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8))
+    exif = Image.Exif()
+    exif[0x0110] = "Benchmark Phone"  # Model
+    exif[0x0112] = 6                  # Orientation: rotate 90°
+    out = io.BytesIO()
+    img.save(out, "JPEG", quality=95, exif=exif)
+    return out.getvalue()
+
+
+def make_screenshot() -> bytes:
+    img = Image.new("RGB", (2880, 1800), "white")
+    draw = ImageDraw.Draw(img)
+    for row in range(0, 1800, 24):
+        draw.text((40, row), f"Line {row // 24}: the quick brown fox jumps over the lazy dog " * 3, fill="black")
+    out = io.BytesIO()
+    img.save(out, "PNG")
+    return out.getvalue()
+
+
+def load_images(files: List[str], seed: int) -> List[Tuple[str, bytes, str]]:
+    if files:
+        images = []
+        for path in files:
+            with open(path, "rb") as f:
+                images.append((path, f.read(), mimetypes.guess_type(path)[0] or "image/jpeg"))
+        return images
+    rng = np.random.default_rng(seed)
+    return [
+        ("photo.jpg (12 MP)", make_photo(rng), "image/jpeg"),
+        ("screenshot.png", make_screenshot(), "image/png"),
+    ]
+
+
+# ─────────────────────────────────────────────
+# Runs
+# ─────────────────────────────────────────────
+def data_url_bytes(data: bytes) -> int:
+    return (len(data) + 2) // 3 * 4
+
+
+def time_prepare(data: bytes, mime: str, repeat: int):
+    runs = []
+    for _ in range(repeat):
+        image_cache.clear()
+        runs.append(prepare_image(data, mime))
+    timings = {stage: statistics.median(r.timings_ms.get(stage, 0.0) for r in runs) for stage in STAGES}
+
+    started = time.perf_counter()
+    prepare_image(data, mime)
+    timings["cached"] = (time.perf_counter() - started) * 1000
+    return runs[-1], timings
+
+
+def time_vision(data: bytes, mime: str, prepare: bool, calls: int) -> float:
+    from recallai_backend.utils.file_extractor import ocr_image
+
+    elapsed = []
+    for _ in range(calls):
+        image_cache.clear()
+        started = time.perf_counter()
+        ocr_image(data, mime, prepare=prepare)
+        elapsed.append(time.perf_counter() - started)
+    return statistics.median(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", action="append", default=[], help="image to benchmark (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="prepare_image runs per image (median)")
+    parser.add_argument("--vision", type=int, default=0, help="OCR calls per image and version (0 = none)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for name, data, mime in load_images(args.file, args.seed):
+        image, t = time_prepare(data, mime, args.repeat)
+        raw_url, prepared_url = data_url_bytes(data), data_url_bytes(image.data)
+
+        print(f"{name}: {image.width}x{image.height} {image.mime}")
+        print("  " + "  ".join(f"{stage}={t[stage]:.1f}ms" for stage in (*STAGES, "cached")))
+        print(
+            f"  data URL {raw_url / 1024:,.0f} KB → {prepared_url / 1024:,.0f} KB "
+            f"({raw_url / prepared_url:.1f}x smaller)"
+        )
+
+        if args.vision:
+            raw_s = time_vision(data, mime, prepare=False, calls=args.vision)
+            prepared_s = time_vision(data, mime, prepare=True, calls=args.vision)
+            print(f"  vision  raw {raw_s:.2f}s  prepared {prepared_s:.2f}s (median of {args.vision})")
+        print()
+
+
+if __name__ == "__main__":
+    main()
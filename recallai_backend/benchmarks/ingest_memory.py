@@ -0,0 +1,101 @@
+"""
+Peak-RSS benchmark: buffered vs streaming document ingestion.
+
+"buffered"  is the old path: read the whole upload into bytes, extract the
+            whole document into one string, clean it, then materialize
+            every chunk in a list.
+"streaming" is the current path: extract_text_local yields page by page
+            from the file on disk, straight into iter_chunks.
+
+Each mode runs in a fresh process so its peak RSS (ru_maxrss) is its own.
+Embedding is left out: both paths embed the same chunks, and the
+streaming path only holds INGEST_BATCH_CHUNKS of them at a time.
+
+    python -m recallai_backend.benchmarks.ingest_memory                  # synthetic 200 MB .txt
+    python -m recallai_backend.benchmarks.ingest_memory --size-mb 50
+    python -m recallai_backend.benchmarks.ingest_memory --file big.pdf
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import tempfile
+import time
+
+SENTENCE = "The quick brown fox jumps over the lazy dog while the archivist files note {n}. "
+
+
+def make_fixture(path: str, size_mb: int) -> None:
+    """Plain text with sentences, paragraphs and the odd heading."""
+    target = size_mb * 1024 * 1024
+    written = n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target:
+            n += 1
+            if n % 500 == 0:
+                block = f"\n## Section {n // 500}\n\n"
+            else:
+                block = "".join(SENTENCE.format(n=n * 10 + i) for i in range(8)) + "\n\n"
+            f.write(block)
+            written += len(block)
+
+
+def _peak_rss_mb() -> float:
+    # Linux reports KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode: str, path: str, queue) -> None:
+    # Imported here so every child pays the same import cost
+    from recallai_backend.business.services.chunker import iter_chunks
+    from recallai_backend.business.services.ingestion_service import chunk_text, clean_text
+    from recallai_backend.business.services.tokenizer import get_encoding
+    from recallai_backend.utils.file_extractor import extract_text_local
+
+    get_encoding()  # load BPE ranks before measuring
+    baseline = _peak_rss_mb()
+    filename = os.path.basename(path)
+    started = time.perf_counter()
+
+    if mode == "buffered":
+        with open(path, "rb") as f:
+            data = f.read()
+        text = "".join(extract_text_local(data, filename))
+        chunks = chunk_text(clean_text(text))
+        count = len(chunks)
+    else:
+        with open(path, "rb") as f:
+            count = sum(1 for _ in iter_chunks(extract_text_local(f, filename)))
+
+    queue.put((mode, count, time.perf_counter() - started, baseline, _peak_rss_mb()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", help="document to ingest (pdf, docx, pptx, txt, zip)")
+    parser.add_argument("--size-mb", type=int, default=200, help="size of the synthetic .txt fixture")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.file
+        if path is None:
+            path = os.path.join(tmp, "fixture.txt")
+            make_fixture(path, args.size_mb)
+
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"{os.path.basename(path)}: {size_mb:.1f} MB on disk\n")
+        print(f"{'mode':<10} {'chunks':>8} {'seconds':>8} {'base MB':>8} {'peak MB':>8} {'delta MB':>9}")
+
+        ctx = mp.get_context("spawn")
+        for mode in ("buffered", "streaming"):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=run_mode, args=(mode, path, queue))
+            proc.start()
+            mode, count, seconds, baseline, peak = queue.get()
+            proc.join()
+            print(f"{mode:<10} {count:>8} {seconds:>8.1f} {baseline:>8.0f} {peak:>8.0f} {peak - baseline:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark: OCR of a multi-image bulk upload.
+
+Compares the two ways bulk uploads have read images:
+
+    serial    one ocr_image call per image, one after the other
+    batched   ocr_images: OCR_BATCH_IMAGES images per request, labelled
+              sections in the answer, up to OCR_CONCURRENCY requests at once
+
+Fixtures are generated text images, each carrying a unique code
+("RECALL-<n>-<word>"); an image's result only counts as correct if it
+contains its own code, so a batched answer mapped to the wrong file shows
+up as a miss. Calls OpenAI (needs OPENAI_API_KEY). --simulate replaces
+the API with a fixed latency model (base + per-image ms) to check the
+scheduling alone, without costs; accuracy is not measured then.
+
+    python -m recallai_backend.benchmarks.ocr_batching
+    python -m recallai_backend.benchmarks.ocr_batching --images 24 --batch 6 --concurrency 4
+    python -m recallai_backend.benchmarks.ocr_batching --simulate 1500 400
+"""
+
+import argparse
+import asyncio
+import io
+import random
+import time
+import types
+from typing import List, Tuple
+
+from PIL import Image, ImageDraw
+
+from recallai_backend.core.config import settings
+from recallai_backend.utils import file_extractor
+from recallai_backend.utils.image_preprocessor import image_cache
+
+WORDS = ["amber", "birch", "cobalt", "delta", "ember", "fjord", "garnet", "harbor", "indigo", "juniper"]
+
+
+# ─────────────────────────────────────────────
+# Fixtures
+# ─────────────────────────────────────────────
+def make_images(count: int, seed: int) -> List[Tuple[bytes, str, str]]:
+    """(png bytes, mime, code) per image."""
+    rng = random.Random(seed)
+    images = []
+    for n in range(count):
+        code = f"RECALL-{n}-{rng.choice(WORDS)}"
+        img = Image.new("RGB", (1200, 500), "white")
+        draw = ImageDraw.Draw(img)
+        draw.text((40, 40), f"Invoice reference {code}", fill="black", font_size=48)
+        for row in range(4):
+            line = f"Line {row + 1}: {rng.choice(WORDS)} {rng.randint(1, 999)}"
+            draw.text((40, 140 + row * 70), line, fill="black", font_size=40)
+        out = io.BytesIO()
+        img.save(out, "PNG")
+        images.append((out.getvalue(), "image/png", code))
+    return images
+
+
+# ─────────────────────────────────────────────
+# Simulated API
+# ─────────────────────────────────────────────
+def simulate(base_ms: float, per_image_ms: float) -> None:
+    def answer(messages) -> str:
+        labels = [b["text"] for b in messages[1]["content"] if b["type"] == "text"]
+        return "\n".join(f"{label}\n(text)" for label in labels) or "(text)"
+
+    def latency(messages) -> float:
+        images = sum(b["type"] == "image_url" for b in messages[1]["content"])
+        return (base_ms + per_image_ms * images) / 1000
+
+    def reply(content: str):
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=content))])
+
+    def create(model, messages):
+        time.sleep(latency(messages))
+        return reply(answer(messages))
+
+    async def acreate(model, messages):
+        await asyncio.sleep(latency(messages))
+        return reply(answer(messages))
+
+    file_extractor.client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=create)))
+    file_extractor.async_client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=acreate)))
+
+
+def count_requests() -> dict:
+    """Wrap both clients' create() to count the requests actually sent."""
+    counter = {"requests": 0}
+    sync_completions = file_extractor.client.chat.completions
+    async_completions = file_extractor.async_client.chat.completions
+    sync_create, async_create = sync_completions.create, async_completions.create
+
+    def create(*a, **kw):
+        counter["requests"] += 1
+        return sync_create(*a, **kw)
+
+    async def acreate(*a, **kw):
+        counter["requests"] += 1
+        return await async_create(*a, **kw)
+
+    sync_completions.create, async_completions.create = create, acreate
+    return counter
+
+
+# ─────────────────────────────────────────────
+# Runs
+# ─────────────────────────────────────────────
+def run_serial(images) -> Tuple[float, List[str | None]]:
+    started = time.perf_counter()
+    texts = [file_extractor.ocr_image(data, mime) for data, mime, _ in images]
+    return time.perf_counter() - started, texts
+
+
+def run_batched(images) -> Tuple[float, List[str | None]]:
+    started = time.perf_counter()
+    texts = asyncio.run(file_extractor.ocr_images([(data, mime) for data, mime, _ in images]))
+    return time.perf_counter() - started, texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=12)
+    parser.add_argument("--batch", type=int, default=settings.ocr_batch_images, help="images per request")
+    parser.add_argument("--concurrency", type=int, default=settings.ocr_concurrency)
+    parser.add_argument("--simulate", type=float, nargs=2, metavar=("BASE_MS", "PER_IMAGE_MS"))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    settings.ocr_batch_images = args.batch
+    settings.ocr_concurrency = args.concurrency
+    if args.simulate:
+        simulate(*args.simulate)
+    counter = count_requests()
+
+    images = make_images(args.images, args.seed)
+    print(f"images={args.images} batch={args.batch} concurrency={args.concurrency}"
+          f"{' (simulated API)' if args.simulate else ''}\n")
+    print(f"{'path':<10}{'requests':>10}{'seconds':>10}{'img/s':>8}{'correct':>10}")
+
+    results = []
+    for name, runner in (("serial", run_serial), ("batched", run_batched)):
+        image_cache.clear()
+        counter["requests"] = 0
+        seconds, texts = runner(images)
+        requests = counter["requests"]
+        hits = sum(code in (t or "") for t, (_, _, code) in zip(texts, images))
+        correct = "-" if args.simulate else f"{hits}/{len(images)}"
+        results.append(seconds)
+        print(f"{name:<10}{requests:>10}{seconds:>10.2f}{args.images / seconds:>8.1f}{correct:>10}")
+
+    print(f"\nbatched speedup: {results[0] / results[1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
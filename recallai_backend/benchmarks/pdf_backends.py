@@ -0,0 +1,142 @@
+"""
+Throughput benchmark: PDF pages/sec per extraction backend.
+
+Each backend (pdfium, pdfminer, pdfplumber) extracts every fixture
+twice: serially in this process (iter_pdf_pages) and split into page
+ranges over a process pool (extract_pdf_parallel). Pool start-up is paid
+once, before timing, so the parallel figures are steady-state.
+
+Without --file, a fixture set of synthetic text PDFs is generated (no
+extra dependencies: the PDFs are written by hand, one Helvetica text
+stream per page). Real documents are better: scanned-looking or
+table-heavy PDFs change the ranking.
+
+    python -m recallai_backend.benchmarks.pdf_backends
+    python -m recallai_backend.benchmarks.pdf_backends --pages 50 400 --workers 8
+    python -m recallai_backend.benchmarks.pdf_backends --file a.pdf --file b.pdf --backend pdfium
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from recallai_backend.utils.pdf_extractor import (
+    PDF_BACKENDS,
+    extract_pdf_parallel,
+    iter_pdf_pages,
+    pdf_page_count,
+)
+
+LINES_PER_PAGE = 50
+LINE = "Line {n} of the benchmark fixture: the quick brown fox jumps over the lazy dog."
+
+
+# ─────────────────────────────────────────────
+# Fixtures
+# ─────────────────────────────────────────────
+def make_pdf(path: str, pages: int) -> None:
+    """Minimal valid PDF: catalog, page tree, one font, one content stream per page."""
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # filled in once the page tree exists
+    tree = add(b"")
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    kids = []
+    for p in range(pages):
+        lines = [LINE.format(n=p * LINES_PER_PAGE + i) for i in range(LINES_PER_PAGE)]
+        ops = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+        stream = ops.encode("latin-1")
+        content = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (tree, font, content)
+        ))
+
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % tree
+    objects[tree - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids)
+    )
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            len(objects) + 1, catalog, xref
+        ))
+
+
+# ─────────────────────────────────────────────
+# Runs
+# ─────────────────────────────────────────────
+def _warm(n: int) -> int:
+    # Forces the worker to import the extraction stack
+    import recallai_backend.utils.pdf_extractor  # noqa: F401
+    return n
+
+
+def time_serial(path: str, backend: str) -> tuple[int, float]:
+    started = time.perf_counter()
+    chars = sum(len(page) for page in iter_pdf_pages(path, backend))
+    return chars, time.perf_counter() - started
+
+
+def time_parallel(path: str, backend: str, pool: ProcessPoolExecutor, workers: int) -> tuple[int, float]:
+    started = time.perf_counter()
+    chars = sum(len(page) for page in extract_pdf_parallel(path, backend, workers=workers, executor=pool))
+    return chars, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", action="append", help="PDF to include (repeatable); replaces the fixture set")
+    parser.add_argument("--pages", type=int, nargs="+", default=[20, 200], help="synthetic fixture sizes")
+    parser.add_argument("--backend", action="append", choices=PDF_BACKENDS, help="limit to these backends")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    backends = args.backend or list(PDF_BACKENDS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = args.file or []
+        if not paths:
+            for pages in args.pages:
+                path = os.path.join(tmp, f"fixture-{pages}p.pdf")
+                make_pdf(path, pages)
+                paths.append(path)
+
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=mp.get_context("spawn")) as pool:
+            list(pool.map(_warm, range(args.workers)))
+
+            print(f"{args.workers} workers\n")
+            print(f"{'file':<24} {'pages':>6} {'backend':<11} {'serial p/s':>11} {'parallel p/s':>13} {'speedup':>8} {'chars':>10}")
+            for path in paths:
+                pages = pdf_page_count(path)
+                name = os.path.basename(path)[:24]
+                for backend in backends:
+                    chars, serial = time_serial(path, backend)
+                    parallel_chars, parallel = time_parallel(path, backend, pool, args.workers)
+                    if parallel_chars != chars:
+                        print(f"  ! {backend}: parallel extracted {parallel_chars} chars, serial {chars}")
+                    print(
+                        f"{name:<24} {pages:>6} {backend:<11} {pages / serial:>11.1f} "
+                        f"{pages / parallel:>13.1f} {serial / parallel:>7.1f}x {chars:>10}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Microbenchmark: text vs binary pgvector wire encoding at 1536 dimensions.
+
+"text"   is what the repositories used to do: str()-join Python floats into
+         "[x,y,...]" on write and split/float() the same text on read.
+"binary" is VectorType's codec: float32 array <-> pgvector send/recv bytes.
+
+    python -m recallai_backend.benchmarks.vector_encoding
+    python -m recallai_backend.benchmarks.vector_encoding --dim 3072 --number 5000
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from recallai_backend.domain.models.vector_type import from_binary, to_binary
+
+
+def text_encode(vec: list) -> str:
+    return "[" + ",".join(str(x) for x in vec) + "]"
+
+
+def text_decode(data: str) -> list:
+    return [float(x) for x in data[1:-1].split(",")]
+
+
+def bench(fn, arg, number: int) -> float:
+    """Best-of-5 microseconds per call."""
+    return min(timeit.repeat(lambda: fn(arg), number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    vec = np.random.default_rng(0).standard_normal(args.dim).astype(np.float32)
+    as_list = vec.tolist()
+
+    text_payload = text_encode(as_list)
+    binary_payload = to_binary(vec)
+
+    assert np.allclose(text_decode(text_payload), vec)
+    assert np.array_equal(from_binary(binary_payload), vec)
+
+    rows = [
+        ("text", bench(text_encode, as_list, args.number), bench(text_decode, text_payload, args.number), len(text_payload.encode())),
+        ("binary", bench(to_binary, vec, args.number), bench(from_binary, binary_payload, args.number), len(binary_payload)),
+    ]
+
+    print(f"dim={args.dim} number={args.number}")
+    print(f"{'format':<10}{'encode us':>12}{'decode us':>12}{'bytes':>10}")
+    for name, enc, dec, size in rows:
+        print(f"{name:<10}{enc:>12.1f}{dec:>12.1f}{size:>10}")
+
+    print(f"speedup: encode x{rows[0][1] / rows[1][1]:.0f}, decode x{rows[0][2] / rows[1][2]:.0f}, "
+          f"size x{rows[0][3] / rows[1][3]:.1f} smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,21 @@
-from typing import Protocol, List
+from typing import AsyncIterator, Protocol, List, Tuple
 from fastapi import UploadFile
 from recallai_backend.contracts.chat_dtos import ChatRequestDTO, ChatResponseDTO
 
 
 class IChatService(Protocol):
-    def ask(self, dto: ChatRequestDTO) -> ChatResponseDTO:
+    async def ask(self, dto: ChatRequestDTO) -> ChatResponseDTO:
         """
         Text-only chat with RAG over notes.
         """
         ...
 
+    def ask_stream(self, dto: ChatRequestDTO) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Same as ask(), as a stream of (event, data) pairs for SSE.
+        """
+        ...
+
     async def handle_file_upload(
         self,
         conversation_id: int,
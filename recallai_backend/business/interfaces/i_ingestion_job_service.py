@@ -0,0 +1,15 @@
+from typing import Iterable, Optional, Protocol, Tuple
+from recallai_backend.contracts.job_dtos import IngestionJobDTO
+
+
+class IIngestionJobService(Protocol):
+    def submit(
+        self,
+        user_id: int,
+        files: Iterable[Tuple[str, Optional[str], bytes]],
+        source: str | None = None,
+    ) -> IngestionJobDTO:
+        ...
+
+    def get_job(self, job_id: int) -> IngestionJobDTO | None:
+        ...
@@ -1,8 +1,10 @@
-from typing import Protocol, List
+from datetime import datetime
+from typing import Iterable, Protocol, List
 from recallai_backend.contracts.note_dtos import (
     NoteCreateDTO,
     NoteUpdateDTO,
     NoteResponseDTO,
+    NoteHitDTO,
 )
 
 
@@ -10,6 +12,18 @@ class INoteService(Protocol):
     def create_note(self, dto: NoteCreateDTO) -> NoteResponseDTO:
         ...
 
+    def create_notes(self, dtos: List[NoteCreateDTO]) -> List[NoteResponseDTO]:
+        ...
+
+    def ingest_document(
+        self,
+        user_id: int,
+        filename: str,
+        pieces: Iterable[str],
+        source: str | None = None,
+    ) -> List[NoteResponseDTO]:
+        ...
+
     def get_note(self, note_id: int) -> NoteResponseDTO | None:
         ...
 
@@ -22,5 +36,15 @@ class INoteService(Protocol):
     def delete_note(self, note_id: int) -> bool:
         ...
 
-    def search_notes(self, vector: list[float], top_k: int = 5) -> list[dict]:
+    def search_notes(
+        self,
+        vector: list[float],
+        top_k: int = 5,
+        *,
+        user_id: int,
+        source: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        query_text: str | None = None,
+    ) -> list[NoteHitDTO]:
         ...
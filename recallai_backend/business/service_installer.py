@@ -9,6 +9,7 @@ from recallai_backend.business.interfaces.i_auth_service import IAuthService
 from recallai_backend.business.interfaces.i_chat_service import IChatService
 from recallai_backend.business.interfaces.i_note_service import INoteService
 from recallai_backend.business.interfaces.i_conversation_service import IConversationService
+from recallai_backend.business.interfaces.i_ingestion_job_service import IIngestionJobService
 
 
 class ServiceInstaller:
@@ -40,12 +41,16 @@ class ServiceInstaller:
 
     def get_chat_service(self) -> IChatService:
         from recallai_backend.business.services.chat_service import ChatService
+        from recallai_backend.utils.file_extractor import ExtractionCache
 
         return ChatService(
             conv_repo=self._domain.get_conversation_repository(),
             note_repo=self._domain.get_note_repository(),
             embedding_service=self._domain.get_embedding_service(),
             db=self._domain.get_db(),
+            async_domain=self._domain.get_async_domain(),
+            extraction_cache=ExtractionCache(self._domain.get_extraction_cache_repository()),
+            file_repo=self._domain.get_openai_file_repository(),
         )
 
     def get_note_service(self) -> INoteService:
@@ -66,3 +71,11 @@ class ServiceInstaller:
             embedding_service=self._domain.get_embedding_service(),
             db=self._domain.get_db(),
         )
+
+    def get_ingestion_job_service(self) -> IIngestionJobService:
+        from recallai_backend.business.services.ingestion_job_service import IngestionJobService
+
+        return IngestionJobService(
+            job_repo=self._domain.get_ingestion_job_repository(),
+            db=self._domain.get_db(),
+        )
@@ -1,30 +1,62 @@
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
-from openai import OpenAI
-import base64
+from sqlalchemy.ext.asyncio import AsyncSession
+from openai import AsyncOpenAI, BadRequestError, NotFoundError, OpenAIError
+import asyncio
 import mimetypes
 
 from recallai_backend.core.config import settings
 from recallai_backend.domain.repositories.conversation_repository import ConversationRepository
 from recallai_backend.domain.repositories.note_repository import NoteRepository
-from recallai_backend.domain.interfaces.i_conversation_repository import IConversationRepository
+from recallai_backend.domain.repositories.openai_file_repository import OpenAIFileRepository
+from recallai_backend.domain.domain_installer import AsyncDomainInstaller
+from recallai_backend.domain.interfaces.i_conversation_repository import (
+    IConversationRepository,
+    IAsyncConversationRepository,
+)
+from recallai_backend.domain.models.message import Message
+from recallai_backend.domain.models.note_hit import NoteHit
 from recallai_backend.domain.interfaces.i_note_repository import INoteRepository
+from recallai_backend.domain.interfaces.i_openai_file_repository import IOpenAIFileRepository
+from recallai_backend.business.services.context_builder import ContextBuilder
+from recallai_backend.business.services.conversation_summarizer import ConversationSummarizer
 from recallai_backend.business.services.embedding_service import EmbeddingService
 from recallai_backend.business.interfaces.i_chat_service import IChatService
-from recallai_backend.utils.file_extractor import extract_text_gpt
+from recallai_backend.utils.file_extractor import ExtractionCache, extract_text_gpt, sha256_source
+from recallai_backend.utils.image_preprocessor import prepare_image
 from recallai_backend.contracts.chat_dtos import ChatResponseDTO, ChatAnswerSource, ChatRequestDTO
 
-client = OpenAI(api_key=settings.openai_api_key)
+async_client = AsyncOpenAI(api_key=settings.openai_api_key)
+
+CHAT_MODEL = "gpt-4o"
+
+SYSTEM_PROMPT = (
+    "You are RecallAI. You answer based on:\n"
+    "1. User messages\n"
+    "2. Their personal notes (RAG)\n"
+    "Reply clearly and concisely."
+)
+
+# Strong refs for assistant-message saves that outlive a cancelled request
+_pending_saves: set = set()
 
 IMAGE_EXTS = ["png", "jpg", "jpeg", "gif", "webp"]
 
+# Files API purpose for PDFs attached to a chat completion
+PDF_PURPOSE = "vision"
+
 
 def is_image(filename: str, mime: str) -> bool:
     ext = filename.lower().split(".")[-1]
     return ext in IMAGE_EXTS or (mime and mime.startswith("image/"))
 
 
+def _cancel(task: Optional[asyncio.Task]) -> None:
+    if task is not None:
+        task.cancel()
+
+
 class ChatService(IChatService):
     # ==========================================================
     # INITIALIZATION
@@ -35,20 +67,27 @@ class ChatService(IChatService):
         embedding_service: Optional[EmbeddingService] = None,
         conv_repo: Optional[IConversationRepository] = None,
         note_repo: Optional[INoteRepository] = None,
+        async_domain: Optional[AsyncDomainInstaller] = None,
+        extraction_cache: Optional[ExtractionCache] = None,
+        file_repo: Optional[IOpenAIFileRepository] = None,
     ):
         """
         For DI/installer:
-            pass conv_repo, note_repo, embedding_service.
+            pass conv_repo, note_repo, embedding_service, async_domain,
+            extraction_cache, file_repo and db (repositories only flush;
+            this service commits).
 
         For legacy usage:
             pass db (+ embedding_service) and repos will be constructed internally.
         """
+        if db is None:
+            raise ValueError("ChatService needs the db session to commit its writes.")
+        self.db = db
+
         if conv_repo is not None and note_repo is not None:
             self.repo_conv: IConversationRepository = conv_repo
             self.repo_notes: INoteRepository = note_repo
         else:
-            if db is None:
-                raise ValueError("Either (conv_repo & note_repo) or db must be provided to ChatService.")
             self.repo_conv = ConversationRepository(db)
             self.repo_notes = NoteRepository(db)
 
@@ -58,10 +97,16 @@ class ChatService(IChatService):
             # Fallback for legacy
             self.embedding = EmbeddingService()
 
+        # Async sessions/repositories for the ask() pipeline
+        self.async_domain = async_domain or AsyncDomainInstaller()
+        self.summarizer = ConversationSummarizer(self.async_domain)
+        self.extraction_cache = extraction_cache
+        self.repo_files: IOpenAIFileRepository = file_repo or OpenAIFileRepository(db)
+
     # ==========================================================
     # TEXT-ONLY CHAT → USED BY /api/v1/chat
     # ==========================================================
-    def ask(self, dto: ChatRequestDTO) -> ChatResponseDTO:
+    async def ask(self, dto: ChatRequestDTO) -> ChatResponseDTO:
         """
         Pure text chat with RAG notes.
         """
@@ -75,101 +120,266 @@ class ChatService(IChatService):
                 sources=[]
             )
 
-        # Create or load conversation
-        if dto.conversation_id is None:
-            title = user_text[:50] if user_text else "New conversation"
-            conv = self.repo_conv.create_conversation(dto.user_id, title)
-            conversation_id = conv.id
-        else:
-            conversation_id = dto.conversation_id
+        conversation_id, sources, messages, summary_task = await self._prepare_turn(dto, user_text)
+
+        try:
+            # GPT Response
+            completion = await async_client.chat.completions.create(
+                model=CHAT_MODEL,
+                messages=messages,
+            )
 
-        # Save new user message
-        user_msg = self.repo_conv.add_message(conversation_id, "user", user_text)
+            answer = completion.choices[0].message.content
 
-        # Load conversation history (oldest → newest)
-        history = self.repo_conv.get_messages_paginated(
-            conversation_id,
-            limit=1000,
-            before_id=None
-        )
+            # Save both turns and return the AI message ID to the frontend
+            conversation_id, assistant_msg = await self._save_turn(dto, conversation_id, user_text, answer)
+        except BaseException:
+            _cancel(summary_task)
+            raise
 
-        message_history = [
-            {"role": m.role, "content": m.content}
-            for m in history
-        ]
+        # Running since the prompt was built; only a short grace on top
+        await self.summarizer.finish(summary_task)
 
-        # Load history (DESC from repository)
-        history = self.repo_conv.get_messages_paginated(
-            conversation_id,
-            limit=1000,
-            before_id=None
+        return ChatResponseDTO(
+            answer=answer,
+            sources=sources,
+            message_id=assistant_msg.id,
+            conversation_id=conversation_id,
         )
 
-        # ⭐ FIX: Reverse to ASC for GPT
-        history = list(reversed(history))
+    # ==========================================================
+    # STREAMING TEXT CHAT → USED BY /api/v1/chat/stream
+    # ==========================================================
+    async def ask_stream(self, dto: ChatRequestDTO) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Same turn as ask(), yielded as (event, data) pairs:
+            sources → {conversation_id, sources}   (once, before any text;
+                                                    id is null for a new
+                                                    conversation)
+            delta   → {content}                    (per completion chunk)
+            done    → {conversation_id, message_id} (after the turn is saved)
+            error   → {detail}                     (completion failed mid-way)
+
+        If the consumer goes away (client disconnect → generator closed or
+        cancelled), the OpenAI stream is closed and the user message plus
+        whatever was already sent is saved, so history stays consistent.
+        """
+        user_text = (dto.prompt or "").strip()
+
+        if not user_text:
+            yield "error", {"detail": "I didn’t receive any message."}
+            return
 
-        message_history = [
-            {"role": m.role, "content": m.content}
-            for m in history
-        ]
-        
-        # RAG notes retrieval
-        query_vec = self.embedding.embed_text(user_text)
-        notes = self.repo_notes.search_by_vector(query_vec, top_k=dto.top_k)
-
-        sources: List[ChatAnswerSource] = []
-        rag_text_blocks = []
-
-        for n in notes:
-            snippet = n.content[:200] + "..."
-            sources.append(
-                ChatAnswerSource(note_id=n.id, title=n.title, snippet=snippet)
+        conversation_id, sources, messages, summary_task = await self._prepare_turn(dto, user_text)
+
+        parts: List[str] = []
+        error: Optional[str] = None
+        try:
+            yield "sources", {
+                "conversation_id": conversation_id,
+                "sources": [s.model_dump() for s in sources],
+            }
+
+            stream = await async_client.chat.completions.create(
+                model=CHAT_MODEL,
+                messages=messages,
+                stream=True,
+            )
+            async with stream:
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        parts.append(delta)
+                        yield "delta", {"content": delta}
+        except OpenAIError as e:
+            error = str(e)
+        except BaseException:
+            # Disconnected: nothing more can be sent, keep what was streamed.
+            # Shielded so a cancelled request still finishes the insert.
+            _cancel(summary_task)
+            saving = asyncio.ensure_future(
+                self._save_turn(dto, conversation_id, user_text, "".join(parts))
             )
-            rag_text_blocks.append(f"[NOTE {n.id}]\n{n.content}")
+            _pending_saves.add(saving)
+            saving.add_done_callback(_pending_saves.discard)
+            await asyncio.shield(saving)
+            raise
 
-        # System instructions
-        system_blocks = [
-            {
-                "role": "system",
-                "content": (
-                    "You are RecallAI. You answer based on:\n"
-                    "1. User messages\n"
-                    "2. Their personal notes (RAG)\n"
-                    "Reply clearly and concisely."
+        conversation_id, assistant_msg = await self._save_turn(
+            dto, conversation_id, user_text, "".join(parts)
+        )
+
+        try:
+            if error is not None:
+                yield "error", {"detail": error}
+            else:
+                yield "done", {
+                    "conversation_id": conversation_id,
+                    "message_id": assistant_msg.id if assistant_msg else None,
+                }
+        except BaseException:
+            _cancel(summary_task)
+            raise
+
+        # After the last event. The response only ends (and Lambda can
+        # freeze) once this returns, and Mangum buffers the whole stream,
+        # so the wait is the same short grace as in ask()
+        await self.summarizer.finish(summary_task)
+
+    # ==========================================================
+    # TEXT CHAT STAGES (shared by ask / ask_stream)
+    # ==========================================================
+    async def _prepare_turn(
+        self,
+        dto: ChatRequestDTO,
+        user_text: str,
+    ) -> Tuple[Optional[int], List[ChatAnswerSource], List[dict], Optional[asyncio.Task]]:
+        """
+        Build the prompt. Read-only: the turn is written by _save_turn.
+        Also returns the summary update started for a long conversation
+        (or None); the caller passes it to summarizer.finish() before
+        the request ends.
+
+        Two independent branches run concurrently, each on its own
+        AsyncSession:
+            - conversation: load the summary + unsummarized tail
+            - retrieval:    embed the prompt, vector-search the user's data
+        Both sessions are closed before the completion call, so no pooled
+        connection is held while the model generates.
+        """
+        conversation_id = dto.conversation_id
+
+        async with self.async_domain.new_session() as conv_db, self.async_domain.new_session() as notes_db:
+            (summary, history), (notes, memories) = await asyncio.gather(
+                self._start_turn(
+                    self.async_domain.get_conversation_repository(conv_db), dto, user_text
                 ),
-            }
+                self._retrieve(notes_db, dto, user_text),
+            )
+
+        # Past messages already in the prompt verbatim aren't "memories"
+        in_prompt = {m.id for m in history}
+        memories = [m for m in memories if m.id not in in_prompt][: settings.chat_memory_top_k]
+
+        messages, used_notes, _ = ContextBuilder(
+            model=CHAT_MODEL,
+            budget=settings.chat_context_max_tokens,
+        ).build(SYSTEM_PROMPT, history, notes, summary=summary, memories=memories)
+
+        # Only notes that made it into the prompt are reported as sources
+        sources = [
+            ChatAnswerSource(note_id=h.note.id, title=h.note.title, snippet=h.text[:200] + "...")
+            for h in used_notes
         ]
 
-        if rag_text_blocks:
-            system_blocks.append(
-                {
-                    "role": "system",
-                    "content": "--- NOTES CONTEXT ---\n" + "\n\n".join(rag_text_blocks),
-                }
+        # Fold older turns into the summary while the completion runs
+        summary_task = None
+        if conversation_id is not None:
+            summary_task = self.summarizer.start(conversation_id, len(history))
+
+        return conversation_id, sources, messages, summary_task
+
+    async def _save_turn(
+        self,
+        dto: ChatRequestDTO,
+        conversation_id: Optional[int],
+        user_text: str,
+        answer: Optional[str],
+    ) -> Tuple[int, Optional[Message]]:
+        """
+        One transaction per turn: create the conversation if needed, then
+        insert the user (and assistant, if any) message in a single
+        INSERT ... RETURNING. Returns (conversation_id, assistant message).
+        """
+        turn = [("user", user_text)]
+        if answer:
+            turn.append(("assistant", answer))
+
+        async with self.async_domain.new_session() as db:
+            repo_conv = self.async_domain.get_conversation_repository(db)
+
+            if conversation_id is None:
+                title = user_text[:50] if user_text else "New conversation"
+                conv = await repo_conv.create_conversation(dto.user_id, title)
+                conversation_id = conv.id
+
+            saved = await repo_conv.add_messages(conversation_id, turn)
+            await db.commit()
+
+        return conversation_id, (saved[-1] if answer else None)
+
+    async def _start_turn(
+        self,
+        repo_conv: IAsyncConversationRepository,
+        dto: ChatRequestDTO,
+        user_text: str,
+    ) -> Tuple[Optional[str], List[Message]]:
+        """
+        Return (rolling summary, messages after the summary oldest → newest,
+        ending with the not-yet-saved user message). A new conversation
+        costs no queries.
+        """
+        summary, tail = None, []
+
+        if dto.conversation_id is not None:
+            conv = await repo_conv.get_by_id(dto.conversation_id)
+            summary_message_id = None
+            if conv is not None:
+                summary, summary_message_id = conv.summary, conv.summary_message_id
+
+            # Only the unsummarized tail; the context builder keeps what fits
+            tail = await repo_conv.get_messages_after(
+                dto.conversation_id,
+                summary_message_id,
+                limit=settings.chat_history_fetch_limit,
             )
 
-        messages = system_blocks + message_history
+        # Saved with the answer in _save_turn
+        tail.append(Message(conversation_id=dto.conversation_id, role="user", content=user_text))
+        return summary, tail
 
-        # GPT Response
-        completion = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-        )
+    async def _retrieve(
+        self,
+        notes_db: AsyncSession,
+        dto: ChatRequestDTO,
+        user_text: str,
+    ) -> Tuple[List[NoteHit], List[Message]]:
+        """
+        RAG retrieval, only ever over this user's data: notes, plus past
+        messages from any of their conversations (long-term memory), both
+        ranked against one prompt embedding.
+        """
+        user_id = dto.user_id
+        if user_id is None and dto.conversation_id is not None:
+            conv = await self.async_domain.get_conversation_repository(notes_db).get_by_id(dto.conversation_id)
+            user_id = conv.user_id if conv else None
 
-        answer = completion.choices[0].message.content
+        if user_id is None:
+            return [], []
 
-        # Save AI message and return its ID to the frontend
-        assistant_msg = self.repo_conv.add_message(
-            conversation_id, "assistant", answer
+        query_vec = await self.embedding.aembed_text(
+            user_text,
+            cache_repo=self.async_domain.get_embedding_cache_repository(notes_db),
         )
-
-        return ChatResponseDTO(
-            answer=answer,
-            sources=sources,
-            message_id=assistant_msg.id
+        # Best chunk per note: the prompt gets that span, not the whole note.
+        # Hybrid also finds exact identifiers and names the embedding misses.
+        notes = await self.async_domain.get_note_repository(notes_db).search_chunks(
+            query_vec,
+            top_k=dto.top_k,
+            user_id=user_id,
+            query_text=user_text if settings.chat_search_mode == "hybrid" else None,
         )
 
+        memories: List[Message] = []
+        if settings.chat_memory_top_k > 0:
+            # Over-fetch: hits from the current prompt tail are dropped later
+            memories = await self.async_domain.get_message_embedding_repository(notes_db).search(
+                query_vec, top_k=2 * settings.chat_memory_top_k, user_id=user_id
+            )
 
+        # Persist any new embedding_cache row and release the connection
+        await notes_db.commit()
+        return notes, memories
 
     # ==========================================================
     # FILE + PROMPT CHAT → USED BY /chat/upload endpoint
@@ -185,6 +395,8 @@ class ChatService(IChatService):
 
         content_blocks = [{"type": "text", "text": prompt}]
         attachment_log: List[str] = []
+        pdfs: List[Tuple[UploadFile, str, str, dict]] = []
+        pdf_log: List[int] = []  # their lines in attachment_log
 
         for file in files:
             filename = file.filename or "file"
@@ -194,31 +406,39 @@ class ChatService(IChatService):
                 or "application/octet-stream"
             )
 
-            file_bytes = await file.read()
-
             if is_image(filename, mime):
-                b64 = base64.b64encode(file_bytes).decode()
-                image_url = f"data:{mime};base64,{b64}"
+                file_bytes = await file.read()
+                # Downsized, re-encoded, metadata stripped (~10x smaller for photos)
+                image = await asyncio.to_thread(prepare_image, file_bytes, mime)
 
                 content_blocks.append(
                     {
                         "type": "image_url",
-                        "image_url": {"url": image_url},
+                        "image_url": {"url": image.data_url},
                     }
                 )
                 attachment_log.append(f"- {filename} (image)")
 
             elif filename.lower().endswith(".pdf"):
-                uploaded = client.files.create(
-                    file=(filename, file_bytes, mime),
-                    purpose="vision",
-                )
-
-                content_blocks.append({"type": "file", "file": {"file_id": uploaded.id}})
-                attachment_log.append(f"- {filename} (pdf → file_id {uploaded.id})")
+                # file_id filled in below, once all PDFs are uploaded
+                block = {"type": "file", "file": {"file_id": None}}
+                content_blocks.append(block)
+                pdfs.append((file, filename, mime, block))
+                pdf_log.append(len(attachment_log))
+                attachment_log.append("")
 
             else:
-                extracted_text = extract_text_gpt(file_bytes, filename)
+                # Page by page from the spooled upload, capped at what a
+                # prompt could hold (~4 chars per token); the commit below
+                # persists a newly cached extraction. Parsing, OCR and the
+                # cache lookup all block, so off the event loop
+                extracted_text = await asyncio.to_thread(
+                    extract_text_gpt,
+                    file.file,
+                    filename,
+                    max_chars=4 * settings.chat_context_max_tokens,
+                    cache=self.extraction_cache,
+                )
                 content_blocks.append(
                     {
                         "type": "text",
@@ -227,24 +447,102 @@ class ChatService(IChatService):
                 )
                 attachment_log.append(f"- {filename} (document extracted locally)")
 
+        reused = await self._attach_pdfs(pdfs)
+
+        messages = [
+            {
+                "role": "system",
+                "content": "You are RecallAI. Use the prompt and all attached files.",
+            },
+            {
+                "role": "user",
+                "content": content_blocks,
+            },
+        ]
+        try:
+            completion = await async_client.chat.completions.create(model="gpt-4o", messages=messages)
+        except (BadRequestError, NotFoundError):
+            if not reused:
+                raise
+            # A reused file_id may have been deleted on OpenAI's side:
+            # forget them all, upload again and retry once
+            await asyncio.to_thread(self.repo_files.invalidate, reused)
+            await self._attach_pdfs(pdfs, reuse=False)
+            completion = await async_client.chat.completions.create(model="gpt-4o", messages=messages)
+
+        for line, (_, filename, _, block) in zip(pdf_log, pdfs):
+            attachment_log[line] = f"- {filename} (pdf → file_id {block['file']['file_id']})"
         combined_message = "Attached files:\n" + "\n".join(attachment_log) + f"\n\nPrompt:\n{prompt}"
-        self.repo_conv.add_message(conversation_id, "user", combined_message)
-
-        completion = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are RecallAI. Use the prompt and all attached files.",
-                },
-                {
-                    "role": "user",
-                    "content": content_blocks,
-                },
-            ],
-        )
 
         answer = completion.choices[0].message.content
-        self.repo_conv.add_message(conversation_id, "assistant", answer)
 
-        return ChatResponseDTO(answer=answer, sources=[])
+        # Both turns in one INSERT, one commit; the sync session is only
+        # ever used from one thread at a time (each call is awaited)
+        def save_turn() -> List[Message]:
+            saved = self.repo_conv.add_messages(
+                conversation_id,
+                [("user", combined_message), ("assistant", answer)],
+            )
+            self.db.commit()
+            return saved
+
+        saved = await asyncio.to_thread(save_turn)
+
+        return ChatResponseDTO(
+            answer=answer,
+            sources=[],
+            message_id=saved[-1].id,
+            conversation_id=conversation_id,
+        )
+
+    async def _attach_pdfs(
+        self,
+        pdfs: List[Tuple[UploadFile, str, str, dict]],
+        reuse: bool = True,
+    ) -> Set[str]:
+        """
+        Set the file_id of every PDF block: one uploaded earlier for the
+        same bytes if it hasn't expired, else a new upload (all of a
+        request's uploads run concurrently, each PDF once). Returns the
+        reused file_ids.
+        """
+        if not pdfs:
+            return set()
+
+        hashes = await asyncio.gather(*(asyncio.to_thread(sha256_source, f.file) for f, _, _, _ in pdfs))
+        known: Dict[str, str] = (
+            await asyncio.to_thread(self.repo_files.get_many, hashes, PDF_PURPOSE) if reuse else {}
+        )
+
+        to_upload: Dict[str, Tuple[UploadFile, str, str]] = {}
+        for (file, filename, mime, _), content_hash in zip(pdfs, hashes):
+            if content_hash not in known:
+                to_upload.setdefault(content_hash, (file, filename, mime))
+
+        if to_upload:
+            uploaded = await asyncio.gather(*(
+                # Streamed from the spooled upload, not read into memory
+                self._upload(file, filename, mime) for file, filename, mime in to_upload.values()
+            ))
+            new_ids = {h: f.id for h, f in zip(to_upload, uploaded)}
+
+            def record_uploads() -> None:
+                self.repo_files.put_many(
+                    [(h, new_ids[h], filename) for h, (_, filename, _) in to_upload.items()],
+                    PDF_PURPOSE,
+                    settings.openai_file_ttl_seconds,
+                )
+                # The files exist now whatever happens to this request
+                self.db.commit()
+
+            await asyncio.to_thread(record_uploads)
+            known.update(new_ids)
+
+        for (_, _, _, block), content_hash in zip(pdfs, hashes):
+            block["file"]["file_id"] = known[content_hash]
+        return {known[h] for h in hashes if h not in to_upload}
+
+    @staticmethod
+    async def _upload(file: UploadFile, filename: str, mime: str):
+        file.file.seek(0)
+        return await async_client.files.create(file=(filename, file.file, mime), purpose=PDF_PURPOSE)
@@ -0,0 +1,326 @@
+"""
+Streaming text cleaning and token-sized chunking for ingestion.
+
+Both stages are generators over an iterable of text pieces (pages,
+slides, file reads), so a large document is never held whole, cleaned
+or chunked, in memory:
+
+    pieces → iter_clean_lines → paragraphs/headings → sentences → chunks
+
+Chunks are sized in tokens (tiktoken, same encoding as the embedding
+model). The packer prefers to break, in order, before a heading, between
+paragraphs, then between sentences. Only a single sentence longer than
+the whole budget is cut at a token boundary. Overlap is sentence-aligned:
+the next chunk starts with the trailing sentences of the previous one
+that fit in `overlap_tokens`.
+
+Notes use iter_note_chunks instead: same packing, plus content-defined
+boundaries so edits re-chunk locally (see its docstring). locate_chunks
+maps chunks back to character spans of the original note.
+"""
+
+import re
+import zlib
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from recallai_backend.core.config import settings
+from recallai_backend.business.services.tokenizer import count_tokens, encode, get_encoding
+
+# Markdown ATX headings, plus short "1.2 Title" / "Chapter 3 ..." lines
+# (single "1." is left alone: that's usually a list item)
+_HEADING = re.compile(
+    r"^(#{1,6}\s+\S|(\d+(\.\d+)+\.?|chapter\s+\d+|section\s+\d+)\s+\S.{0,80}$)",
+    re.IGNORECASE,
+)
+
+# Sentence end: . ! ? (optionally closed by quotes/brackets) + whitespace
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+
+# Flush a paragraph into sentences early once it gets this long (chars per
+# token budget), so text without blank lines can't accumulate unbounded
+_PARAGRAPH_FLUSH_FACTOR = 16
+
+# iter_note_chunks: a paragraph whose crc32 has these bits clear is an anchor
+_ANCHOR_MASK = 0b11
+
+# locate_chunks: words matched at each end of a chunk, and how far a
+# token-cut chunk may run ahead of the source (one joining space per cut)
+_SPAN_WORDS = 8
+_SPAN_SLACK = 16
+
+
+# ─────────────────────────────────────────────
+# CLEANING (streaming)
+# ─────────────────────────────────────────────
+def iter_clean_lines(pieces: Iterable[str]) -> Iterator[str]:
+    """
+    Yield cleaned lines: \\r\\n / \\r normalized, trailing spaces stripped,
+    runs of blank or whitespace-only lines collapsed to one "" line, no
+    leading/trailing blanks. Lines may span piece boundaries.
+    """
+    carry = ""
+    pending_blank = False
+    started = False
+
+    def emit(line: str) -> Iterator[str]:
+        nonlocal pending_blank, started
+        line = line.rstrip()
+        if not line:
+            pending_blank = started
+            return
+        if pending_blank:
+            yield ""
+            pending_blank = False
+        if not started:
+            line = line.lstrip()
+            started = True
+        yield line
+
+    for piece in pieces:
+        if not piece:
+            continue
+        # A piece ending in \r may be half of a \r\n pair
+        text = carry + piece
+        if text.endswith("\r"):
+            text, tail = text[:-1], "\r"
+        else:
+            tail = ""
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+        lines = text.split("\n")
+        carry = lines.pop() + tail
+        for line in lines:
+            yield from emit(line)
+
+    if carry:
+        yield from emit(carry.replace("\r", ""))
+
+
+def clean_text_stream(pieces: Iterable[str]) -> Iterator[str]:
+    """iter_clean_lines re-joined: yields text fragments of the cleaned document."""
+    first = True
+    for line in iter_clean_lines(pieces):
+        yield line if first else "\n" + line
+        first = False
+
+
+# ─────────────────────────────────────────────
+# CHUNKING (streaming, token-sized)
+# ─────────────────────────────────────────────
+def _blocks(lines: Iterable[str], flush_chars: int) -> Iterator[Tuple[str, str]]:
+    """
+    Group cleaned lines into ("heading", text) / ("para", text) /
+    ("cont", text) blocks. "cont" is an early-flushed piece of a very long
+    paragraph that continues in the next block.
+    """
+    para: List[str] = []
+    size = 0
+
+    for line in lines:
+        if not line:
+            if para:
+                yield "para", " ".join(para)
+                para, size = [], 0
+            continue
+
+        if _HEADING.match(line):
+            if para:
+                yield "para", " ".join(para)
+                para, size = [], 0
+            yield "heading", line
+            continue
+
+        para.append(line)
+        size += len(line) + 1
+        if size > flush_chars:
+            text = " ".join(para)
+            # Keep the last (possibly unfinished) sentence for the next round
+            parts = _SENTENCE_END.split(text)
+            if len(parts) > 1:
+                yield "cont", " ".join(parts[:-1])
+                para, size = [parts[-1]], len(parts[-1])
+            elif size > 2 * flush_chars:
+                # No sentence punctuation at all: hand it on as-is
+                yield "cont", text
+                para, size = [], 0
+
+    if para:
+        yield "para", " ".join(para)
+
+
+class _Packer:
+    def __init__(self, max_tokens: int, overlap_tokens: int):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        # (text, tokens, separator before it)
+        self.units: List[Tuple[str, int, str]] = []
+        self.tokens = 0
+        self.fresh = 0  # units added since the last flush (not overlap)
+
+    def add(self, text: str, tokens: int, sep: str) -> Iterator[str]:
+        if self.units and self.tokens + tokens + 1 > self.max_tokens:
+            yield from self.flush(keep_overlap=True)
+            if self.tokens + tokens + 1 > self.max_tokens:
+                # Overlap + this unit won't fit: start clean instead
+                self.units, self.tokens = [], 0
+        if not self.units:
+            sep = ""
+        self.units.append((text, tokens, sep))
+        self.tokens += tokens + (1 if sep else 0)
+        self.fresh += 1
+
+    def flush(self, keep_overlap: bool) -> Iterator[str]:
+        if self.fresh:
+            # The first unit never takes its separator (it may be carried overlap)
+            yield self.units[0][0] + "".join(sep + text for text, _, sep in self.units[1:])
+
+        carried: List[Tuple[str, int, str]] = []
+        if keep_overlap and self.overlap_tokens > 0:
+            budget = self.overlap_tokens
+            for text, tokens, sep in reversed(self.units):
+                if tokens > budget:
+                    break
+                carried.insert(0, (text, tokens, sep))
+                budget -= tokens
+
+        self.units = carried
+        self.tokens = sum(t + (1 if s else 0) for _, t, s in carried)
+        self.fresh = 0
+
+
+def iter_chunks(
+    pieces: Iterable[str],
+    max_tokens: int | None = None,
+    overlap_tokens: int | None = None,
+    model: str | None = None,
+) -> Iterator[str]:
+    """
+    Lazily clean and chunk a stream of text pieces into chunks of at most
+    `max_tokens` tokens (CHUNK_MAX_TOKENS / CHUNK_OVERLAP_TOKENS by default).
+    """
+    max_tokens = max_tokens or settings.chunk_max_tokens
+    overlap_tokens = settings.chunk_overlap_tokens if overlap_tokens is None else overlap_tokens
+    return _pack(pieces, max_tokens, min(overlap_tokens, max_tokens // 2), model, anchored=False)
+
+
+def iter_note_chunks(
+    pieces: Iterable[str],
+    max_tokens: int | None = None,
+    model: str | None = None,
+) -> Iterator[str]:
+    """
+    Chunk a note so that an edit only changes the chunks around it.
+
+    iter_chunks packs greedily, so one inserted sentence moves every later
+    boundary. Here a chunk also ends after any "anchor" paragraph (one
+    whose CRC has its low bits clear, about 1 in 4) once the chunk holds
+    a quarter of the budget. Anchors depend only on the paragraph's own
+    text, so after an edit the boundaries fall back into step at the next
+    anchor and the chunks beyond it hash exactly as before.
+    """
+    return _pack(pieces, max_tokens or settings.chunk_max_tokens, 0, model, anchored=True)
+
+
+def _is_anchor(text: str) -> bool:
+    # crc32, not hash(): must be stable across processes and restarts
+    return zlib.crc32(text.encode("utf-8")) & _ANCHOR_MASK == 0
+
+
+def _pack(
+    pieces: Iterable[str],
+    max_tokens: int,
+    overlap_tokens: int,
+    model: str | None,
+    anchored: bool,
+) -> Iterator[str]:
+    model = model or settings.openai_embedding_model
+    min_tokens = max_tokens // 4
+
+    packer = _Packer(max_tokens, overlap_tokens)
+    flush_chars = max_tokens * _PARAGRAPH_FLUSH_FACTOR
+
+    previous = None
+    for kind, text in _blocks(iter_clean_lines(pieces), flush_chars):
+        # Text continuing an early-flushed paragraph joins with a space
+        block_sep = " " if previous == "cont" else "\n\n"
+        previous = kind
+
+        if kind == "heading":
+            # Start a new chunk at the heading unless the current one is
+            # still mostly empty; never carry overlap across a heading
+            if packer.tokens >= min_tokens:
+                yield from packer.flush(keep_overlap=False)
+            yield from packer.add(text, count_tokens(text, model), "\n\n")
+            continue
+
+        tokens = count_tokens(text, model)
+        if tokens <= max_tokens:
+            yield from packer.add(text, tokens, block_sep)
+        else:
+            # Paragraph too big: pack it sentence by sentence
+            sep = block_sep
+            for sentence in _SENTENCE_END.split(text):
+                if not sentence:
+                    continue
+                for piece, n in _split_tokens(sentence, max_tokens, model):
+                    yield from packer.add(piece, n, sep)
+                    sep = " "
+
+        if anchored and packer.tokens >= min_tokens and _is_anchor(text):
+            yield from packer.flush(keep_overlap=False)
+
+    yield from packer.flush(keep_overlap=False)
+
+
+# ─────────────────────────────────────────────
+# SPANS: chunks → character offsets in the source
+# ─────────────────────────────────────────────
+def locate_chunks(text: str, chunks: Iterable[str]) -> List[Optional[Tuple[int, int]]]:
+    """
+    (start, end) of each chunk in the uncleaned `text`, or None where it
+    can't be found. Cleaning only drops or merges whitespace, so each end
+    of a chunk is matched by its first / last few words with any run of
+    whitespace between them. Chunks must be in order and not overlap
+    (iter_note_chunks).
+    """
+    spans: List[Optional[Tuple[int, int]]] = []
+    cursor = 0
+    for chunk in chunks:
+        words = chunk.split()
+        if not words:
+            spans.append(None)
+            continue
+
+        head = _words_pattern(words[:_SPAN_WORDS]).search(text, cursor)
+        if head is None:
+            spans.append(None)
+            continue
+
+        tail_pattern = _words_pattern(words[-_SPAN_WORDS:])
+        # The tail can't start before its offset within the chunk
+        offset = max(m.start() for m in tail_pattern.finditer(chunk))
+        tail = tail_pattern.search(text, max(head.start() + offset - _SPAN_SLACK, head.start()))
+        if tail is None:
+            spans.append(None)
+            continue
+
+        spans.append((head.start(), tail.end()))
+        cursor = tail.end()
+    return spans
+
+
+def _words_pattern(words: List[str]) -> re.Pattern:
+    return re.compile(r"\s+".join(map(re.escape, words)))
+
+
+def _split_tokens(text: str, max_tokens: int, model: str) -> Iterator[Tuple[str, int]]:
+    """Yield (text, tokens); only over-long sentences are cut at token boundaries."""
+    tokens = encode(text, model)
+    if len(tokens) <= max_tokens:
+        yield text, len(tokens)
+        return
+
+    enc = get_encoding(model)
+    for start in range(0, len(tokens), max_tokens):
+        window = tokens[start:start + max_tokens]
+        yield enc.decode(window), len(window)
@@ -0,0 +1,205 @@
+"""
+Token-budgeted prompt assembly for chat.
+
+Sections are filled in priority order until the budget is spent:
+
+    1. system prompt          always kept, with the conversation's
+                              rolling summary if it has one
+    2. conversation turns     newest first; the first turn that no longer
+                              fits ends the history (older turns dropped),
+                              except the current user turn, which is
+                              truncated rather than dropped
+    3. note context           in retrieval rank order, each note as the
+                              span of its best-matching chunk; a span that
+                              does not fit whole is cut at a token boundary
+                              if enough room is left, otherwise dropped
+    4. related past messages  from other conversations / before the
+                              summary, best first, same rule as notes
+
+Given the same inputs the same prompt is produced, so what the model saw
+can be reproduced from the logged counts.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from recallai_backend.business.services.tokenizer import count_tokens, truncate_tokens
+from recallai_backend.domain.models.message import Message
+from recallai_backend.domain.models.note_hit import NoteHit
+
+logger = logging.getLogger(__name__)
+
+# Chat format framing per message (role + separators), as OpenAI counts it
+MESSAGE_OVERHEAD_TOKENS = 4
+# Every reply is primed with <|start|>assistant<|message|>
+REPLY_PRIMING_TOKENS = 3
+
+NOTES_HEADER = "--- NOTES CONTEXT ---\n"
+SUMMARY_HEADER = "--- CONVERSATION SO FAR (SUMMARY) ---\n"
+MEMORY_HEADER = "--- RELATED PAST MESSAGES ---\n"
+
+
+@dataclass
+class ContextReport:
+    budget: int
+    system: int = 0
+    summary: int = 0
+    history: int = 0
+    notes: int = 0
+    turns_used: int = 0
+    turns_total: int = 0
+    notes_used: int = 0
+    notes_total: int = 0
+    memories: int = 0
+    memories_used: int = 0
+    truncated: List[str] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return self.system + self.summary + self.history + self.notes + self.memories + REPLY_PRIMING_TOKENS
+
+
+class ContextBuilder:
+    def __init__(self, model: str, budget: int, min_note_tokens: int = 64):
+        self.model = model
+        self.budget = budget
+        self.min_note_tokens = min_note_tokens
+
+    def build(
+        self,
+        system_prompt: str,
+        history: Sequence[Message],
+        notes: Sequence[NoteHit],
+        summary: Optional[str] = None,
+        memories: Sequence[Message] = (),
+    ) -> Tuple[List[dict], List[NoteHit], ContextReport]:
+        """
+        history:  oldest → newest, ending with the current user turn
+                  (only the messages after the summary, if there is one).
+        notes:    search hits, best match first; only the matched span
+                  of each note goes into the prompt.
+        memories: past messages not in `history`, best match first.
+
+        Returns (messages for the completion API, notes actually included,
+        per-section report).
+        """
+        report = ContextReport(
+            budget=self.budget,
+            turns_total=len(history),
+            notes_total=len(notes),
+        )
+        remaining = self.budget - REPLY_PRIMING_TOKENS
+
+        # 1) System prompt
+        report.system = self._message_tokens(system_prompt)
+        remaining -= report.system
+
+        if summary:
+            summary = SUMMARY_HEADER + summary
+            report.summary = self._message_tokens(summary)
+            remaining -= report.summary
+
+        # 2) Turns, newest first
+        turns: List[dict] = []
+        for i, m in enumerate(reversed(history)):
+            cost = self._message_tokens(m.content)
+            content = m.content
+            if cost > remaining:
+                if i > 0:
+                    break
+                # Never drop the question being asked; keep its beginning
+                content = truncate_tokens(
+                    m.content, max(remaining - MESSAGE_OVERHEAD_TOKENS, 0), self.model
+                )
+                cost = self._message_tokens(content)
+                report.truncated.append(f"message:{m.id}")
+            turns.append({"role": m.role, "content": content})
+            report.history += cost
+            remaining -= cost
+        turns.reverse()
+        report.turns_used = len(turns)
+
+        messages = [{"role": "system", "content": system_prompt}]
+        if summary:
+            messages.append({"role": "system", "content": summary})
+
+        # 3) Notes, best first, in one system message
+        note_msg, used_notes, report.notes, remaining = self._fill_blocks(
+            NOTES_HEADER,
+            [(f"note:{h.note.id}", f"[NOTE {h.note.id}]\n{h.text}") for h in notes],
+            remaining,
+            report,
+        )
+        if note_msg:
+            messages.append(note_msg)
+        used_notes = [notes[i] for i in used_notes]
+        report.notes_used = len(used_notes)
+
+        # 4) Related past messages, best first, in one system message
+        memory_msg, used_memories, report.memories, remaining = self._fill_blocks(
+            MEMORY_HEADER,
+            [(f"memory:{m.id}", self._memory_block(m)) for m in memories],
+            remaining,
+            report,
+        )
+        if memory_msg:
+            messages.append(memory_msg)
+        report.memories_used = len(used_memories)
+
+        logger.info(
+            "chat context tokens: system=%d summary=%d history=%d (%d/%d turns) "
+            "notes=%d (%d/%d notes) memories=%d (%d) total=%d/%d truncated=%s",
+            report.system, report.summary, report.history, report.turns_used, report.turns_total,
+            report.notes, report.notes_used, report.notes_total,
+            report.memories, report.memories_used,
+            report.total, report.budget, report.truncated,
+        )
+
+        return messages + turns, used_notes, report
+
+    def _fill_blocks(
+        self,
+        header: str,
+        blocks: List[Tuple[str, str]],
+        remaining: int,
+        report: ContextReport,
+    ) -> Tuple[Optional[dict], List[int], int, int]:
+        """
+        Greedily pack (label, text) blocks into one system message.
+        Returns (message or None, indexes used, tokens spent, remaining).
+        """
+        framing = MESSAGE_OVERHEAD_TOKENS + count_tokens(header, self.model)
+        room = remaining - framing
+        texts: List[str] = []
+        used: List[int] = []
+        spent = 0
+
+        for i, (label, block) in enumerate(blocks):
+            # +2 for the "\n\n" joining blocks
+            cost = count_tokens(block, self.model) + 2
+            if cost > room:
+                if room - 2 < self.min_note_tokens:
+                    break
+                block = truncate_tokens(block, room - 2, self.model)
+                cost = count_tokens(block, self.model) + 2
+                report.truncated.append(label)
+            texts.append(block)
+            used.append(i)
+            spent += cost
+            room -= cost
+
+        if not texts:
+            return None, [], 0, remaining
+
+        spent += framing
+        message = {"role": "system", "content": header + "\n\n".join(texts)}
+        return message, used, spent, remaining - spent
+
+    @staticmethod
+    def _memory_block(m: Message) -> str:
+        when = m.created_at.strftime("%Y-%m-%d") if m.created_at else "earlier"
+        return f"[{when} · {m.role}]\n{m.content}"
+
+    def _message_tokens(self, content: str) -> int:
+        return count_tokens(content, self.model) + MESSAGE_OVERHEAD_TOKENS
@@ -6,6 +6,7 @@ from recallai_backend.domain.repositories.note_repository import NoteRepository
 from recallai_backend.domain.interfaces.i_conversation_repository import IConversationRepository
 from recallai_backend.domain.interfaces.i_note_repository import INoteRepository
 from recallai_backend.business.services.embedding_service import EmbeddingService
+from recallai_backend.business.services.ingestion_service import sync_note_chunks
 from recallai_backend.business.interfaces.i_conversation_service import IConversationService
 
 
@@ -19,28 +20,25 @@ class ConversationService(IConversationService):
     ):
         """
         For DI/installer:
-            pass conv_repo, note_repo, embedding_service (+ optionally db).
+            pass conv_repo, note_repo, embedding_service and db
+            (repositories only flush; this service commits).
 
         For legacy:
             pass db only and we construct repositories + embedding service internally.
         """
+        if db is None:
+            raise ValueError("ConversationService needs the db session to commit its writes.")
         self.db = db
 
         if conv_repo is not None:
             self.repo: IConversationRepository = conv_repo
         else:
-            if db is None:
-                raise ValueError("Either db or conv_repo must be provided to ConversationService.")
             self.repo = ConversationRepository(db)
 
         if note_repo is not None:
             self.note_repo: INoteRepository = note_repo
         else:
-            if db is None:
-                # Only needed when add_message_to_note is used
-                self.note_repo = None  # type: ignore[assignment]
-            else:
-                self.note_repo = NoteRepository(db)
+            self.note_repo = NoteRepository(db)
 
         self.embedding = embedding_service or EmbeddingService()
 
@@ -63,11 +61,13 @@ class ConversationService(IConversationService):
     # CREATE conversation
     def create(self, user_id: int, title: str | None = None) -> dict[str, Any]:
         conv = self.repo.create_conversation(user_id, title)
+        self.db.commit()
         return {"id": conv.id, "title": conv.title, "messages": []}
 
     # ADD message
     def add_message(self, conv_id: int, role: str, content: str) -> dict[str, Any]:
         msg = self.repo.add_message(conv_id, role, content)
+        self.db.commit()
         return {"id": msg.id, "role": msg.role, "content": msg.content}
 
     # GET by id
@@ -90,11 +90,14 @@ class ConversationService(IConversationService):
         conv = self.repo.rename(conv_id, title)
         if not conv:
             return None
+        self.db.commit()
         return {"id": conv.id, "title": conv.title}
 
     # DELETE
     def delete(self, conv_id: int) -> bool:
-        return self.repo.delete(conv_id)
+        deleted = self.repo.delete(conv_id)
+        self.db.commit()
+        return deleted
 
     # PAGINATED messages
     def get_messages_paginated(
@@ -119,7 +122,9 @@ class ConversationService(IConversationService):
 
     # Delete single message
     def delete_message(self, message_id: int) -> bool:
-        return self.repo.delete_message(message_id)
+        deleted = self.repo.delete_message(message_id)
+        self.db.commit()
+        return deleted
 
     # Add message content as a note
     def add_message_to_note(
@@ -128,9 +133,6 @@ class ConversationService(IConversationService):
         content: str,
         title: str | None = None,
     ) -> dict[str, Any]:
-        if self.note_repo is None or self.db is None:
-            raise ValueError("Note repository and db are required for add_message_to_note.")
-
         note_title = title or "Chat Snippet"
 
         note = self.note_repo.create_note(
@@ -140,8 +142,11 @@ class ConversationService(IConversationService):
             source="chat",
         )
 
-        vector = self.embedding.embed_text(content)
-        self.note_repo.save_embedding(note.id, vector)
+        sync_note_chunks(
+            embedding_service=self.embedding,
+            note_repo=self.note_repo,
+            notes=[(note.id, content)],
+        )
 
         self.db.commit()
 
@@ -0,0 +1,150 @@
+"""
+Rolling per-conversation summaries.
+
+A conversation's prompt is its stored summary plus the unsummarized tail.
+Once that tail grows past CHAT_SUMMARY_TRIGGER_MESSAGES, everything except
+the newest CHAT_SUMMARY_KEEP_RECENT messages is folded into the summary,
+so the prompt per turn stays roughly constant however long the
+conversation gets.
+
+The fold starts with the turn's completion and runs alongside it; once
+the answer is ready the request waits at most CHAT_SUMMARY_GRACE_SECONDS
+more for it. Nothing may outlive the request on Lambda, where the process
+is frozen once the response is sent, and the answer must not be held up
+against API Gateway's 30 s limit. A fold cut short is logged, keeps the
+batches it already committed, and the next long turn claims it again.
+
+Updates are incremental (previous summary + new messages → new summary).
+The conversation row is claimed with FOR NO KEY UPDATE SKIP LOCKED, so
+only one instance folds a conversation at a time, and the summary is
+written with compare-and-set on summary_message_id, so no update can lose
+or double-apply messages.
+"""
+
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from openai import AsyncOpenAI
+
+from recallai_backend.core.config import settings
+from recallai_backend.business.services.tokenizer import truncate_tokens
+from recallai_backend.domain.domain_installer import AsyncDomainInstaller
+from recallai_backend.domain.models.message import Message
+
+logger = logging.getLogger(__name__)
+
+async_client = AsyncOpenAI(api_key=settings.openai_api_key)
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and "
+    "RecallAI, their personal notes assistant. Update the summary with the "
+    "new messages. Keep facts, decisions, names, numbers and open questions; "
+    "drop pleasantries. Write plain prose, at most a few short paragraphs."
+)
+
+
+class ConversationSummarizer:
+    def __init__(self, async_domain: AsyncDomainInstaller, model: str | None = None):
+        self.async_domain = async_domain
+        self.model = model or settings.openai_chat_model
+
+    def start(self, conversation_id: int, unsummarized_count: int) -> Optional[asyncio.Task]:
+        """
+        Begin an update if the tail is long enough. The caller must hand the
+        task to finish() before its request ends.
+        """
+        if unsummarized_count <= settings.chat_summary_trigger_messages:
+            return None
+        return asyncio.create_task(
+            self.update(conversation_id), name=f"conversation {conversation_id} summary"
+        )
+
+    async def finish(self, task: Optional[asyncio.Task]) -> None:
+        """Wait for start()'s task, at most CHAT_SUMMARY_GRACE_SECONDS more; never raises."""
+        if task is None:
+            return
+        try:
+            await asyncio.wait_for(task, settings.chat_summary_grace_seconds)
+        except asyncio.TimeoutError:
+            # wait_for cancelled it; committed batches stay, the next turn goes on
+            logger.warning(
+                "Summary update still running %.1fs after the answer, cancelled (%s)",
+                settings.chat_summary_grace_seconds, task.get_name(),
+            )
+        except Exception:
+            # Best effort: the next turn will try again
+            logger.exception("Summary update failed (%s)", task.get_name())
+
+    async def update(self, conversation_id: int) -> bool:
+        """
+        Fold everything but the newest CHAT_SUMMARY_KEEP_RECENT messages,
+        oldest first, CHAT_HISTORY_FETCH_LIMIT messages per model call, so
+        a long backlog is caught up in order instead of skipped. Each
+        batch is committed on its own; returns whether any was applied.
+        """
+        applied = False
+        while True:
+            advanced, more = await self._fold_batch(conversation_id)
+            applied = applied or advanced
+            if not (advanced and more):
+                return applied
+
+    async def _fold_batch(self, conversation_id: int) -> Tuple[bool, bool]:
+        """One fold step → (applied, more messages may be left to fold)."""
+        keep = settings.chat_summary_keep_recent
+        batch = settings.chat_history_fetch_limit
+
+        async with self.async_domain.new_session() as db:
+            repo = self.async_domain.get_conversation_repository(db)
+
+            # None as well if another instance is folding it right now
+            conv = await repo.claim_for_summary(conversation_id)
+            if conv is None:
+                return False, False
+            previous_id = conv.summary_message_id
+            previous_summary = conv.summary
+
+            # Oldest first; the extra `keep` rows stand in for the newest
+            # messages, which stay verbatim whatever lies beyond them
+            rows = await repo.get_messages_after(
+                conversation_id, previous_id, limit=batch + keep, oldest_first=True
+            )
+            to_fold = rows[: max(len(rows) - keep, 0)]
+            if not to_fold:
+                return False, False
+
+            summary = await self._summarize(previous_summary, to_fold)
+
+            applied = await repo.update_summary(
+                conversation_id, summary, to_fold[-1].id, previous_id
+            )
+            await db.commit()
+
+        logger.info(
+            "Conversation %s summary %s through message %s (%d messages folded)",
+            conversation_id, "advanced" if applied else "skipped (stale)",
+            to_fold[-1].id, len(to_fold),
+        )
+        return applied, len(rows) == batch + keep
+
+    async def _summarize(self, previous: Optional[str], messages: List[Message]) -> str:
+        transcript = "\n".join(f"{m.role}: {m.content}" for m in messages)
+        # Bound the request however long individual messages were
+        transcript = truncate_tokens(transcript, settings.chat_context_max_tokens, self.model)
+
+        completion = await async_client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {
+                    "role": "user",
+                    "content": (
+                        f"Current summary:\n{previous or '(none yet)'}\n\n"
+                        f"New messages:\n{transcript}"
+                    ),
+                },
+            ],
+            max_tokens=settings.chat_summary_max_tokens,
+        )
+        return completion.choices[0].message.content.strip()
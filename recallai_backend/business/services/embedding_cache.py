@@ -0,0 +1,123 @@
+"""
+In-process tier of the embedding cache, plus the shared key scheme.
+
+Entries are keyed on (model, sha256 of normalized text). The LRU is bounded
+by bytes rather than entry count so the memory budget holds whatever the
+model's dimensionality is. The persistent tier lives in the
+`embedding_cache` table (EmbeddingCacheRepository); EmbeddingService
+consults this LRU first, then the table, then OpenAI.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import numpy as np
+
+from recallai_backend.core.config import settings
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Rough per-entry bookkeeping cost (OrderedDict node, key tuple, ndarray header)
+_ENTRY_OVERHEAD_BYTES = 200
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace/Unicode variants of the same text share one cache entry."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters for both tiers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def record(self, memory_hits: int = 0, db_hits: int = 0, misses: int = 0) -> None:
+        with self._lock:
+            self.memory_hits += memory_hits
+            self.db_hits += db_hits
+            self.misses += misses
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.db_hits) / lookups if lookups else 0.0,
+            }
+
+
+class LruVectorCache:
+    """Byte-bounded LRU of float32 vectors."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Tuple[str, str]) -> np.ndarray | None:
+        with self._lock:
+            vec = self._entries.get(key)
+            if vec is not None:
+                self._entries.move_to_end(key)
+            return vec
+
+    def put(self, key: Tuple[str, str], vector: np.ndarray) -> None:
+        cost = vector.nbytes + _ENTRY_OVERHEAD_BYTES
+        if cost > self.max_bytes:
+            return
+
+        # Cached arrays are shared between callers; freeze them
+        vector.setflags(write=False)
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes + _ENTRY_OVERHEAD_BYTES
+
+            self._entries[key] = vector
+            self._bytes += cost
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes + _ENTRY_OVERHEAD_BYTES
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# Process-wide: services are transient, the cache is not.
+memory_cache = LruVectorCache(settings.embedding_cache_max_bytes)
+cache_stats = CacheStats()
+
+
+def embedding_cache_stats() -> Dict[str, float]:
+    stats = cache_stats.snapshot()
+    stats["memory_entries"] = len(memory_cache)
+    stats["memory_bytes"] = memory_cache.size_bytes
+    return stats
@@ -1,16 +1,252 @@
-from openai import OpenAI
+import asyncio
+import base64
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from openai import AsyncOpenAI, OpenAI
 from recallai_backend.core.config import settings
+from recallai_backend.business.services.embedding_cache import (
+    cache_stats,
+    memory_cache,
+    text_hash,
+)
+from recallai_backend.business.services.tokenizer import encode, get_encoding
+from recallai_backend.domain.interfaces.i_embedding_cache_repository import (
+    IEmbeddingCacheRepository,
+    IAsyncEmbeddingCacheRepository,
+)
 
 client = OpenAI(api_key=settings.openai_api_key)
+async_client = AsyncOpenAI(api_key=settings.openai_api_key)
+
+logger = logging.getLogger(__name__)
+
+
+def decode_embedding(b64: str) -> np.ndarray:
+    # OpenAI's base64 encoding is little-endian float32
+    return np.frombuffer(base64.b64decode(b64), dtype="<f4").astype(np.float32)
+
+
+def pack_batches(
+    token_counts: Sequence[int],
+    max_inputs: int,
+    max_tokens: int,
+) -> List[List[int]]:
+    """
+    Greedily group input positions into requests that stay under both the
+    per-request input count and the per-request token total.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+
+    for i, n in enumerate(token_counts):
+        if current and (len(current) >= max_inputs or current_tokens + n > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += n
+
+    if current:
+        batches.append(current)
+    return batches
 
 
 class EmbeddingService:
-    def __init__(self, model: str | None = None):
+    """
+    OpenAI embeddings behind a two-tier cache:
+    process-local LRU → `embedding_cache` table (when a repo is given) → API.
+    """
+
+    def __init__(
+        self,
+        model: str | None = None,
+        cache_repo: IEmbeddingCacheRepository | None = None,
+    ):
         self.model = model or settings.openai_embedding_model
+        self.cache_repo = cache_repo
+
+    def embed_text(self, text: str) -> np.ndarray:
+        return self.embed_many([text])[0]
+
+    async def aembed_text(
+        self,
+        text: str,
+        cache_repo: IAsyncEmbeddingCacheRepository | None = None,
+    ) -> np.ndarray:
+        return (await self.aembed_many([text], cache_repo))[0]
+
+    def embed_many(self, texts: Sequence[str]) -> List[np.ndarray]:
+        """
+        Embed many texts, returning vectors in input order.
+
+        Cached and repeated inputs are resolved first; the remaining unique
+        texts are packed into token-aware requests sent in parallel.
+        """
+        hashes = [text_hash(t) for t in texts]
+        found, memory_hits = self._from_memory(hashes)
+
+        # Tier 2: embedding_cache table (one query for all remaining)
+        missing = {h for h in hashes if h not in found}
+        db_hits = 0
+        if missing and self.cache_repo is not None:
+            db_hits = self._remember(found, self.cache_repo.get_many(self.model, missing))
+
+        # Tier 3: OpenAI, one request per packed batch
+        to_embed = self._still_missing(hashes, texts, found)
+        cache_stats.record(memory_hits=memory_hits, db_hits=db_hits, misses=len(to_embed))
+
+        if to_embed:
+            fresh = self._request_many(to_embed)
+            self._remember(found, dict(fresh))
+            if self.cache_repo is not None:
+                self.cache_repo.put_many(self.model, fresh)
+
+        return [found[h] for h in hashes]
+
+    async def aembed_many(
+        self,
+        texts: Sequence[str],
+        cache_repo: IAsyncEmbeddingCacheRepository | None = None,
+    ) -> List[np.ndarray]:
+        """
+        Async embed_many on AsyncOpenAI. The persistent tier is the given
+        async cache repository (bound to the caller's AsyncSession).
+        """
+        hashes = [text_hash(t) for t in texts]
+        found, memory_hits = self._from_memory(hashes)
+
+        missing = {h for h in hashes if h not in found}
+        db_hits = 0
+        if missing and cache_repo is not None:
+            db_hits = self._remember(found, await cache_repo.get_many(self.model, missing))
+
+        to_embed = self._still_missing(hashes, texts, found)
+        cache_stats.record(memory_hits=memory_hits, db_hits=db_hits, misses=len(to_embed))
 
-    def embed_text(self, text: str) -> list[float]:
+        if to_embed:
+            fresh = await self._arequest_many(to_embed)
+            self._remember(found, dict(fresh))
+            if cache_repo is not None:
+                await cache_repo.put_many(self.model, fresh)
+
+        return [found[h] for h in hashes]
+
+    # ─────────────────────────────────────────────
+    # Cache tier helpers
+    # ─────────────────────────────────────────────
+    def _from_memory(self, hashes: List[str]) -> Tuple[Dict[str, np.ndarray], int]:
+        found: Dict[str, np.ndarray] = {}
+        for h in hashes:
+            if h not in found:
+                vec = memory_cache.get((self.model, h))
+                if vec is not None:
+                    found[h] = vec
+        return found, len(found)
+
+    def _remember(self, found: Dict[str, np.ndarray], vectors: Dict[str, np.ndarray]) -> int:
+        for h, vec in vectors.items():
+            memory_cache.put((self.model, h), vec)
+        found.update(vectors)
+        return len(vectors)
+
+    @staticmethod
+    def _still_missing(
+        hashes: List[str],
+        texts: Sequence[str],
+        found: Dict[str, np.ndarray],
+    ) -> List[Tuple[str, str]]:
+        to_embed: Dict[str, str] = {}
+        for h, t in zip(hashes, texts):
+            if h not in found and h not in to_embed:
+                to_embed[h] = t
+        return list(to_embed.items())
+
+    # ─────────────────────────────────────────────
+    # API calls
+    # ─────────────────────────────────────────────
+    def _pack(self, items: List[Tuple[str, str]]) -> Tuple[List[str], List[List[int]]]:
+        """Truncate over-long inputs and group them into request batches."""
+        inputs, token_counts = [], []
+        for _, t in items:
+            tokens = encode(t, self.model)
+            if len(tokens) > settings.embedding_max_input_tokens:
+                logger.warning(
+                    "Embedding input truncated from %d to %d tokens",
+                    len(tokens), settings.embedding_max_input_tokens,
+                )
+                tokens = tokens[: settings.embedding_max_input_tokens]
+                t = get_encoding(self.model).decode(tokens)
+            inputs.append(t)
+            token_counts.append(len(tokens))
+
+        batches = pack_batches(
+            token_counts,
+            max_inputs=settings.embedding_batch_max_inputs,
+            max_tokens=settings.embedding_batch_max_tokens,
+        )
+        return inputs, batches
+
+    @staticmethod
+    def _unpack(
+        items: List[Tuple[str, str]],
+        batches: List[List[int]],
+        results: List[List[np.ndarray]],
+    ) -> List[Tuple[str, np.ndarray]]:
+        vectors: List[np.ndarray] = [None] * len(items)  # type: ignore[list-item]
+        for batch, batch_vectors in zip(batches, results):
+            for i, vec in zip(batch, batch_vectors):
+                vectors[i] = vec
+        return [(h, vec) for (h, _), vec in zip(items, vectors)]
+
+    def _request_many(self, items: List[Tuple[str, str]]) -> List[Tuple[str, np.ndarray]]:
+        inputs, batches = self._pack(items)
+
+        def run(batch: List[int]) -> List[np.ndarray]:
+            return self._request([inputs[i] for i in batch])
+
+        if len(batches) == 1:
+            results = [run(batches[0])]
+        else:
+            workers = min(settings.embedding_max_concurrency, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(run, batches))
+
+        return self._unpack(items, batches, results)
+
+    async def _arequest_many(self, items: List[Tuple[str, str]]) -> List[Tuple[str, np.ndarray]]:
+        inputs, batches = self._pack(items)
+        limiter = asyncio.Semaphore(settings.embedding_max_concurrency)
+
+        async def run(batch: List[int]) -> List[np.ndarray]:
+            async with limiter:
+                return await self._arequest([inputs[i] for i in batch])
+
+        results = await asyncio.gather(*(run(b) for b in batches))
+        return self._unpack(items, batches, list(results))
+
+    def _request(self, inputs: List[str]) -> List[np.ndarray]:
         resp = client.embeddings.create(
             model=self.model,
-            input=text
+            input=inputs,
+            encoding_format="base64",
         )
-        return resp.data[0].embedding
+        return self._decode(resp, len(inputs))
+
+    async def _arequest(self, inputs: List[str]) -> List[np.ndarray]:
+        resp = await async_client.embeddings.create(
+            model=self.model,
+            input=inputs,
+            encoding_format="base64",
+        )
+        return self._decode(resp, len(inputs))
+
+    @staticmethod
+    def _decode(resp, n: int) -> List[np.ndarray]:
+        # The API documents `index`; don't rely on response order
+        out: List[np.ndarray] = [None] * n  # type: ignore[list-item]
+        for item in resp.data:
+            out[item.index] = decode_embedding(item.embedding)
+        return out
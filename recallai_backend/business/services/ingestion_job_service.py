@@ -0,0 +1,39 @@
+from typing import Iterable, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from recallai_backend.core.config import settings
+from recallai_backend.domain.interfaces.i_ingestion_job_repository import IIngestionJobRepository
+from recallai_backend.business.interfaces.i_ingestion_job_service import IIngestionJobService
+from recallai_backend.contracts.job_dtos import IngestionJobDTO
+
+
+class IngestionJobService(IIngestionJobService):
+    """
+    Enqueue side of background ingestion: stores the uploads and returns
+    the job for polling. IngestionWorker does the processing.
+    """
+
+    def __init__(self, job_repo: IIngestionJobRepository, db: Session):
+        self.repo = job_repo
+        self.db = db
+
+    def submit(
+        self,
+        user_id: int,
+        files: Iterable[Tuple[str, Optional[str], bytes]],
+        source: str | None = None,
+    ) -> IngestionJobDTO:
+        job = self.repo.create_job(
+            user_id,
+            files,
+            source=source,
+            max_attempts=settings.ingest_job_max_attempts,
+        )
+        self.db.commit()
+        return self.get_job(job.id)
+
+    def get_job(self, job_id: int) -> IngestionJobDTO | None:
+        job = self.repo.get_by_id(job_id)
+        if not job:
+            return None
+        return IngestionJobDTO.model_validate(job)
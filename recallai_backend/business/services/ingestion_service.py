@@ -1,13 +1,23 @@
 from __future__ import annotations
 
-import re
-from typing import List
 from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
 
+from recallai_backend.core.config import settings
+from recallai_backend.business.services.chunker import (
+    clean_text_stream,
+    iter_chunks,
+    iter_note_chunks,
+    locate_chunks,
+)
+from recallai_backend.business.services.embedding_cache import text_hash
 from recallai_backend.business.services.embedding_service import EmbeddingService
+from recallai_backend.business.services.near_duplicates import SimHashIndex, simhash
+from recallai_backend.domain.models.note import NewNote
 from recallai_backend.domain.repositories.note_repository import NoteRepository
-from recallai_backend.dtos.note_dtos import NoteCreateDTO
+from recallai_backend.contracts.note_dtos import NoteResponseDTO
 
 
 # ─────────────────────────────────────────────
@@ -16,54 +26,207 @@ from recallai_backend.dtos.note_dtos import NoteCreateDTO
 def clean_text(text: str) -> str:
     if not text:
         return ""
-
-    # Normalize line breaks
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
-
-    # Collapse 3+ newlines → 2
-    text = re.sub(r"\n{3,}", "\n\n", text)
-
-    # Strip trailing spaces
-    lines = [ln.rstrip() for ln in text.split("\n")]
-    text = "\n".join(lines)
-
-    return text.strip()
+    return "".join(clean_text_stream([text]))
 
 
 # ─────────────────────────────────────────────
-# CHUNK TEXT FOR VECTORS (best-practice)
+# CHUNK TEXT FOR VECTORS (token-sized, boundary-aware)
 # ─────────────────────────────────────────────
 def chunk_text(
     text: str,
-    max_chars: int = 2500,     # good for GPT-4o-embed
-    overlap: int = 400
+    max_tokens: int | None = None,
+    overlap_tokens: int | None = None,
 ) -> List[str]:
+    return list(iter_chunks([text], max_tokens=max_tokens, overlap_tokens=overlap_tokens))
 
-    text = text.strip()
-    if not text:
-        return []
 
-    chunks = []
-    start = 0
-    length = len(text)
+# ─────────────────────────────────────────────
+# INGESTION PIPELINE: text → chunks → dedup → embedding → DB
+# ─────────────────────────────────────────────
+@dataclass
+class IngestedBatch:
+    notes: List[NoteResponseDTO]  # created notes, in chunk order
+    chunks: int                   # chunks consumed (checkpoint unit)
+    duplicates: int               # of those, near-duplicates not embedded
+
+
+def iter_ingest(
+    *,
+    embedding_service: EmbeddingService,
+    note_repo: NoteRepository,
+    user_id: int,
+    source_filename: str,
+    pieces: Iterable[str],
+    source: str | None = None,
+    start_chunk: int = 0,
+    dedup_mode: str | None = None,
+) -> Iterator[IngestedBatch]:
+    """
+    Chunk a stream of text pieces (pages, slides, ...) lazily and embed
+    the chunks a batch at a time, yielding each batch once its notes are
+    written (bulk_create_with_embeddings: constant round trips per batch).
+    Only one batch of chunks is in memory at once. The caller commits.
+
+    Before embedding, chunks within INGEST_DEDUP_MAX_HAMMING SimHash bits
+    of one of the user's notes (or of an earlier chunk of this document)
+    are dropped ("skip") or stored unembedded with duplicate_of set
+    ("link"); dedup_mode overrides INGEST_DEDUP_MODE. Chunks without words
+    (signature 0: separators, table debris) are never deduplicated, as
+    they would all match each other.
 
-    while start < length:
-        end = min(start + max_chars, length)
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
+    `start_chunk` skips chunks already stored by an earlier run (chunking
+    is deterministic for the same text and settings), so a resumed job
+    neither re-embeds nor duplicates them.
+    """
+    chunks = islice(iter_chunks(pieces), start_chunk, None)
+    idx = start_chunk
+    source = source or source_filename
+    mode = dedup_mode or settings.ingest_dedup_mode
+    seen = SimHashIndex(settings.ingest_dedup_max_hamming) if mode != "off" else None
 
-        if end == length:
-            break
+    while True:
+        batch = list(islice(chunks, settings.ingest_batch_chunks))
+        if not batch:
+            return
 
-        start = max(0, end - overlap)
+        # Signatures are stored even with dedup off, so it can be enabled later
+        signatures = [simhash(chunk) for chunk in batch]
+        titles = [f"{source_filename} (part {idx + i})" for i in range(1, len(batch) + 1)]
+        idx += len(batch)
 
-    return chunks
+        kept = list(range(len(batch)))
+        of_note: Dict[int, int] = {}   # position → stored note it repeats
+        of_chunk: Dict[int, int] = {}  # position → earlier kept position in this batch
+        if seen is not None:
+            candidates = note_repo.find_simhash_candidates(user_id, [sig for sig in signatures if sig])
+            seen.add_many((sig, note_id) for note_id, sig in candidates if sig)
+            local = SimHashIndex(seen.max_hamming)
+            kept = []
+            for i, sig in enumerate(signatures):
+                if not sig:
+                    kept.append(i)
+                    continue
+                note_id = seen.find(sig)
+                if note_id is not None:
+                    of_note[i] = note_id
+                    continue
+                j = local.find(sig)
+                if j is not None:
+                    of_chunk[i] = j
+                    continue
+                local.add(sig, i)
+                kept.append(i)
+
+        # Batched, parallel, cache-aware
+        vectors = embedding_service.embed_many([batch[i] for i in kept]) if kept else []
+
+        new_notes = {
+            i: NewNote(
+                title=titles[i],
+                content=batch[i],
+                source=source,
+                vector=vector,
+                content_hash=text_hash(batch[i]),
+                simhash=signatures[i],
+            )
+            for i, vector in zip(kept, vectors)
+        }
+        ids = dict(zip(kept, note_repo.bulk_create_with_embeddings(user_id, list(new_notes.values()))))
+        if seen is not None:
+            seen.add_many((signatures[i], ids[i]) for i in kept if signatures[i])
+
+        if mode == "link" and (of_note or of_chunk):
+            linked = {
+                i: NewNote(
+                    title=titles[i],
+                    content=batch[i],
+                    source=source,
+                    vector=None,
+                    content_hash=text_hash(batch[i]),
+                    simhash=signatures[i],
+                    duplicate_of=of_note[i] if i in of_note else ids[of_chunk[i]],
+                )
+                for i in sorted([*of_note, *of_chunk])
+            }
+            ids.update(zip(linked, note_repo.bulk_create_with_embeddings(user_id, list(linked.values()))))
+            new_notes.update(linked)
+
+        yield IngestedBatch(
+            notes=[
+                NoteResponseDTO(
+                    id=ids[i],
+                    user_id=user_id,
+                    title=n.title,
+                    content=n.content,
+                    source=n.source,
+                    duplicate_of=n.duplicate_of,
+                )
+                for i, n in sorted(new_notes.items())
+            ],
+            chunks=len(batch),
+            duplicates=len(of_note) + len(of_chunk),
+        )
+
+
+# (char_start, char_end) of a chunk in its note; (None, None) if not found
+Span = Tuple[Optional[int], Optional[int]]
 
 
 # ─────────────────────────────────────────────
-# INGESTION PIPELINE: text → chunks → embedding → DB
+# NOTE EMBEDDINGS: re-embed only the chunks that changed
 # ─────────────────────────────────────────────
+def sync_note_chunks(
+    *,
+    embedding_service: EmbeddingService,
+    note_repo: NoteRepository,
+    notes: Sequence[Tuple[int, str]],
+) -> int:
+    """
+    Bring the chunk embeddings of (note_id, content) pairs up to date.
+
+    Each note is re-chunked (content-defined boundaries, so an edit only
+    moves the chunks around it) and every chunk whose hash differs from
+    the one stored at its index is embedded, all in one embed_many call.
+    A chunk that merely shifted index is served by the embedding cache.
+    Unchanged chunks that moved within the note only get new offsets.
+    Trailing chunks the note no longer has are deleted. Flushes only;
+    returns the number of chunks re-embedded.
+    """
+    stored = note_repo.get_chunks([note_id for note_id, _ in notes])
+
+    pending: List[Tuple[int, int, str, Span, str]] = []  # note_id, index, hash, span, chunk
+    moved = {}
+    counts = {}
+    for note_id, content in notes:
+        chunks = list(iter_note_chunks([content]))
+        counts[note_id] = len(chunks)
+        for idx, (chunk, span) in enumerate(zip(chunks, locate_chunks(content, chunks))):
+            h = text_hash(chunk)
+            span = span or (None, None)
+            old = stored[note_id].get(idx)
+            if old is None or old.content_hash != h:
+                pending.append((note_id, idx, h, span, chunk))
+            elif (old.char_start, old.char_end) != span:
+                # Same text, shifted by an edit before it: only the offsets change
+                moved.setdefault(note_id, []).append((idx, *span))
+
+    vectors = embedding_service.embed_many([chunk for *_, chunk in pending]) if pending else []
+
+    by_note = {}
+    for (note_id, idx, h, span, _), vector in zip(pending, vectors):
+        by_note.setdefault(note_id, []).append((idx, h, *span, vector))
+    for note_id, rows in by_note.items():
+        note_repo.upsert_chunks(note_id, rows)
+    for note_id, spans in moved.items():
+        note_repo.move_chunks(note_id, spans)
+
+    for note_id, count in counts.items():
+        if any(idx >= count for idx in stored[note_id]):
+            note_repo.delete_chunks_from(note_id, count)
+
+    return len(pending)
+
+
 def ingest_text(
     *,
     db: Session,
@@ -71,39 +234,27 @@ def ingest_text(
     note_repo: NoteRepository,
     user_id: int,
     source_filename: str,
-    raw_text: str
+    raw_text: str | Iterable[str]
 ) -> List[int]:
     """
+    raw_text may be a string or a stream of pieces (see iter_ingest).
+
     Returns list of created note IDs.
     """
 
-    cleaned = clean_text(raw_text)
-    chunks = chunk_text(cleaned)
+    pieces = [raw_text] if isinstance(raw_text, str) else raw_text
 
-    created_ids = []
-
-    for idx, chunk in enumerate(chunks):
-        title = f"{source_filename} (part {idx + 1})"
-
-        # 1. Create note row
-        dto = NoteCreateDTO(
+    created_ids = [
+        note.id
+        for batch in iter_ingest(
+            embedding_service=embedding_service,
+            note_repo=note_repo,
             user_id=user_id,
-            title=title,
-            content=chunk,
-            source=source_filename,
-        )
-        note = note_repo.create_note(
-            user_id=dto.user_id,
-            title=dto.title,
-            content=dto.content,
-            source=dto.source
+            source_filename=source_filename,
+            pieces=pieces,
         )
-
-        # 2. Embed immediately
-        vector = embedding_service.embed_text(chunk)
-        note_repo.save_embedding(note.id, vector)
-
-        created_ids.append(note.id)
+        for note in batch.notes
+    ]
 
     db.commit()
 
@@ -0,0 +1,240 @@
+"""
+Background processing of ingestion jobs (POST /jobs).
+
+A worker claims the next job with FOR UPDATE SKIP LOCKED, takes a lease
+on it and ingests its files in order: extract → chunk → embed → notes.
+Every stored batch of chunks is committed together with the job's
+checkpoint, so a retried or reclaimed job resumes at the first chunk not
+yet stored, without re-embedding or duplicating anything.
+
+Failures requeue the job with exponential backoff until
+INGEST_JOB_MAX_ATTEMPTS is reached; on the last attempt a file that still
+fails is marked failed and the rest of the job carries on. A worker that
+dies mid-job stops renewing its lease, and the job becomes claimable
+again after INGEST_JOB_LEASE_SECONDS.
+
+Run any number of these against the app's DATABASE_URL (plain Postgres
+plus pgvector for the notes themselves):
+
+    python -m recallai_backend.business.services.ingestion_worker           # poll forever
+    python -m recallai_backend.business.services.ingestion_worker --once    # drain the queue and exit
+
+On AWS, lambda_handler drains the queue on a schedule (template.yaml).
+"""
+
+import argparse
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from recallai_backend.core.config import settings
+from recallai_backend.core.db import SessionLocal
+from recallai_backend.business.services.ingestion_service import iter_ingest
+from recallai_backend.domain.domain_installer import DomainInstaller
+from recallai_backend.domain.models.ingestion_job import FAILED, SUCCEEDED
+from recallai_backend.domain.repositories.ingestion_job_repository import IngestionJobRepository
+from recallai_backend.utils.file_extractor import ExtractionCache, is_image
+
+logger = logging.getLogger(__name__)
+
+# Stop claiming new jobs this long before a Lambda invocation times out
+LAMBDA_SAFETY_SECONDS = 60
+
+
+class LeaseLost(Exception):
+    """Our lease expired and another worker took the job over."""
+
+
+class IngestionWorker:
+    def __init__(
+        self,
+        worker_id: str | None = None,
+        lease_seconds: int | None = None,
+        session_factory: sessionmaker = SessionLocal,
+    ):
+        self.worker_id = worker_id or f"{socket.gethostname()[:40]}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds or settings.ingest_job_lease_seconds
+        self.session_factory = session_factory
+
+    # ─────────────────────────────────────────────
+    # LOOPS
+    # ─────────────────────────────────────────────
+    def run_once(self) -> Optional[int]:
+        """Claim and process one job; returns its id, or None if the queue is empty."""
+        with self.session_factory() as db:
+            repo = IngestionJobRepository(db)
+            job_id = repo.claim(self.worker_id, self.lease_seconds)
+            db.commit()
+            if job_id is None:
+                return None
+            self._process(db, repo, job_id)
+        return job_id
+
+    def drain(self, deadline: float | None = None) -> int:
+        """Process jobs until the queue is empty (or time.monotonic() passes `deadline`)."""
+        processed = 0
+        while deadline is None or time.monotonic() < deadline:
+            if self.run_once() is None:
+                break
+            processed += 1
+        return processed
+
+    def run_forever(self, poll_seconds: float | None = None) -> None:
+        poll_seconds = poll_seconds or settings.ingest_job_poll_seconds
+        logger.info("Ingestion worker %s polling every %gs", self.worker_id, poll_seconds)
+        while True:
+            try:
+                if self.drain() == 0:
+                    time.sleep(poll_seconds)
+            except Exception:
+                # DB unreachable etc.: back off and keep the worker alive
+                logger.exception("Ingestion worker loop failed")
+                time.sleep(poll_seconds)
+
+    # ─────────────────────────────────────────────
+    # ONE JOB
+    # ─────────────────────────────────────────────
+    def _process(self, db: Session, repo: IngestionJobRepository, job_id: int) -> None:
+        job = repo.get_by_id(job_id)
+        attempts, max_attempts = job.attempts, job.max_attempts
+
+        if attempts > max_attempts:
+            # Only reachable through lease expiry: the job kills its worker
+            repo.complete(job_id, self.worker_id, error="Gave up: no attempt finished before its lease expired")
+            db.commit()
+            return
+
+        logger.info("Job %s: attempt %d/%d on %s", job_id, attempts, max_attempts, self.worker_id)
+        try:
+            failed, total = self._run_files(
+                db, repo, job_id, job.user_id, job.source, last_attempt=attempts >= max_attempts
+            )
+        except LeaseLost:
+            db.rollback()
+            logger.warning("Job %s: lease lost, leaving it to its new owner", job_id)
+            return
+        except Exception as e:
+            db.rollback()
+            delay = settings.ingest_job_retry_base_seconds * 2 ** (attempts - 1)
+            repo.retry_or_fail(job_id, self.worker_id, f"{type(e).__name__}: {e}", delay)
+            db.commit()
+            logger.exception("Job %s: attempt %d failed", job_id, attempts)
+            return
+
+        repo.complete(job_id, self.worker_id, error=f"{failed} of {total} files failed" if failed else None)
+        db.commit()
+        logger.info("Job %s: done (%d/%d files ok)", job_id, total - failed, total)
+
+    def _run_files(
+        self,
+        db: Session,
+        repo: IngestionJobRepository,
+        job_id: int,
+        user_id: int,
+        source: str | None,
+        last_attempt: bool,
+    ) -> tuple[int, int]:
+        domain = DomainInstaller(db)
+        note_repo = domain.get_note_repository()
+        embedding_service = domain.get_embedding_service()
+
+        # Plain values: every commit below expires ORM state
+        files = [
+            (f.id, f.filename, f.content_type, f.status, f.chunks_done)
+            for f in repo.get_files(job_id)
+        ]
+        failed = 0
+
+        for file_id, filename, content_type, status, chunks_done in files:
+            if status == FAILED:
+                failed += 1
+            if status in (SUCCEEDED, FAILED):
+                continue
+
+            try:
+                pieces = self._pieces(db, repo, file_id, filename, content_type)
+
+                done = chunks_done
+                for batch in iter_ingest(
+                    embedding_service=embedding_service,
+                    note_repo=note_repo,
+                    user_id=user_id,
+                    source_filename=filename,
+                    pieces=pieces,
+                    source=source,
+                    start_chunk=chunks_done,
+                ):
+                    done += batch.chunks
+                    # The batch's notes, their embeddings and the checkpoint commit together
+                    if not repo.checkpoint(
+                        job_id, file_id, done, self.worker_id, self.lease_seconds, added=batch.chunks
+                    ):
+                        raise LeaseLost()
+                    db.commit()
+
+                if not repo.finish_file(job_id, file_id, self.worker_id):
+                    raise LeaseLost()
+                db.commit()
+
+            except LeaseLost:
+                raise
+            except Exception as e:
+                if not last_attempt:
+                    raise
+                # Out of retries: give up on this file, keep the others going
+                db.rollback()
+                logger.exception("Job %s: %s failed on the last attempt", job_id, filename)
+                if not repo.finish_file(job_id, file_id, self.worker_id, error=f"{type(e).__name__}: {e}"):
+                    raise LeaseLost()
+                db.commit()
+                failed += 1
+
+        return failed, len(files)
+
+    def _pieces(
+        self,
+        db: Session,
+        repo: IngestionJobRepository,
+        file_id: int,
+        filename: str,
+        content_type: str | None,
+    ) -> Iterable[str]:
+        cache = ExtractionCache(DomainInstaller(db).get_extraction_cache_repository())
+
+        if is_image(filename, content_type):
+            # OCR is paid for once; retries reuse the stored text
+            text = repo.get_extracted_text(file_id)
+            if text is None:
+                text = cache.ocr(repo.get_file_data(file_id), content_type or "image/png") or ""
+                repo.save_extracted_text(file_id, text)
+                db.commit()
+            return [text]
+
+        # Stored by the commit after the file's last batch
+        return cache.extract(repo.get_file_data(file_id) or b"", filename, settings.pdf_backend)
+
+
+def lambda_handler(event, context):
+    """Scheduled entry point: drain the queue within this invocation's time limit."""
+    logging.getLogger().setLevel(logging.INFO)
+    deadline = time.monotonic() + context.get_remaining_time_in_millis() / 1000 - LAMBDA_SAFETY_SECONDS
+    return {"processed": IngestionWorker().drain(deadline)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="drain the queue, then exit")
+    parser.add_argument("--poll", type=float, default=None, help="seconds between polls of an empty queue")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    worker = IngestionWorker()
+    if args.once:
+        print(f"processed {worker.drain()} jobs")
+    else:
+        worker.run_forever(args.poll)
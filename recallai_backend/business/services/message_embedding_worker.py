@@ -0,0 +1,108 @@
+"""
+Background embedding of chat messages (long-term memory).
+
+ConversationRepository.add_message hands each committed message id to
+submit(); a daemon thread drains the queue in batches, embeds the
+messages through EmbeddingService (same cache tiers as notes) and writes
+`message_embeddings` rows on its own session. Nothing here runs on the
+request path.
+
+The queue is in-process: ids still pending when a process dies (or a
+Lambda container is reclaimed) are picked up by a backfill:
+
+    python -m recallai_backend.business.services.message_embedding_worker
+"""
+
+import logging
+import queue
+import threading
+from typing import List, Optional
+
+from recallai_backend.core.config import settings
+from recallai_backend.core.db import SessionLocal
+from recallai_backend.business.services.embedding_service import EmbeddingService
+from recallai_backend.domain.repositories.embedding_cache_repository import EmbeddingCacheRepository
+from recallai_backend.domain.repositories.message_embedding_repository import MessageEmbeddingRepository
+
+logger = logging.getLogger(__name__)
+
+
+class MessageEmbeddingWorker:
+    def __init__(self, batch_size: int | None = None):
+        self.batch_size = batch_size or settings.message_embedding_batch_size
+        self._queue: "queue.Queue[int]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, message_id: int) -> None:
+        """Non-blocking; safe to call from a post-commit hook."""
+        self._queue.put(message_id)
+        self._ensure_started()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._loop, name="message-embedding-worker", daemon=True
+                )
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            ids = [self._queue.get()]
+            while len(ids) < self.batch_size:
+                try:
+                    ids.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self.embed(ids)
+            except Exception:
+                # Left for the backfill; keep the worker alive
+                logger.exception("Embedding %d messages failed", len(ids))
+
+    def embed(self, message_ids: Optional[List[int]] = None) -> int:
+        """
+        Embed the given messages (or, with None, the next batch of any
+        messages without a vector). Returns how many were written.
+        """
+        with SessionLocal() as db:
+            repo = MessageEmbeddingRepository(db)
+            pending = repo.find_unembedded(message_ids, limit=self.batch_size)
+            if not pending:
+                return 0
+
+            embedding = EmbeddingService(cache_repo=EmbeddingCacheRepository(db))
+            vectors = embedding.embed_many([content for _, content in pending])
+
+            repo.save_many(zip((mid for mid, _ in pending), vectors))
+            db.commit()
+
+        return len(pending)
+
+    def backfill(self) -> int:
+        total = 0
+        while True:
+            n = self.embed(None)
+            if n == 0:
+                return total
+            total += n
+            logger.info("Backfilled %d message embeddings", total)
+
+
+_worker: Optional[MessageEmbeddingWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_message_embedding_worker() -> MessageEmbeddingWorker:
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = MessageEmbeddingWorker()
+        return _worker
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(f"embedded {get_message_embedding_worker().backfill()} messages")
@@ -0,0 +1,91 @@
+"""
+SimHash signatures for near-duplicate chunk detection at ingest.
+
+A chunk's signature is the 64-bit SimHash of its lower-cased word
+3-shingles: re-uploading a lightly revised document yields chunks whose
+signatures differ in only a few bits. Lookup is LSH by banding: the
+signature is cut into SIMHASH_BANDS 16-bit bands (layout and SQL in
+domain/models/note.py) and two signatures are candidates when any band
+is equal. By pigeonhole, every pair within
+SIMHASH_BANDS - 1 bits shares a band, so up to that distance nothing is
+missed; candidates are then confirmed by exact Hamming distance.
+
+Signatures are stored signed (Postgres BIGINT); band extraction masks
+the sign away, so SQL and Python agree on band values.
+"""
+
+import hashlib
+import re
+from typing import Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from recallai_backend.domain.models.note import SIMHASH_BAND_BITS, SIMHASH_BANDS, simhash_bands
+
+SIMHASH_BITS = SIMHASH_BANDS * SIMHASH_BAND_BITS
+
+SHINGLE_WORDS = 3
+
+_WORD = re.compile(r"\w+")
+_SHIFTS = np.arange(SIMHASH_BITS, dtype=np.uint64)
+
+T = TypeVar("T")
+
+
+def simhash(text: str) -> int:
+    """Signed 64-bit SimHash of the text's word shingles (0 for empty text)."""
+    words = _WORD.findall(text.lower())
+    if not words:
+        return 0
+    shingles = (
+        [" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)]
+        if len(words) >= SHINGLE_WORDS
+        else [" ".join(words)]
+    )
+
+    # blake2b, not hash(): signatures are persisted and compared across processes
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    ones = ((hashes[:, None] >> _SHIFTS) & np.uint64(1)).sum(axis=0)
+
+    value = 0
+    for bit in np.flatnonzero(2 * ones > len(shingles)):
+        value |= 1 << int(bit)
+    return _signed(value)
+
+
+def hamming(a: int, b: int) -> int:
+    return ((a ^ b) & ((1 << SIMHASH_BITS) - 1)).bit_count()
+
+
+def _signed(value: int) -> int:
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+
+class SimHashIndex(Generic[T]):
+    """In-memory LSH over signatures; values are whatever identifies a match."""
+
+    def __init__(self, max_hamming: int):
+        self.max_hamming = max_hamming
+        self._bands: List[Dict[int, List[Tuple[int, T]]]] = [{} for _ in range(SIMHASH_BANDS)]
+
+    def add(self, signature: int, value: T) -> None:
+        for table, band in zip(self._bands, simhash_bands(signature)):
+            table.setdefault(band, []).append((signature, value))
+
+    def add_many(self, items: Iterable[Tuple[int, T]]) -> None:
+        for signature, value in items:
+            self.add(signature, value)
+
+    def find(self, signature: int) -> Optional[T]:
+        """The closest indexed value within max_hamming bits, if any."""
+        best: Optional[Tuple[int, T]] = None
+        for table, band in zip(self._bands, simhash_bands(signature)):
+            for other, value in table.get(band, ()):
+                distance = hamming(signature, other)
+                if distance <= self.max_hamming and (best is None or distance < best[0]):
+                    best = (distance, value)
+        return best[1] if best else None
@@ -1,14 +1,17 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import Iterable, Optional, List
 from sqlalchemy.orm import Session
 
 from recallai_backend.domain.repositories.note_repository import NoteRepository
 from recallai_backend.domain.interfaces.i_note_repository import INoteRepository
 from recallai_backend.business.services.embedding_service import EmbeddingService
+from recallai_backend.business.services.ingestion_service import iter_ingest, sync_note_chunks
 from recallai_backend.business.interfaces.i_note_service import INoteService
 from recallai_backend.contracts.note_dtos import (
     NoteCreateDTO,
     NoteUpdateDTO,
     NoteResponseDTO,
+    NoteHitDTO,
 )
 
 
@@ -45,22 +48,62 @@ class NoteService(INoteService):
 
     # CREATE
     def create_note(self, dto: NoteCreateDTO) -> NoteResponseDTO:
-        note = self.repo.create_note(
-            user_id=dto.user_id,
-            title=dto.title,
-            content=dto.content,
-            source=dto.source,
-        )
+        return self.create_notes([dto])[0]
+
+    # CREATE many (one batched embedding pass, one commit)
+    def create_notes(self, dtos: List[NoteCreateDTO]) -> List[NoteResponseDTO]:
+        notes = [
+            self.repo.create_note(
+                user_id=dto.user_id,
+                title=dto.title,
+                content=dto.content,
+                source=dto.source,
+            )
+            for dto in dtos
+        ]
+
+        if self.embedding_service and notes:
+            sync_note_chunks(
+                embedding_service=self.embedding_service,
+                note_repo=self.repo,
+                notes=[(note.id, dto.content) for note, dto in zip(notes, dtos)],
+            )
+
+        if self.db:
+            self.db.commit()
+            for note in notes:
+                self.db.refresh(note)
 
-        if self.embedding_service:
-            vector = self.embedding_service.embed_text(dto.content)
-            self.repo.save_embedding(note.id, vector)
+        return [NoteResponseDTO.model_validate(n) for n in notes]
+
+    # INGEST a document stream (chunked, embedded a batch at a time, one commit)
+    def ingest_document(
+        self,
+        user_id: int,
+        filename: str,
+        pieces: Iterable[str],
+        source: str | None = None,
+    ) -> List[NoteResponseDTO]:
+        if self.embedding_service is None:
+            raise ValueError("NoteService needs an embedding_service to ingest documents.")
+
+        created = [
+            note
+            for batch in iter_ingest(
+                embedding_service=self.embedding_service,
+                note_repo=self.repo,
+                user_id=user_id,
+                source_filename=filename,
+                pieces=pieces,
+                source=source,
+            )
+            for note in batch.notes
+        ]
 
         if self.db:
             self.db.commit()
-            self.db.refresh(note)
 
-        return NoteResponseDTO.model_validate(note)
+        return created
 
     # GET single
     def get_note(self, note_id: int) -> NoteResponseDTO | None:
@@ -80,9 +123,13 @@ class NoteService(INoteService):
         if not note:
             return None
 
+        # Only the chunks the edit touched are re-embedded
         if dto.content is not None and self.embedding_service:
-            vector = self.embedding_service.embed_text(dto.content)
-            self.repo.save_embedding(note.id, vector)
+            sync_note_chunks(
+                embedding_service=self.embedding_service,
+                note_repo=self.repo,
+                notes=[(note.id, dto.content)],
+            )
 
         if self.db:
             self.db.commit()
@@ -92,9 +139,47 @@ class NoteService(INoteService):
 
     # DELETE
     def delete_note(self, note_id: int) -> bool:
+        # "link" duplicates have no embedding of their own: the first one
+        # takes this note's place and is embedded, in the same commit
+        promoted = self.repo.promote_duplicate(note_id)
+        if promoted is not None and self.embedding_service:
+            sync_note_chunks(
+                embedding_service=self.embedding_service,
+                note_repo=self.repo,
+                notes=[(promoted.id, promoted.content)],
+            )
+
         return self.repo.delete_note(note_id)
 
     # SEARCH
-    def search_notes(self, vector: list[float], top_k: int = 5):
-        notes = self.repo.search_by_vector(vector, top_k)
-        return [NoteResponseDTO.model_validate(n) for n in notes]
+    def search_notes(
+        self,
+        vector: list[float],
+        top_k: int = 5,
+        *,
+        user_id: int,
+        source: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        query_text: str | None = None,
+    ):
+        hits = self.repo.search_chunks(
+            vector,
+            top_k,
+            user_id=user_id,
+            source=source,
+            created_after=created_after,
+            created_before=created_before,
+            query_text=query_text,
+        )
+        return [
+            NoteHitDTO(
+                **NoteResponseDTO.model_validate(h.note).model_dump(),
+                chunk_index=h.chunk_index,
+                char_start=h.char_start,
+                char_end=h.char_end,
+                snippet=h.text,
+                distance=h.distance,
+            )
+            for h in hits
+        ]
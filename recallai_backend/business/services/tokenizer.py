@@ -0,0 +1,40 @@
+"""
+Local token counting (tiktoken) shared by embedding batching and prompt
+budgeting, so sizes are measured the way OpenAI will bill and limit them.
+
+tiktoken downloads each BPE file on first use; point TIKTOKEN_CACHE_DIR at
+a directory shipped with the deployment to avoid that on cold starts.
+"""
+
+from functools import lru_cache
+from typing import List
+
+import tiktoken
+
+_FALLBACK_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str | None = None) -> tiktoken.Encoding:
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass
+    return tiktoken.get_encoding(_FALLBACK_ENCODING)
+
+
+def encode(text: str, model: str | None = None) -> List[int]:
+    # disallowed_special=() → treat "<|endoftext|>" etc. in user text as plain text
+    return get_encoding(model).encode(text, disallowed_special=())
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    return len(encode(text, model))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str | None = None) -> str:
+    tokens = encode(text, model)
+    if len(tokens) <= max_tokens:
+        return text
+    return get_encoding(model).decode(tokens[:max_tokens])
@@ -26,6 +26,7 @@ class ChatResponseDTO(BaseModel):
     sources: List[ChatAnswerSource] = []
     attachments: List[ChatAttachmentDTO] = []
     message_id: Optional[int] = None
+    conversation_id: Optional[int] = None
 
 
 class DeleteMessageDTO(BaseModel):
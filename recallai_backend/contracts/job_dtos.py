@@ -0,0 +1,34 @@
+# recallai_backend/contracts/job_dtos.py
+
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class IngestionJobFileDTO(BaseModel):
+    filename: str
+    status: str
+    chunks_done: int
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class IngestionJobDTO(BaseModel):
+    id: int
+    user_id: int
+    status: str                 # queued | running | succeeded | failed
+    attempts: int
+    max_attempts: int
+    total_files: int
+    files_done: int
+    chunks_done: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    files: List[IngestionJobFileDTO] = []
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,6 @@
 # recallai_backend/contracts/note_dtos.py
 
+from datetime import datetime
 from typing import Optional, List
 from pydantic import BaseModel
 
@@ -17,11 +18,34 @@ class NoteResponseDTO(BaseModel):
     title: Optional[str]
     content: str
     source: Optional[str]
+    duplicate_of: Optional[int] = None
 
     class Config:
         from_attributes = True
 
 
+class NoteHitDTO(NoteResponseDTO):
+    """A search result: the note plus the span of its best-matching chunk."""
+
+    chunk_index: int
+    char_start: Optional[int] = None
+    char_end: Optional[int] = None
+    snippet: str
+    distance: float
+
+
+class BulkUploadErrorDTO(BaseModel):
+    """A file of a /notes/bulk upload that produced no notes, and why."""
+
+    filename: str
+    error: str
+
+
+class BulkUploadResponseDTO(BaseModel):
+    notes: List[NoteResponseDTO]
+    errors: List[BulkUploadErrorDTO] = []
+
+
 class NoteGetDTO(BaseModel):
     note_id: int
 
@@ -43,3 +67,8 @@ class NoteDeleteDTO(BaseModel):
 class NoteSearchDTO(BaseModel):
     vector: List[float]
     top_k: int = 5
+    user_id: int
+    source: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    query: Optional[str] = None     # set: hybrid search (full-text + vector, RRF)
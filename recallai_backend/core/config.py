@@ -20,6 +20,77 @@ class Settings(BaseSettings):
     openai_chat_model: str = "gpt-4.1-mini"
     openai_embedding_model: str = "text-embedding-3-small"
 
+    # Vector search backend: "pgvector" (exact SQL) or "hnsw" (in-process ANN)
+    vector_search_backend: str = "pgvector"
+    hnsw_m: int = 16                   # graph degree (memory vs recall)
+    hnsw_ef_construction: int = 200    # build-time candidate list size
+    hnsw_ef_search: int = 64           # query-time candidate list size
+    hnsw_max_age_seconds: int = 300    # rebuild a user partition after this long
+
+    # Embedding cache (in-process LRU tier; the DB tier is unbounded)
+    embedding_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # Embedding request packing (OpenAI per-request limits)
+    embedding_batch_max_inputs: int = 2048
+    embedding_batch_max_tokens: int = 300_000
+    embedding_max_input_tokens: int = 8191
+    embedding_max_concurrency: int = 4
+
+    # Ingestion chunking (tokens; overlap is whole trailing sentences)
+    chunk_max_tokens: int = 512
+    chunk_overlap_tokens: int = 0
+    ingest_batch_chunks: int = 64      # chunks embedded per embed_many call
+
+    # Near-duplicate chunks at ingest (SimHash): "link" stores them unembedded
+    # with duplicate_of set (promoted if the original is deleted), "skip" drops
+    # them (their text is gone once the original is deleted), "off" keeps all
+    ingest_dedup_mode: str = "link"
+    ingest_dedup_max_hamming: int = 3  # of 64 bits; LSH recall is exact up to 3
+
+    # Bulk upload extraction (process pool; 0 workers = one per available core)
+    extraction_workers: int = 0
+    extraction_timeout_seconds: float = 120.0
+    pdf_backend: str = "pdfium"        # pdfium | pdfminer | pdfplumber (layout-sensitive)
+
+    # Background ingestion jobs (POST /jobs, IngestionWorker)
+    ingest_job_max_attempts: int = 3
+    ingest_job_lease_seconds: int = 300       # a silent worker's job is reclaimed after this
+    ingest_job_retry_base_seconds: float = 30.0  # doubled per attempt
+    ingest_job_poll_seconds: float = 5.0
+
+    # Images before vision calls (chat attachments, OCR): gpt-4o high detail
+    # sees at most 2048 px long side / 768 px short side
+    image_max_long_side: int = 2048
+    image_max_short_side: int = 768
+    image_format: str = "jpeg"         # jpeg | webp (webp is always used for alpha)
+    image_quality: int = 85
+    image_cache_max_bytes: int = 32 * 1024 * 1024
+
+    # OCR of bulk-uploaded images: images per gpt-4o request, concurrent requests
+    ocr_batch_images: int = 4
+    ocr_batch_max_bytes: int = 8 * 1024 * 1024   # base64 data URLs per request
+    ocr_concurrency: int = 4
+
+    # Chat PDF attachments: an uploaded file_id is reused for the same bytes this long
+    openai_file_ttl_seconds: int = 7 * 24 * 3600
+
+    # Note retrieval for chat: "hybrid" (full-text + vector, RRF) or "vector"
+    chat_search_mode: str = "hybrid"
+
+    # Chat prompt assembly (system → newest turns → notes, in tokens)
+    chat_context_max_tokens: int = 16_000
+    chat_history_fetch_limit: int = 200
+
+    # Rolling conversation summary
+    chat_summary_trigger_messages: int = 24   # unsummarized messages before folding
+    chat_summary_keep_recent: int = 8         # newest messages always sent verbatim
+    chat_summary_max_tokens: int = 600
+    chat_summary_grace_seconds: float = 2.0   # wait once the answer is ready; then a later turn
+
+    # Long-term memory: past messages retrieved by similarity (0 disables)
+    chat_memory_top_k: int = 4
+    message_embedding_batch_size: int = 64
+
     class Config:
         env_file = ".env"
 
@@ -1,7 +1,10 @@
 # recallai_backend/core/db.py
 
+from typing import Callable
+
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from recallai_backend.core.config import settings
 
 
@@ -15,14 +18,65 @@ class Base(DeclarativeBase):
 # -----------------------------------------------------
 # Engine (AWS-safe, connection-stable)
 # -----------------------------------------------------
+def _engine_url(url: str) -> str:
+    """
+    Plain postgres URLs default to psycopg2 in SQLAlchemy. Route them to
+    psycopg 3 instead, whose pgvector adapters send vectors in binary.
+    An explicit "+driver" in the URL is left alone.
+    """
+    for prefix in ("postgres://", "postgresql://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg://" + url[len(prefix):]
+    return url
+
+
 engine = create_engine(
-    settings.database_url,
+    _engine_url(settings.database_url),
     echo=False,
     future=True,
     pool_pre_ping=True,        # prevents "MySQL server has gone away"
 )
 
 
+@event.listens_for(engine, "connect")
+def _register_vector_adapters(dbapi_connection, connection_record) -> None:
+    """
+    Teach the driver about pgvector: float32 NumPy arrays are bound as
+    `vector` (binary format on psycopg 3, numpy-formatted text on psycopg2).
+    """
+    if engine.dialect.driver == "psycopg":
+        from pgvector.psycopg import register_vector
+    else:
+        from pgvector.psycopg2 import register_vector
+
+    register_vector(dbapi_connection)
+
+
+# -----------------------------------------------------
+# Async Engine (psycopg 3 async; used by the chat path)
+# -----------------------------------------------------
+def _async_engine_url(url: str) -> str:
+    # psycopg2 has no asyncio support; the async engine always uses psycopg 3
+    url = _engine_url(url)
+    if url.startswith("postgresql+psycopg2://"):
+        return "postgresql+psycopg://" + url[len("postgresql+psycopg2://"):]
+    return url
+
+
+async_engine = create_async_engine(
+    _async_engine_url(settings.database_url),
+    echo=False,
+    pool_pre_ping=True,
+)
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def _register_async_vector_adapters(dbapi_connection, connection_record) -> None:
+    from pgvector.psycopg import register_vector_async
+
+    dbapi_connection.run_async(register_vector_async)
+
+
 # -----------------------------------------------------
 # Session Factory (NOT a session instance!)
 # -----------------------------------------------------
@@ -34,6 +88,13 @@ SessionLocal = sessionmaker(
     future=True,
 )
 
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 # -----------------------------------------------------
 # FastAPI Dependency (Transient per-request session)
@@ -49,3 +110,29 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+# -----------------------------------------------------
+# Post-commit hooks (keep in-process state in sync with
+# what actually got committed)
+# -----------------------------------------------------
+_AFTER_COMMIT_KEY = "after_commit_hooks"
+
+
+def run_after_commit(db: Session, hook: Callable[[], None]) -> None:
+    """
+    Defer `hook` until the session's current transaction commits.
+    Hooks are dropped if the transaction is rolled back instead.
+    """
+    db.info.setdefault(_AFTER_COMMIT_KEY, []).append(hook)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_hooks(session: Session) -> None:
+    for hook in session.info.pop(_AFTER_COMMIT_KEY, []):
+        hook()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit_hooks(session: Session) -> None:
+    session.info.pop(_AFTER_COMMIT_KEY, None)
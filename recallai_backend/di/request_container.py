@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from recallai_backend.core.db import get_db
 from recallai_backend.domain.domain_installer import DomainInstaller
 from recallai_backend.business.service_installer import ServiceInstaller
+from recallai_backend.utils.file_extractor import ExtractionCache
 
 
 class RequestContainer:
@@ -37,6 +38,12 @@ class RequestContainer:
     def auth(self):
         return self.services.get_auth_service()
 
+    def jobs(self):
+        return self.services.get_ingestion_job_service()
+
+    def extraction_cache(self):
+        return ExtractionCache(self.domain.get_extraction_cache_repository())
+
 
 def get_request_container(
     db: Session = Depends(get_db),
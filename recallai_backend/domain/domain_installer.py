@@ -1,19 +1,57 @@
 from __future__ import annotations
 from typing import Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from recallai_backend.core.config import settings
+from recallai_backend.core.db import AsyncSessionLocal
 
 # Repository interfaces
 from recallai_backend.domain.interfaces.i_user_repository import IUserRepository
-from recallai_backend.domain.interfaces.i_note_repository import INoteRepository
-from recallai_backend.domain.interfaces.i_conversation_repository import IConversationRepository
+from recallai_backend.domain.interfaces.i_note_repository import INoteRepository, IAsyncNoteRepository
+from recallai_backend.domain.interfaces.i_conversation_repository import (
+    IConversationRepository,
+    IAsyncConversationRepository,
+)
+from recallai_backend.domain.interfaces.i_embedding_cache_repository import IAsyncEmbeddingCacheRepository
+from recallai_backend.domain.interfaces.i_message_embedding_repository import IAsyncMessageEmbeddingRepository
+from recallai_backend.domain.interfaces.i_ingestion_job_repository import IIngestionJobRepository
+from recallai_backend.domain.interfaces.i_extraction_cache_repository import IExtractionCacheRepository
+from recallai_backend.domain.interfaces.i_openai_file_repository import IOpenAIFileRepository
 
 # Concrete repositories
 from recallai_backend.domain.repositories.user_repository import UserRepository
-from recallai_backend.domain.repositories.note_repository import NoteRepository
-from recallai_backend.domain.repositories.conversation_repository import ConversationRepository
+from recallai_backend.domain.repositories.note_repository import NoteRepository, AsyncNoteRepository
+from recallai_backend.domain.repositories.conversation_repository import (
+    ConversationRepository,
+    AsyncConversationRepository,
+)
+from recallai_backend.domain.repositories.embedding_cache_repository import (
+    EmbeddingCacheRepository,
+    AsyncEmbeddingCacheRepository,
+)
+from recallai_backend.domain.repositories.message_embedding_repository import AsyncMessageEmbeddingRepository
+from recallai_backend.domain.repositories.ingestion_job_repository import IngestionJobRepository
+from recallai_backend.domain.repositories.extraction_cache_repository import ExtractionCacheRepository
+from recallai_backend.domain.repositories.openai_file_repository import OpenAIFileRepository
 
 # Embedding
 from recallai_backend.business.services.embedding_service import EmbeddingService
+from recallai_backend.business.services.message_embedding_worker import get_message_embedding_worker
+
+
+def _note_repository(db: Session) -> NoteRepository:
+    if settings.vector_search_backend == "hnsw":
+        # Imported lazily so hnswlib is only needed when selected
+        from recallai_backend.domain.repositories.hnsw_note_repository import HnswNoteRepository
+
+        return HnswNoteRepository(db)
+    return NoteRepository(db)
+
+
+def _embed_message_later(message_id: int) -> None:
+    # Post-commit hook: queue only, the worker thread does the I/O
+    get_message_embedding_worker().submit(message_id)
 
 
 class DomainInstaller:
@@ -39,8 +77,8 @@ class DomainInstaller:
     # Embedding Service
     # ─────────────────────────────────────────────
     def get_embedding_service(self) -> EmbeddingService:
-        # EmbeddingService is stateless → safe as transient
-        return EmbeddingService()
+        # Transient service; its in-memory cache tier is process-wide
+        return EmbeddingService(cache_repo=EmbeddingCacheRepository(self._db))
 
     # ─────────────────────────────────────────────
     # Repositories (Transient)
@@ -49,7 +87,54 @@ class DomainInstaller:
         return UserRepository(self._db)
 
     def get_note_repository(self) -> INoteRepository:
-        return NoteRepository(self._db)
+        return _note_repository(self._db)
 
     def get_conversation_repository(self) -> IConversationRepository:
-        return ConversationRepository(self._db)
+        return ConversationRepository(self._db, on_message_committed=_embed_message_later)
+
+    def get_ingestion_job_repository(self) -> IIngestionJobRepository:
+        return IngestionJobRepository(self._db)
+
+    def get_extraction_cache_repository(self) -> IExtractionCacheRepository:
+        return ExtractionCacheRepository(self._db)
+
+    def get_openai_file_repository(self) -> IOpenAIFileRepository:
+        return OpenAIFileRepository(self._db)
+
+    # ─────────────────────────────────────────────
+    # Async side (chat pipeline)
+    # ─────────────────────────────────────────────
+    def get_async_domain(self) -> AsyncDomainInstaller:
+        return AsyncDomainInstaller()
+
+
+class AsyncDomainInstaller:
+    """
+    Async counterpart of DomainInstaller.
+
+    Hands out AsyncSessions rather than owning one: an AsyncSession cannot
+    run two statements at once, so each concurrent branch of a request
+    opens its own session and gets repositories bound to it.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker = AsyncSessionLocal):
+        self._session_factory = session_factory
+
+    def new_session(self) -> AsyncSession:
+        return self._session_factory()
+
+    def get_conversation_repository(self, db: AsyncSession) -> IAsyncConversationRepository:
+        return AsyncConversationRepository(db, on_message_committed=_embed_message_later)
+
+    def get_note_repository(self, db: AsyncSession) -> IAsyncNoteRepository:
+        if settings.vector_search_backend == "hnsw":
+            from recallai_backend.domain.repositories.hnsw_note_repository import AsyncHnswNoteRepository
+
+            return AsyncHnswNoteRepository(db)
+        return AsyncNoteRepository(db)
+
+    def get_embedding_cache_repository(self, db: AsyncSession) -> IAsyncEmbeddingCacheRepository:
+        return AsyncEmbeddingCacheRepository(db)
+
+    def get_message_embedding_repository(self, db: AsyncSession) -> IAsyncMessageEmbeddingRepository:
+        return AsyncMessageEmbeddingRepository(db)
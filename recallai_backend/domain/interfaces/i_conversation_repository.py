@@ -1,4 +1,4 @@
-from typing import Protocol, List, Optional
+from typing import Protocol, List, Optional, Sequence, Tuple
 from recallai_backend.domain.models.conversation import Conversation
 from recallai_backend.domain.models.message import Message
 
@@ -6,6 +6,7 @@ from recallai_backend.domain.models.message import Message
 class IConversationRepository(Protocol):
     """
     Abstraction for conversations and message storage.
+    Writes flush only; the calling service commits.
     """
 
     # CREATE
@@ -24,6 +25,13 @@ class IConversationRepository(Protocol):
     ) -> Message:
         ...
 
+    def add_messages(
+        self,
+        conv_id: int,
+        messages: Sequence[Tuple[str, str]],
+    ) -> List[Message]:
+        ...
+
     # READ
     def get_for_user(self, user_id: int) -> List[Conversation]:
         ...
@@ -31,6 +39,9 @@ class IConversationRepository(Protocol):
     def get_by_id(self, conv_id: int) -> Optional[Conversation]:
         ...
 
+    def claim_for_summary(self, conv_id: int) -> Optional[Conversation]:
+        ...
+
     def get_messages(self, conv_id: int) -> List[Message]:
         ...
 
@@ -42,13 +53,79 @@ class IConversationRepository(Protocol):
     ) -> List[Message]:
         ...
 
+    def get_messages_after(
+        self,
+        conv_id: int,
+        after_id: int | None,
+        limit: int,
+        oldest_first: bool = False,
+    ) -> List[Message]:
+        ...
+
     # UPDATE
     def rename(self, conv_id: int, title: str) -> Optional[Conversation]:
         ...
 
+    def update_summary(
+        self,
+        conv_id: int,
+        summary: str,
+        through_message_id: int,
+        previous_message_id: int | None,
+    ) -> bool:
+        ...
+
     # DELETE
     def delete(self, conv_id: int) -> bool:
         ...
 
     def delete_message(self, message_id: int) -> bool:
         ...
+
+
+class IAsyncConversationRepository(Protocol):
+    """
+    Async subset of IConversationRepository used by the chat pipeline.
+    Writes flush only; the caller commits the AsyncSession.
+    """
+
+    async def create_conversation(self, user_id: int, title: str | None = None) -> Conversation:
+        ...
+
+    async def add_message(self, conv_id: int, role: str, content: str) -> Message:
+        ...
+
+    async def add_messages(self, conv_id: int, messages: Sequence[Tuple[str, str]]) -> List[Message]:
+        ...
+
+    async def get_by_id(self, conv_id: int) -> Optional[Conversation]:
+        ...
+
+    async def claim_for_summary(self, conv_id: int) -> Optional[Conversation]:
+        ...
+
+    async def get_messages_paginated(
+        self,
+        conv_id: int,
+        limit: int,
+        before_id: int | None,
+    ) -> List[Message]:
+        ...
+
+    async def get_messages_after(
+        self,
+        conv_id: int,
+        after_id: int | None,
+        limit: int,
+        oldest_first: bool = False,
+    ) -> List[Message]:
+        ...
+
+    async def update_summary(
+        self,
+        conv_id: int,
+        summary: str,
+        through_message_id: int,
+        previous_message_id: int | None,
+    ) -> bool:
+        ...
@@ -0,0 +1,22 @@
+from typing import Protocol, Dict, Iterable, Tuple
+import numpy as np
+
+
+class IEmbeddingCacheRepository(Protocol):
+    """
+    Abstraction for the persistent embedding cache.
+    """
+
+    def get_many(self, model: str, text_hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        ...
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        ...
+
+
+class IAsyncEmbeddingCacheRepository(Protocol):
+    async def get_many(self, model: str, text_hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        ...
+
+    async def put_many(self, model: str, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        ...
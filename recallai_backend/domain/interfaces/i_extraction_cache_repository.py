@@ -0,0 +1,14 @@
+from typing import Dict, Iterable, Protocol, Tuple
+
+
+class IExtractionCacheRepository(Protocol):
+    """
+    Abstraction for the persistent extraction cache:
+    compressed text per (content_hash, extractor).
+    """
+
+    def get_many(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], bytes]:
+        ...
+
+    def put(self, content_hash: str, extractor: str, text_z: bytes, chars: int) -> None:
+        ...
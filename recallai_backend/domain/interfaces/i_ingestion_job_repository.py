@@ -0,0 +1,57 @@
+from typing import Protocol, Iterable, List, Optional, Tuple
+from recallai_backend.domain.models.ingestion_job import IngestionJob, IngestionJobFile
+
+
+class IIngestionJobRepository(Protocol):
+    """
+    Abstraction for the background ingestion job queue.
+    """
+
+    def create_job(
+        self,
+        user_id: int,
+        files: Iterable[Tuple[str, Optional[str], bytes]],
+        source: str | None = None,
+        max_attempts: int = 3,
+    ) -> IngestionJob:
+        ...
+
+    def get_by_id(self, job_id: int) -> Optional[IngestionJob]:
+        ...
+
+    def get_files(self, job_id: int) -> List[IngestionJobFile]:
+        ...
+
+    def get_file_data(self, file_id: int) -> Optional[bytes]:
+        ...
+
+    def get_extracted_text(self, file_id: int) -> Optional[str]:
+        ...
+
+    def claim(self, worker_id: str, lease_seconds: int) -> Optional[int]:
+        """
+        Lease the next runnable job (FOR UPDATE SKIP LOCKED) and return its id.
+        """
+        ...
+
+    def checkpoint(
+        self,
+        job_id: int,
+        file_id: int,
+        chunks_done: int,
+        worker_id: str,
+        lease_seconds: int,
+    ) -> bool:
+        ...
+
+    def save_extracted_text(self, file_id: int, extracted_text: str) -> None:
+        ...
+
+    def finish_file(self, job_id: int, file_id: int, worker_id: str, error: str | None = None) -> bool:
+        ...
+
+    def complete(self, job_id: int, worker_id: str, error: str | None = None) -> bool:
+        ...
+
+    def retry_or_fail(self, job_id: int, worker_id: str, error: str, retry_delay_seconds: float) -> bool:
+        ...
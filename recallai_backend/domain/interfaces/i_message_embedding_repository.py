@@ -0,0 +1,27 @@
+from typing import Protocol, Iterable, List, Sequence, Tuple
+from recallai_backend.domain.models.message import Message
+from recallai_backend.domain.models.vector_type import VectorLike
+
+
+class IMessageEmbeddingRepository(Protocol):
+    """
+    Abstraction for long-term chat memory (message vectors).
+    """
+
+    def find_unembedded(
+        self,
+        message_ids: Sequence[int] | None = None,
+        limit: int = 100,
+    ) -> List[Tuple[int, str]]:
+        ...
+
+    def save_many(self, items: Iterable[Tuple[int, VectorLike]]) -> None:
+        ...
+
+    def search(self, query_vector: VectorLike, top_k: int = 5, *, user_id: int) -> List[Message]:
+        ...
+
+
+class IAsyncMessageEmbeddingRepository(Protocol):
+    async def search(self, query_vector: VectorLike, top_k: int = 5, *, user_id: int) -> List[Message]:
+        ...
@@ -1,6 +1,9 @@
-from typing import Protocol, List, Optional
-from recallai_backend.domain.models.note import Note
-from recallai_backend.domain.models.embedding import Embedding
+from datetime import datetime
+from typing import Dict, Iterable, Protocol, List, Optional, Sequence, Tuple
+from recallai_backend.domain.models.note import NewNote, Note
+from recallai_backend.domain.models.embedding import StoredChunk
+from recallai_backend.domain.models.note_hit import NoteHit
+from recallai_backend.domain.models.vector_type import VectorLike
 
 
 class INoteRepository(Protocol):
@@ -18,7 +21,35 @@ class INoteRepository(Protocol):
     ) -> Note:
         ...
 
-    def save_embedding(self, note_id: int, vector: list[float]) -> Embedding:
+    def bulk_create_with_embeddings(self, user_id: int, notes: Sequence[NewNote]) -> List[int]:
+        """Single-chunk notes + their vectors in a constant number of round trips; ids in input order."""
+        ...
+
+    def save_embedding(self, note_id: int, vector: VectorLike, content_hash: str | None = None) -> int:
+        """Single-chunk note: write its chunk 0; returns the embedding id."""
+        ...
+
+    # CHUNK EMBEDDINGS
+    def get_chunks(self, note_ids: Sequence[int]) -> Dict[int, Dict[int, StoredChunk]]:
+        ...
+
+    def upsert_chunks(
+        self,
+        note_id: int,
+        chunks: Iterable[Tuple[int, str, Optional[int], Optional[int], VectorLike]],
+    ) -> None:
+        """(chunk_index, content_hash, char_start, char_end, vector) rows."""
+        ...
+
+    def move_chunks(self, note_id: int, spans: Iterable[Tuple[int, Optional[int], Optional[int]]]) -> None:
+        ...
+
+    def delete_chunks_from(self, note_id: int, chunk_count: int) -> List[int]:
+        ...
+
+    # NEAR-DUPLICATES
+    def find_simhash_candidates(self, user_id: int, signatures: Sequence[int]) -> List[Tuple[int, int]]:
+        """(note_id, simhash) of canonical notes sharing an LSH band with any signature."""
         ...
 
     # READ
@@ -38,13 +69,73 @@ class INoteRepository(Protocol):
         ...
 
     # DELETE
+    def promote_duplicate(self, note_id: int) -> Optional[Note]:
+        ...
+
     def delete_note(self, note_id: int) -> bool:
         ...
 
     # VECTOR SEARCH
     def search_by_vector(
         self,
-        query_vector: list[float],
+        query_vector: VectorLike,
         top_k: int = 5,
+        *,
+        user_id: int,
+        source: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
     ) -> List[Note]:
+        """
+        The user's nearest notes to `query_vector`, closest first.
+        Optional filters narrow by note source and created_at range.
+        """
+        ...
+
+    def search_chunks(
+        self,
+        query_vector: VectorLike,
+        top_k: int = 5,
+        *,
+        user_id: int,
+        source: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        query_text: str | None = None,
+    ) -> List[NoteHit]:
+        """
+        As search_by_vector, with the span of each note's best chunk.
+        With `query_text`, full-text matches are fused in (hybrid, RRF).
+        """
+        ...
+
+
+class IAsyncNoteRepository(Protocol):
+    """
+    Async vector search used by the chat pipeline.
+    """
+
+    async def search_by_vector(
+        self,
+        query_vector: VectorLike,
+        top_k: int = 5,
+        *,
+        user_id: int,
+        source: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+    ) -> List[Note]:
+        ...
+
+    async def search_chunks(
+        self,
+        query_vector: VectorLike,
+        top_k: int = 5,
+        *,
+        user_id: int,
+        source: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        query_text: str | None = None,
+    ) -> List[NoteHit]:
         ...
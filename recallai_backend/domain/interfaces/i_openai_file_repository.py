@@ -0,0 +1,16 @@
+from typing import Dict, Iterable, Protocol, Tuple
+
+
+class IOpenAIFileRepository(Protocol):
+    """
+    Abstraction for content_hash → OpenAI file_id mappings with a TTL.
+    """
+
+    def get_many(self, content_hashes: Iterable[str], purpose: str) -> Dict[str, str]:
+        ...
+
+    def put_many(self, files: Iterable[Tuple[str, str, str]], purpose: str, ttl_seconds: int) -> None:
+        ...
+
+    def invalidate(self, file_ids: Iterable[str]) -> None:
+        ...
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, func
+from sqlalchemy import Column, ForeignKey, Integer, String, Text, DateTime, func
 from sqlalchemy.orm import relationship
 from recallai_backend.core.db import Base
 
@@ -10,6 +10,10 @@ class Conversation(Base):
     title = Column(String(255), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Rolling summary of messages with id <= summary_message_id
+    summary = Column(Text, nullable=True)
+    summary_message_id = Column(Integer, nullable=True)
+
     # FIXED relationship - use correct class name "Message"
     messages = relationship(
         "Message",
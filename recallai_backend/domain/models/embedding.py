@@ -1,16 +1,82 @@
-from sqlalchemy import Column, Integer, ForeignKey
-from sqlalchemy.orm import relationship
+from typing import NamedTuple, Optional
+
+from sqlalchemy import Column, Integer, ForeignKey, Index, String, UniqueConstraint, text
+from sqlalchemy.orm import Session, relationship
 from recallai_backend.core.db import Base
 from recallai_backend.domain.models.vector_type import VectorType
 
+# Users are hashed into this many buckets, each with its own partial HNSW
+# index, so an ANN scan only walks ~1/N of the table before the user filter.
+# Keep in sync with migrations/001_embeddings_user_scope.sql.
+USER_BUCKETS = 16
+
+
+# pgvector's default hnsw.ef_search: an index scan yields at most this many rows
+HNSW_DEFAULT_EF_SEARCH = 40
+
+
+def user_bucket(user_id: int) -> int:
+    return user_id % USER_BUCKETS
+
+
+def widen_bucket_scan(db: Session, candidates: int) -> None:
+    """
+    Before an ANN query on a bucket index, for the rest of the transaction:
+    the index hands out at most ef_search rows and the user filter runs
+    after it, so a user sharing a bucket with heavier users could get
+    fewer than `candidates` rows, or none. Iterative scans (pgvector 0.8+)
+    keep reading the graph until enough rows pass the filter; results come
+    in relaxed order, so callers re-sort by distance.
+    """
+    db.execute(
+        text("""
+            SELECT set_config('hnsw.iterative_scan', 'relaxed_order', true),
+                   set_config('hnsw.ef_search', CAST(greatest(:default_ef, :candidates) AS text), true)
+        """),
+        {"default_ef": HNSW_DEFAULT_EF_SEARCH, "candidates": candidates},
+    )
+
+
+class StoredChunk(NamedTuple):
+    """What sync_note_chunks compares against: a stored chunk minus its vector."""
+
+    content_hash: Optional[str]
+    char_start: Optional[int]
+    char_end: Optional[int]
+
 
 class Embedding(Base):
+    """
+    One vector per chunk of a note (iter_note_chunks). `content_hash` is
+    the chunk's text_hash, so an edit only re-embeds chunks that changed;
+    char_start/char_end locate the chunk in notes.content (NULL: the
+    whole note).
+    """
+
     __tablename__ = "embeddings"
 
     id = Column(Integer, primary_key=True, index=True)
-    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), unique=True)
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"))
+    chunk_index = Column(Integer, nullable=False, server_default="0")
+    content_hash = Column(String(64), nullable=True)
+    char_start = Column(Integer, nullable=True)
+    char_end = Column(Integer, nullable=True)
+
+    # Denormalized from notes.user_id so searches filter before ranking
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # FIXED: Use custom VectorType for Supabase vector extension
     vector = Column(VectorType(1536))
 
-    note = relationship("Note", back_populates="embedding")
+    note = relationship("Note", back_populates="embeddings")
+
+    __table_args__ = (UniqueConstraint("note_id", "chunk_index", name="uq_embeddings_note_chunk"),) + tuple(
+        Index(
+            f"ix_embeddings_vector_hnsw_b{bucket}",
+            "vector",
+            postgresql_using="hnsw",
+            postgresql_ops={"vector": "vector_l2_ops"},
+            postgresql_where=text(f"user_id % {USER_BUCKETS} = {bucket}"),
+        )
+        for bucket in range(USER_BUCKETS)
+    )
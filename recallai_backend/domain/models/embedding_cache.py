@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, DateTime, func
+from recallai_backend.core.db import Base
+from recallai_backend.domain.models.vector_type import VectorType
+
+
+class EmbeddingCacheEntry(Base):
+    """
+    Persistent tier of the embedding cache: one vector per
+    (model, sha256 of normalized text).
+    """
+
+    __tablename__ = "embedding_cache"
+
+    model = Column(String(100), primary_key=True)
+    text_hash = Column(String(64), primary_key=True)
+    vector = Column(VectorType(1536), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
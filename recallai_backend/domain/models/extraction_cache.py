@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, func
+from recallai_backend.core.db import Base
+
+
+class ExtractionCacheEntry(Base):
+    """
+    Text extracted from an uploaded file, zlib-compressed: one row per
+    (sha256 of the file's bytes, extractor id). The extractor id names the
+    engine and its version (file_extractor.extractor_id), so changing
+    how a format is extracted never serves stale text.
+    """
+
+    __tablename__ = "extraction_cache"
+
+    content_hash = Column(String(64), primary_key=True)
+    extractor = Column(String(64), primary_key=True)
+    text_z = Column(LargeBinary, nullable=False)
+    chars = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
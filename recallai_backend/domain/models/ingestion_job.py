@@ -0,0 +1,86 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, LargeBinary, String, Text, func, text
+from sqlalchemy.orm import deferred, relationship
+from recallai_backend.core.db import Base
+
+# Job / file statuses
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class IngestionJob(Base):
+    """
+    A bulk upload processed in the background by IngestionWorker.
+
+    Claimed with FOR UPDATE SKIP LOCKED and then held by a lease
+    (locked_by / locked_until) rather than an open transaction, so a worker
+    can commit after every chunk and a crashed worker's job is picked up
+    again once its lease expires.
+    """
+
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    source = Column(String(255), nullable=True)
+
+    status = Column(String(16), nullable=False, server_default=QUEUED)
+    attempts = Column(Integer, nullable=False, server_default="0")
+    max_attempts = Column(Integer, nullable=False, server_default="3")
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_by = Column(String(64), nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Progress (advanced with every batch checkpoint)
+    total_files = Column(Integer, nullable=False, server_default="0")
+    files_done = Column(Integer, nullable=False, server_default="0")
+    chunks_done = Column(Integer, nullable=False, server_default="0")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    files = relationship(
+        "IngestionJobFile",
+        back_populates="job",
+        order_by="IngestionJobFile.position",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    __table_args__ = (
+        # The claim query only ever scans claimable jobs
+        Index(
+            "ix_ingestion_jobs_claimable",
+            "run_after",
+            "id",
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+
+class IngestionJobFile(Base):
+    """One uploaded file of a job; its bytes are dropped once it's ingested."""
+
+    __tablename__ = "ingestion_job_files"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("ingestion_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)
+    filename = Column(String(255), nullable=False)
+    content_type = Column(String(255), nullable=True)
+
+    # Loaded on demand: listing a job's files never pulls the uploads
+    data = deferred(Column(LargeBinary, nullable=True))
+
+    # OCR output, kept so a retried job doesn't pay for it twice
+    extracted_text = deferred(Column(Text, nullable=True))
+
+    status = Column(String(16), nullable=False, server_default=QUEUED)
+    # Checkpoint: chunks of this file already stored as notes
+    chunks_done = Column(Integer, nullable=False, server_default="0")
+    error = Column(Text, nullable=True)
+
+    job = relationship("IngestionJob", back_populates="files")
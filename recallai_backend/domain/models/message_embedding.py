@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index, text
+from recallai_backend.core.db import Base
+from recallai_backend.domain.models.embedding import USER_BUCKETS
+from recallai_backend.domain.models.vector_type import VectorType
+
+
+class MessageEmbedding(Base):
+    """
+    Long-term chat memory: one vector per message, searchable across all
+    of a user's conversations. Written off the request path by
+    MessageEmbeddingWorker.
+    """
+
+    __tablename__ = "message_embeddings"
+
+    id = Column(Integer, primary_key=True)
+    message_id = Column(Integer, ForeignKey("messages.id", ondelete="CASCADE"), unique=True, nullable=False)
+
+    # Denormalized from conversations so searches never need a join to filter
+    conversation_id = Column(Integer, ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    vector = Column(VectorType(1536), nullable=False)
+
+    # Same per-user-bucket partial HNSW layout as `embeddings`
+    __table_args__ = tuple(
+        Index(
+            f"ix_message_embeddings_vector_hnsw_b{bucket}",
+            "vector",
+            postgresql_using="hnsw",
+            postgresql_ops={"vector": "vector_l2_ops"},
+            postgresql_where=text(f"user_id % {USER_BUCKETS} = {bucket}"),
+        )
+        for bucket in range(USER_BUCKETS)
+    )
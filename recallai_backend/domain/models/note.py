@@ -1,6 +1,57 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey
-from sqlalchemy.orm import relationship
+import re
+from typing import NamedTuple, Optional, Tuple
+
+from sqlalchemy import BigInteger, Column, Computed, Integer, Index, String, Text, DateTime, func, ForeignKey, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from recallai_backend.core.db import Base
+from recallai_backend.domain.models.vector_type import VectorLike
+
+# SimHash LSH layout (business/services/near_duplicates.py): 64-bit
+# signatures cut into 16-bit bands, most significant first, one index each.
+# Keep in sync with migrations/008_note_simhash.sql.
+SIMHASH_BANDS = 4
+SIMHASH_BAND_BITS = 16
+
+
+def simhash_bands(signature: int) -> Tuple[int, ...]:
+    """Band values of a signature, most significant first (as simhash_band_sql computes them)."""
+    mask = (1 << SIMHASH_BAND_BITS) - 1
+    return tuple(
+        (signature >> (SIMHASH_BAND_BITS * (SIMHASH_BANDS - 1 - band))) & mask
+        for band in range(SIMHASH_BANDS)
+    )
+
+
+def simhash_band_sql(band: int, column: str = "simhash") -> str:
+    """SQL for band `band` of a signed BIGINT signature (as the indexes define it)."""
+    shift = SIMHASH_BAND_BITS * (SIMHASH_BANDS - 1 - band)
+    mask = (1 << SIMHASH_BAND_BITS) - 1
+    return f"(({column} >> {shift}) & {mask})" if shift else f"({column} & {mask})"
+
+
+# Full-text search (hybrid retrieval): text search config and the generated
+# column's expression, title weighted above content. Keep in sync with
+# migrations/011_note_search_tsv.sql.
+SEARCH_TS_CONFIG = "english"
+SEARCH_TSV_SQL = (
+    f"setweight(to_tsvector('{SEARCH_TS_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_TS_CONFIG}', content), 'B')"
+)
+# Query terms kept from a prompt; the rest would only add noise
+SEARCH_MAX_TERMS = 32
+_SEARCH_TERM = re.compile(r"[^\W_]+")
+
+
+def search_tsquery_text(query: str) -> Optional[str]:
+    """
+    to_tsquery input matching notes with ANY of the query's words (a prompt
+    is a question, not a conjunction of required terms). Only runs of word
+    characters are kept, so nothing here is tsquery syntax; None without any.
+    """
+    terms = list(dict.fromkeys(t.lower() for t in _SEARCH_TERM.findall(query)))[:SEARCH_MAX_TERMS]
+    return " | ".join(terms) or None
+
 
 class Note(Base):
     __tablename__ = "notes"
@@ -13,13 +64,47 @@ class Note(Base):
     source = Column(String(255), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    # Relationship to Embedding
-    embedding = relationship(
+    # Near-duplicate detection at ingest (business/services/near_duplicates.py)
+    simhash = Column(BigInteger, nullable=True)
+    # Set on chunks stored in "link" mode: the note this one repeats (not embedded).
+    # NoteService.delete_note promotes (and embeds) the first duplicate before
+    # deleting their canonical note; SET NULL only covers other deletes.
+    duplicate_of = Column(Integer, ForeignKey("notes.id", ondelete="SET NULL"), nullable=True)
+
+    # Lexical side of hybrid search, maintained by Postgres; never loaded
+    search_tsv = deferred(Column(TSVECTOR, Computed(SEARCH_TSV_SQL, persisted=True)))
+
+    # Chunk embeddings, in chunk order
+    embeddings = relationship(
         "Embedding",
         back_populates="note",
-        uselist=False,
+        order_by="Embedding.chunk_index",
         cascade="all, delete"
     )
 
     # Relationship to User
     user = relationship("User")
+
+    # One index per SimHash band (LSH lookup), over canonical notes only;
+    # GIN over the tsvector for the lexical half of hybrid search
+    __table_args__ = tuple(
+        Index(
+            f"ix_notes_simhash_band{band}",
+            "user_id",
+            text(simhash_band_sql(band)),
+            postgresql_where=text("simhash IS NOT NULL AND duplicate_of IS NULL"),
+        )
+        for band in range(SIMHASH_BANDS)
+    ) + (Index("ix_notes_search_tsv", "search_tsv", postgresql_using="gin"),)
+
+
+class NewNote(NamedTuple):
+    """A single-chunk note and its embedding, for bulk_create_with_embeddings."""
+
+    title: Optional[str]
+    content: str
+    source: Optional[str]
+    vector: Optional[VectorLike]      # None: stored without an embedding
+    content_hash: Optional[str] = None
+    simhash: Optional[int] = None
+    duplicate_of: Optional[int] = None
@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from recallai_backend.domain.models.note import Note
+
+
+@dataclass
+class NoteHit:
+    """
+    A search result: a note, ranked by its closest chunk, and where in
+    the note that chunk is. Not persisted.
+    """
+
+    note: Note
+    chunk_index: int
+    char_start: Optional[int]
+    char_end: Optional[int]
+    distance: float
+
+    @property
+    def text(self) -> str:
+        """The matched span, or the whole note when its chunk has no offsets."""
+        if self.char_start is None or self.char_end is None:
+            return self.note.content
+        return self.note.content[self.char_start:self.char_end]
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, String, func
+from recallai_backend.core.db import Base
+
+
+class OpenAIFile(Base):
+    """
+    A file already uploaded to the OpenAI Files API: one row per (sha256
+    of its bytes, purpose). Valid until expires_at; a file_id OpenAI no
+    longer knows is deleted here when a request using it fails.
+    """
+
+    __tablename__ = "openai_files"
+
+    content_hash = Column(String(64), primary_key=True)
+    purpose = Column(String(32), primary_key=True)
+    file_id = Column(String(64), nullable=False, index=True)
+    filename = Column(String(255))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
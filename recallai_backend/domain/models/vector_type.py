@@ -1,12 +1,84 @@
+import struct
+from typing import Sequence, Union
+
+import numpy as np
+from pgvector import Vector
+from sqlalchemy import func
 from sqlalchemy.types import UserDefinedType
 
+VectorLike = Union[Sequence[float], np.ndarray]
+
+# pgvector's binary send/recv layout: int16 dim, int16 unused, float32[dim],
+# all big-endian.
+_HEADER = struct.Struct(">HH")
+_BE_FLOAT32 = np.dtype(">f4")
+
+
+def as_vector(value: VectorLike) -> np.ndarray:
+    """Coerce lists / arrays to a contiguous float32 vector (no copy if already one)."""
+    return np.ascontiguousarray(value, dtype=np.float32)
+
+
+def to_binary(value: VectorLike) -> bytes:
+    vec = as_vector(value)
+    return _HEADER.pack(vec.shape[0], 0) + vec.astype(_BE_FLOAT32, copy=False).tobytes()
+
+
+def from_binary(data: Union[bytes, bytearray, memoryview]) -> np.ndarray:
+    dim, _ = _HEADER.unpack_from(data)
+    return np.frombuffer(data, dtype=_BE_FLOAT32, count=dim, offset=_HEADER.size).astype(np.float32)
+
+
+def from_text(data: str) -> np.ndarray:
+    return np.array(data[1:-1].split(","), dtype=np.float32)
+
+
 class VectorType(UserDefinedType):
+    """
+    pgvector column mapped to float32 NumPy arrays.
+
+    Binds hand the driver a float32 array, which the pgvector adapters
+    registered in core.db send in pgvector's binary format. Reads select
+    `vector_send(col)` so values come back as the same binary layout and
+    are decoded with a single frombuffer instead of parsing text.
+    """
+
+    cache_ok = True
+
     def __init__(self, dimensions):
         self.dimensions = dimensions
 
-    def get_col_spec(self):
+    def get_col_spec(self, **kw):
         return f"vector({self.dimensions})"
 
+    def bind_processor(self, dialect):
+        def process(value):
+            if value is None:
+                return None
+            vec = as_vector(value)
+            if vec.shape != (self.dimensions,):
+                raise ValueError(f"expected {self.dimensions} dimensions, got {vec.shape}")
+            return vec
+
+        return process
+
+    def column_expression(self, col):
+        return func.vector_send(col, type_=self)
+
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            if value is None:
+                return None
+            if isinstance(value, (bytes, bytearray, memoryview)):
+                return from_binary(value)
+            if isinstance(value, Vector):
+                return value.to_numpy()
+            if isinstance(value, str):
+                return from_text(value)
+            return as_vector(value)
+
+        return process
+
     # Optional: makes SQLAlchemy treat this as an immutable type
     def python_type(self):
-        return list
+        return np.ndarray
@@ -1,11 +1,22 @@
+from typing import Callable, List, Sequence, Tuple
+from sqlalchemy import update
 from sqlalchemy.orm import Session, joinedload
-from traitlets import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from recallai_backend.core.db import run_after_commit
 from recallai_backend.domain.models.conversation import Conversation
 from recallai_backend.domain.models.message import Message
 
 class ConversationRepository:
-    def __init__(self, db: Session):
+    """
+    Writes only flush: the calling service owns the transaction and
+    commits once per unit of work. Flushed INSERTs use RETURNING for the
+    id/created_at, so no refresh() round trip is needed.
+    """
+
+    def __init__(self, db: Session, on_message_committed: Callable[[int], None] | None = None):
         self.db = db
+        # Called with each new message id once it is committed
+        self.on_message_committed = on_message_committed
 
     # ─────────────────────────────────────────────
     # Create a new conversation (user required)
@@ -13,19 +24,30 @@ class ConversationRepository:
     def create_conversation(self, user_id: int, title: str | None = None) -> Conversation:
         conv = Conversation(user_id=user_id, title=title)
         self.db.add(conv)
-        self.db.commit()
-        self.db.refresh(conv)
+        self.db.flush()
         return conv
 
     # ─────────────────────────────────────────────
     # Add a message to a conversation
     # ─────────────────────────────────────────────
     def add_message(self, conv_id: int, role: str, content: str) -> Message:
-        msg = Message(conversation_id=conv_id, role=role, content=content)
-        self.db.add(msg)
-        self.db.commit()
-        self.db.refresh(msg)
-        return msg
+        return self.add_messages(conv_id, [(role, content)])[0]
+
+    # ─────────────────────────────────────────────
+    # Add several messages in one INSERT ... RETURNING
+    # ─────────────────────────────────────────────
+    def add_messages(self, conv_id: int, messages: Sequence[Tuple[str, str]]) -> List[Message]:
+        rows = [
+            Message(conversation_id=conv_id, role=role, content=content)
+            for role, content in messages
+        ]
+        self.db.add_all(rows)
+        self.db.flush()
+
+        if self.on_message_committed is not None:
+            ids, notify = [m.id for m in rows], self.on_message_committed
+            run_after_commit(self.db, lambda: [notify(i) for i in ids])
+        return rows
 
     # ─────────────────────────────────────────────
     # Get messages of a conversation
@@ -61,6 +83,19 @@ class ConversationRepository:
             .first()
         )
 
+    def claim_for_summary(self, conv_id: int) -> Conversation | None:
+        """
+        The conversation, row-locked until the transaction ends; None if
+        another summary update holds it. NO KEY UPDATE, so message inserts
+        (FK KEY SHARE) aren't blocked meanwhile.
+        """
+        return (
+            self.db.query(Conversation)
+            .filter(Conversation.id == conv_id)
+            .with_for_update(skip_locked=True, key_share=True)
+            .first()
+        )
+
     # ─────────────────────────────────────────────
     # Rename conversation
     # ─────────────────────────────────────────────
@@ -68,8 +103,7 @@ class ConversationRepository:
         conv = self.get_by_id(conv_id)
         if conv:
             conv.title = title
-            self.db.commit()
-            self.db.refresh(conv)
+            self.db.flush()
         return conv
 
     # ─────────────────────────────────────────────
@@ -79,7 +113,7 @@ class ConversationRepository:
         conv = self.get_by_id(conv_id)
         if conv:
             self.db.delete(conv)
-            self.db.commit()
+            self.db.flush()
             return True
         return False
 
@@ -105,7 +139,61 @@ class ConversationRepository:
                 .all()
         )
 
-    
+    # ─────────────────────────────────────────────
+    # Messages not yet covered by the summary
+    # ─────────────────────────────────────────────
+    def get_messages_after(
+        self,
+        conv_id: int,
+        after_id: int | None,
+        limit: int,
+        oldest_first: bool = False,
+    ) -> List[Message]:
+        """
+        `limit` messages with id > after_id, returned oldest → newest: the
+        newest ones (prompt tail), or with oldest_first the ones right
+        after after_id (summary folding, which must not skip any).
+        """
+        query = (
+            self.db.query(Message)
+            .filter(Message.conversation_id == conv_id)
+        )
+
+        if after_id:
+            query = query.filter(Message.id > after_id)
+
+        if oldest_first:
+            return query.order_by(Message.id.asc()).limit(limit).all()
+
+        rows = query.order_by(Message.id.desc()).limit(limit).all()
+        rows.reverse()
+        return rows
+
+    # ─────────────────────────────────────────────
+    # Advance the rolling summary (compare-and-set)
+    # ─────────────────────────────────────────────
+    def update_summary(
+        self,
+        conv_id: int,
+        summary: str,
+        through_message_id: int,
+        previous_message_id: int | None,
+    ) -> bool:
+        """
+        Only applies if nobody advanced the summary since `previous_message_id`
+        was read, so concurrent updaters can't overwrite each other.
+        """
+        result = self.db.execute(
+            update(Conversation)
+            .where(
+                Conversation.id == conv_id,
+                Conversation.summary_message_id.is_not_distinct_from(previous_message_id),
+            )
+            .values(summary=summary, summary_message_id=through_message_id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
     # ─────────────────────────────────────────────
     # Delete a single message by ID
     # ─────────────────────────────────────────────    
@@ -120,5 +208,74 @@ class ConversationRepository:
             return False
 
         self.db.delete(msg)
-        self.db.commit()
-        return True
\ No newline at end of file
+        self.db.flush()
+        return True
+
+
+class AsyncConversationRepository:
+    """
+    AsyncSession front for ConversationRepository.
+    Each call runs the sync repository on the session's greenlet bridge,
+    so the SQL lives in one place and the I/O does not block the loop.
+    """
+
+    def __init__(self, db: AsyncSession, on_message_committed: Callable[[int], None] | None = None):
+        self.db = db
+        self.on_message_committed = on_message_committed
+
+    def _repo(self, s: Session) -> ConversationRepository:
+        return ConversationRepository(s, on_message_committed=self.on_message_committed)
+
+    async def create_conversation(self, user_id: int, title: str | None = None) -> Conversation:
+        return await self.db.run_sync(
+            lambda s: self._repo(s).create_conversation(user_id, title)
+        )
+
+    async def add_message(self, conv_id: int, role: str, content: str) -> Message:
+        return await self.db.run_sync(
+            lambda s: self._repo(s).add_message(conv_id, role, content)
+        )
+
+    async def add_messages(self, conv_id: int, messages: Sequence[Tuple[str, str]]) -> List[Message]:
+        return await self.db.run_sync(
+            lambda s: self._repo(s).add_messages(conv_id, messages)
+        )
+
+    async def get_by_id(self, conv_id: int) -> Conversation | None:
+        return await self.db.run_sync(
+            lambda s: self._repo(s).get_by_id(conv_id)
+        )
+
+    async def claim_for_summary(self, conv_id: int) -> Conversation | None:
+        return await self.db.run_sync(
+            lambda s: self._repo(s).claim_for_summary(conv_id)
+        )
+
+    async def get_messages_paginated(self, conv_id: int, limit: int, before_id: int | None) -> List[Message]:
+        return await self.db.run_sync(
+            lambda s: self._repo(s).get_messages_paginated(conv_id, limit, before_id)
+        )
+
+    async def get_messages_after(
+        self,
+        conv_id: int,
+        after_id: int | None,
+        limit: int,
+        oldest_first: bool = False,
+    ) -> List[Message]:
+        return await self.db.run_sync(
+            lambda s: self._repo(s).get_messages_after(conv_id, after_id, limit, oldest_first)
+        )
+
+    async def update_summary(
+        self,
+        conv_id: int,
+        summary: str,
+        through_message_id: int,
+        previous_message_id: int | None,
+    ) -> bool:
+        return await self.db.run_sync(
+            lambda s: self._repo(s).update_summary(
+                conv_id, summary, through_message_id, previous_message_id
+            )
+        )
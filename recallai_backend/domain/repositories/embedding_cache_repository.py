@@ -0,0 +1,72 @@
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from recallai_backend.domain.models.vector_type import as_vector, from_binary
+
+
+class EmbeddingCacheRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ─────────────────────────────────────────────
+    # Batch lookup: one round trip for many hashes
+    # ─────────────────────────────────────────────
+    def get_many(self, model: str, text_hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        hashes = list(text_hashes)
+        if not hashes:
+            return {}
+
+        rows = self.db.execute(
+            text("""
+                SELECT text_hash, vector_send(vector)
+                FROM embedding_cache
+                WHERE model = :model AND text_hash = ANY(:hashes)
+            """),
+            {"model": model, "hashes": hashes},
+        ).fetchall()
+
+        return {r[0]: from_binary(r[1]) for r in rows}
+
+    # ─────────────────────────────────────────────
+    # Batch insert (executemany). First writer wins;
+    # committed with the caller's unit of work.
+    # ─────────────────────────────────────────────
+    def put_many(self, model: str, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        params = [
+            {"model": model, "text_hash": h, "vector": as_vector(v)}
+            for h, v in items
+        ]
+        if not params:
+            return
+
+        self.db.execute(
+            text("""
+                INSERT INTO embedding_cache (model, text_hash, vector)
+                VALUES (:model, :text_hash, CAST(:vector AS vector))
+                ON CONFLICT (model, text_hash) DO NOTHING
+            """),
+            params,
+        )
+
+
+class AsyncEmbeddingCacheRepository:
+    """AsyncSession front for EmbeddingCacheRepository."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_many(self, model: str, text_hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        hashes = list(text_hashes)
+        return await self.db.run_sync(
+            lambda s: EmbeddingCacheRepository(s).get_many(model, hashes)
+        )
+
+    async def put_many(self, model: str, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        items = list(items)
+        await self.db.run_sync(
+            lambda s: EmbeddingCacheRepository(s).put_many(model, items)
+        )
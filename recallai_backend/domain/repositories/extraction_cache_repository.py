@@ -0,0 +1,47 @@
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# (content_hash, extractor)
+CacheKey = Tuple[str, str]
+
+
+class ExtractionCacheRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ─────────────────────────────────────────────
+    # Batch lookup: one round trip for many files
+    # ─────────────────────────────────────────────
+    def get_many(self, keys: Iterable[CacheKey]) -> Dict[CacheKey, bytes]:
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        rows = self.db.execute(
+            text("""
+                SELECT c.content_hash, c.extractor, c.text_z
+                FROM extraction_cache c
+                JOIN unnest(CAST(:hashes AS varchar[]), CAST(:extractors AS varchar[]))
+                     AS k(content_hash, extractor)
+                  ON k.content_hash = c.content_hash AND k.extractor = c.extractor
+            """),
+            {"hashes": [h for h, _ in keys], "extractors": [e for _, e in keys]},
+        ).fetchall()
+
+        return {(r[0], r[1]): bytes(r[2]) for r in rows}
+
+    # ─────────────────────────────────────────────
+    # Insert; first writer wins, committed with the
+    # caller's unit of work.
+    # ─────────────────────────────────────────────
+    def put(self, content_hash: str, extractor: str, text_z: bytes, chars: int) -> None:
+        self.db.execute(
+            text("""
+                INSERT INTO extraction_cache (content_hash, extractor, text_z, chars)
+                VALUES (:content_hash, :extractor, :text_z, :chars)
+                ON CONFLICT (content_hash, extractor) DO NOTHING
+            """),
+            {"content_hash": content_hash, "extractor": extractor, "text_z": text_z, "chars": chars},
+        )
@@ -0,0 +1,292 @@
+import asyncio
+import math
+from datetime import datetime
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from recallai_backend.core.db import SessionLocal, run_after_commit
+from recallai_backend.domain.models.note import NewNote, Note, search_tsquery_text
+from recallai_backend.domain.models.note_hit import NoteHit
+from recallai_backend.domain.models.vector_type import VectorLike, as_vector, from_binary
+from recallai_backend.domain.repositories.note_repository import (
+    HYBRID_CANDIDATES,
+    AsyncNoteRepository,
+    ChunkRow,
+    NoteRepository,
+)
+from recallai_backend.domain.vector_index.hnsw_index import (
+    HnswIndexRegistry,
+    chunk_label,
+    get_hnsw_registry,
+    label_chunk_index,
+    label_note_id,
+)
+
+
+class HnswNoteRepository(NoteRepository):
+    """
+    NoteRepository whose vector search is served by the in-process
+    per-user HNSW index instead of a pgvector scan.
+
+    All writes still go to Postgres through NoteRepository; the index is
+    only touched once those writes commit, so a rolled-back request never
+    leaves phantom notes in it. Notes become searchable once their chunk
+    embeddings are saved (create_note alone has no vector to index).
+    """
+
+    def __init__(self, db: Session, registry: HnswIndexRegistry | None = None):
+        super().__init__(db)
+        self.registry = registry or get_hnsw_registry()
+
+    # ─────────────────────────────────────────────
+    # UPSERT chunk embeddings → index after commit
+    # ─────────────────────────────────────────────
+    def bulk_create_with_embeddings(self, user_id: int, notes: Sequence[NewNote]) -> List[int]:
+        note_ids = super().bulk_create_with_embeddings(user_id, notes)
+        items = [
+            (chunk_label(note_id, 0), as_vector(n.vector))
+            for note_id, n in zip(note_ids, notes)
+            if n.vector is not None
+        ]
+
+        def index():
+            for label, vector in items:
+                self.registry.upsert(user_id, label, vector)
+
+        run_after_commit(self.db, index)
+        return note_ids
+
+    def save_embedding(self, note_id: int, vector: VectorLike, content_hash: str | None = None) -> int:
+        vector = as_vector(vector)
+        embedding_id = super().save_embedding(note_id, vector, content_hash)
+        self._index_after_commit(note_id, [(0, vector)])
+        return embedding_id
+
+    def upsert_chunks(self, note_id: int, chunks: Iterable[ChunkRow]) -> None:
+        chunks = [(i, h, start, end, as_vector(v)) for i, h, start, end, v in chunks]
+        super().upsert_chunks(note_id, chunks)
+        self._index_after_commit(note_id, [(i, v) for i, *_, v in chunks])
+
+    def _index_after_commit(self, note_id: int, vectors: List[Tuple[int, VectorLike]]) -> None:
+        note = self.db.get(Note, note_id)
+        if note is None or not vectors:
+            return
+        user_id = note.user_id
+
+        def index():
+            for chunk_index, vector in vectors:
+                self.registry.upsert(user_id, chunk_label(note_id, chunk_index), vector)
+
+        run_after_commit(self.db, index)
+
+    # ─────────────────────────────────────────────
+    # DELETE chunks / note → drop from index after commit
+    # ─────────────────────────────────────────────
+    def delete_chunks_from(self, note_id: int, chunk_count: int) -> List[int]:
+        removed = super().delete_chunks_from(note_id, chunk_count)
+        note = self.db.get(Note, note_id)
+        if removed and note is not None:
+            user_id = note.user_id
+            labels = [chunk_label(note_id, i) for i in removed]
+            run_after_commit(self.db, lambda: self.registry.remove(user_id, labels))
+        return removed
+
+    def delete_note(self, note_id: int) -> bool:
+        note = self.get_by_id(note_id)
+        if not note:
+            return False
+
+        # Registered before the commit inside NoteRepository.delete_note
+        user_id = note.user_id
+        labels = [chunk_label(note_id, i) for i in self.get_chunks([note_id])[note_id]]
+        run_after_commit(self.db, lambda: self.registry.remove(user_id, labels))
+
+        return super().delete_note(note_id)
+
+    # ─────────────────────────────────────────────
+    # VECTOR SEARCH (HNSW)
+    # ─────────────────────────────────────────────
+    def search_chunks(
+        self,
+        query_vector: VectorLike,
+        top_k: int = 5,
+        *,
+        user_id: int,
+        source: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        query_text: str | None = None,
+    ) -> List[NoteHit]:
+        # The graph only knows chunk labels; filtered searches go to SQL,
+        # where the filters are pushed down next to the ANN scan.
+        if source is not None or created_after is not None or created_before is not None:
+            return super().search_chunks(
+                query_vector,
+                top_k,
+                user_id=user_id,
+                source=source,
+                created_after=created_after,
+                created_before=created_before,
+                query_text=query_text,
+            )
+
+        ts_query = search_tsquery_text(query_text) if query_text else None
+        pool = max(top_k, HYBRID_CANDIDATES) if ts_query is not None else top_k
+
+        best = self.registry.search_chunks(
+            user_id,
+            query_vector,
+            pool,
+            loader=self.load_user_vectors,
+        )
+        if ts_query is not None:
+            return self._search_hybrid_ranked(query_vector, best, ts_query, top_k, user_id)
+        if not best:
+            return []
+
+        # Spans of the winning chunks, one query
+        note_ids = [label_note_id(label) for label, _ in best]
+        chunk_indexes = [label_chunk_index(label) for label, _ in best]
+        spans = {
+            (r[0], r[1]): (r[2], r[3])
+            for r in self.db.execute(
+                text("""
+                    SELECT e.note_id, e.chunk_index, e.char_start, e.char_end
+                    FROM embeddings e
+                    JOIN unnest(CAST(:note_ids AS integer[]), CAST(:chunk_indexes AS integer[]))
+                         AS w(note_id, chunk_index)
+                      ON w.note_id = e.note_id AND w.chunk_index = e.chunk_index
+                """),
+                {"note_ids": note_ids, "chunk_indexes": chunk_indexes},
+            )
+        }
+
+        # hnswlib's l2 space is squared; report pgvector's <-> distance
+        return self._hits_in_order([
+            (note_id, chunk_index, *spans.get((note_id, chunk_index), (None, None)), math.sqrt(distance))
+            for note_id, chunk_index, (_, distance) in zip(note_ids, chunk_indexes, best)
+        ])
+
+    def _search_hybrid_ranked(
+        self,
+        query_vector: VectorLike,
+        best: List[Tuple[int, float]],
+        ts_query: str,
+        top_k: int,
+        user_id: int,
+    ) -> List[NoteHit]:
+        """The graph's ranking goes into SQL as arrays and is fused there like pgvector's."""
+        vector_ranked = """
+            SELECT w.note_id, w.chunk_index, e.char_start, e.char_end, w.distance, w.rank
+            FROM unnest(CAST(:v_note_ids AS integer[]), CAST(:v_chunk_indexes AS integer[]),
+                        CAST(:v_distances AS float8[]))
+                 WITH ORDINALITY AS w(note_id, chunk_index, distance, rank)
+            LEFT JOIN embeddings e ON e.note_id = w.note_id AND e.chunk_index = w.chunk_index
+        """
+        params = {
+            "embedding": as_vector(query_vector),
+            "top_k": top_k,
+            "user_id": user_id,
+            "pool": max(top_k, HYBRID_CANDIDATES),
+            "v_note_ids": [label_note_id(label) for label, _ in best],
+            "v_chunk_indexes": [label_chunk_index(label) for label, _ in best],
+            # hnswlib's l2 space is squared; report pgvector's <-> distance
+            "v_distances": [math.sqrt(distance) for _, distance in best],
+        }
+        return self._search_hybrid(vector_ranked, ts_query, [], params)
+
+    # ─────────────────────────────────────────────
+    # Lazy partition build: all of a user's vectors
+    # ─────────────────────────────────────────────
+    def load_user_vectors(self, user_id: int) -> Tuple[List[int], np.ndarray]:
+        sql = text("""
+            SELECT e.note_id, e.chunk_index, vector_send(e.vector)
+            FROM embeddings e
+            WHERE e.user_id = :user_id
+              AND e.vector IS NOT NULL
+        """)
+
+        rows = self.db.execute(sql, {"user_id": user_id}).fetchall()
+
+        labels = [chunk_label(note_id, chunk_index) for note_id, chunk_index, _ in rows]
+        vectors = np.empty((len(rows), self.registry.dim), dtype=np.float32)
+        for i, (_, _, vec_bytes) in enumerate(rows):
+            vectors[i] = from_binary(vec_bytes)
+
+        return labels, vectors
+
+
+class AsyncHnswNoteRepository(AsyncNoteRepository):
+    """
+    AsyncNoteRepository over HnswNoteRepository. A missing or stale
+    partition is built first in a worker thread, on its own session, so
+    the (seconds-long) build never blocks the event loop; the search
+    itself then runs on the cached partition.
+    """
+
+    def __init__(self, db: AsyncSession, registry: HnswIndexRegistry | None = None):
+        self.registry = registry or get_hnsw_registry()
+        super().__init__(db, repo_factory=lambda s: HnswNoteRepository(s, self.registry))
+
+    async def search_by_vector(
+        self,
+        query_vector: VectorLike,
+        top_k: int = 5,
+        *,
+        user_id: int,
+        source: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+    ) -> List[Note]:
+        await self._ensure_partition(user_id, source, created_after, created_before)
+        return await super().search_by_vector(
+            query_vector,
+            top_k,
+            user_id=user_id,
+            source=source,
+            created_after=created_after,
+            created_before=created_before,
+        )
+
+    async def search_chunks(
+        self,
+        query_vector: VectorLike,
+        top_k: int = 5,
+        *,
+        user_id: int,
+        source: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        query_text: str | None = None,
+    ) -> List[NoteHit]:
+        await self._ensure_partition(user_id, source, created_after, created_before)
+        return await super().search_chunks(
+            query_vector,
+            top_k,
+            user_id=user_id,
+            source=source,
+            created_after=created_after,
+            created_before=created_before,
+            query_text=query_text,
+        )
+
+    async def _ensure_partition(
+        self,
+        user_id: int,
+        source: str | None,
+        created_after: datetime | None,
+        created_before: datetime | None,
+    ) -> None:
+        # Filtered searches go to SQL and never touch the graph
+        if source is not None or created_after is not None or created_before is not None:
+            return
+        if self.registry.cached(user_id) is None:
+            await asyncio.to_thread(self._build_partition, user_id)
+
+    def _build_partition(self, user_id: int) -> None:
+        with SessionLocal() as db:
+            self.registry.get_or_build(user_id, HnswNoteRepository(db, self.registry).load_user_vectors)
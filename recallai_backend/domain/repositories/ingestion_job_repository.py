@@ -0,0 +1,197 @@
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import case, func, select, text, update
+from sqlalchemy.orm import Session
+
+from recallai_backend.domain.models.ingestion_job import (
+    FAILED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    IngestionJob,
+    IngestionJobFile,
+)
+
+
+class IngestionJobRepository:
+    """
+    Postgres-backed job queue for background ingestion.
+
+    Writes flush only; the caller owns the transaction. Every update made
+    on behalf of a worker is conditioned on that worker still holding the
+    lease and reports whether it applied, so a worker whose lease was
+    taken over rolls back instead of writing twice.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ─────────────────────────────────────────────
+    # ENQUEUE
+    # ─────────────────────────────────────────────
+    def create_job(
+        self,
+        user_id: int,
+        files: Iterable[Tuple[str, Optional[str], bytes]],
+        source: str | None = None,
+        max_attempts: int = 3,
+    ) -> IngestionJob:
+        """files: (filename, content_type, data). Flushed one by one."""
+        job = IngestionJob(user_id=user_id, source=source, status=QUEUED, max_attempts=max_attempts)
+        self.db.add(job)
+        self.db.flush()
+
+        count = 0
+        for position, (filename, content_type, data) in enumerate(files):
+            file = IngestionJobFile(
+                job_id=job.id,
+                position=position,
+                filename=filename,
+                content_type=content_type,
+                data=data,
+            )
+            self.db.add(file)
+            self.db.flush()
+            # Don't keep the upload in the identity map
+            self.db.expunge(file)
+            count += 1
+
+        job.total_files = count
+        self.db.flush()
+        return job
+
+    # ─────────────────────────────────────────────
+    # READ
+    # ─────────────────────────────────────────────
+    def get_by_id(self, job_id: int) -> Optional[IngestionJob]:
+        return self.db.get(IngestionJob, job_id)
+
+    def get_files(self, job_id: int) -> List[IngestionJobFile]:
+        return list(
+            self.db.scalars(
+                select(IngestionJobFile)
+                .where(IngestionJobFile.job_id == job_id)
+                .order_by(IngestionJobFile.position)
+            )
+        )
+
+    def get_file_data(self, file_id: int) -> Optional[bytes]:
+        return self.db.scalar(select(IngestionJobFile.data).where(IngestionJobFile.id == file_id))
+
+    def get_extracted_text(self, file_id: int) -> Optional[str]:
+        return self.db.scalar(select(IngestionJobFile.extracted_text).where(IngestionJobFile.id == file_id))
+
+    # ─────────────────────────────────────────────
+    # CLAIM: next runnable job, or one whose lease expired
+    # ─────────────────────────────────────────────
+    def claim(self, worker_id: str, lease_seconds: int) -> Optional[int]:
+        """
+        Lease the next job to `worker_id` and count the attempt. SKIP LOCKED
+        lets any number of workers poll at once without blocking on, or
+        double-claiming, the same row. Commit right after.
+        """
+        return self.db.execute(
+            text("""
+                UPDATE ingestion_jobs
+                SET status = 'running',
+                    attempts = attempts + 1,
+                    locked_by = :worker,
+                    locked_until = now() + make_interval(secs => :lease),
+                    updated_at = now()
+                WHERE id = (
+                    SELECT id FROM ingestion_jobs
+                    WHERE (status = 'queued' AND run_after <= now())
+                       OR (status = 'running' AND locked_until < now())
+                    ORDER BY run_after, id
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1
+                )
+                RETURNING id
+            """),
+            {"worker": worker_id, "lease": lease_seconds},
+        ).scalar_one_or_none()
+
+    # ─────────────────────────────────────────────
+    # PROGRESS (all lease-checked)
+    # ─────────────────────────────────────────────
+    def _update_leased_job(self, job_id: int, worker_id: str, **values) -> bool:
+        result = self.db.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id == job_id, IngestionJob.locked_by == worker_id)
+            .values(updated_at=func.now(), **values)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    def checkpoint(
+        self,
+        job_id: int,
+        file_id: int,
+        chunks_done: int,
+        worker_id: str,
+        lease_seconds: int,
+        added: int = 1,
+    ) -> bool:
+        """Record `added` more stored chunks (file total: chunks_done) and extend the lease."""
+        if not self._update_leased_job(
+            job_id,
+            worker_id,
+            chunks_done=IngestionJob.chunks_done + added,
+            locked_until=func.now() + _seconds(lease_seconds),
+        ):
+            return False
+        self.db.execute(
+            update(IngestionJobFile)
+            .where(IngestionJobFile.id == file_id)
+            .values(chunks_done=chunks_done, status=RUNNING)
+            .execution_options(synchronize_session=False)
+        )
+        return True
+
+    def save_extracted_text(self, file_id: int, extracted_text: str) -> None:
+        self.db.execute(
+            update(IngestionJobFile)
+            .where(IngestionJobFile.id == file_id)
+            .values(extracted_text=extracted_text)
+            .execution_options(synchronize_session=False)
+        )
+
+    def finish_file(self, job_id: int, file_id: int, worker_id: str, error: str | None = None) -> bool:
+        """Mark a file done (or failed) and drop its stored bytes."""
+        if not self._update_leased_job(job_id, worker_id, files_done=IngestionJob.files_done + 1):
+            return False
+        self.db.execute(
+            update(IngestionJobFile)
+            .where(IngestionJobFile.id == file_id)
+            .values(status=FAILED if error else SUCCEEDED, error=error, data=None, extracted_text=None)
+            .execution_options(synchronize_session=False)
+        )
+        return True
+
+    def complete(self, job_id: int, worker_id: str, error: str | None = None) -> bool:
+        return self._update_leased_job(
+            job_id,
+            worker_id,
+            status=FAILED if error else SUCCEEDED,
+            error=error,
+            locked_by=None,
+            locked_until=None,
+            finished_at=func.now(),
+        )
+
+    def retry_or_fail(self, job_id: int, worker_id: str, error: str, retry_delay_seconds: float) -> bool:
+        """Requeue after `retry_delay_seconds`, or fail once attempts are used up."""
+        exhausted = IngestionJob.attempts >= IngestionJob.max_attempts
+        return self._update_leased_job(
+            job_id,
+            worker_id,
+            status=case((exhausted, FAILED), else_=QUEUED),
+            run_after=func.now() + _seconds(retry_delay_seconds),
+            error=error,
+            locked_by=None,
+            locked_until=None,
+            finished_at=case((exhausted, func.now()), else_=None),
+        )
+
+
+def _seconds(n: float):
+    return func.make_interval(0, 0, 0, 0, 0, 0, float(n))
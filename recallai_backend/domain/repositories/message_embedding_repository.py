@@ -0,0 +1,112 @@
+from typing import Iterable, List, Sequence, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from recallai_backend.domain.models.embedding import USER_BUCKETS, user_bucket, widen_bucket_scan
+from recallai_backend.domain.models.message import Message
+from recallai_backend.domain.models.vector_type import VectorLike, as_vector
+
+
+class MessageEmbeddingRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ─────────────────────────────────────────────
+    # Messages that still need a vector
+    # (given ids, or any — for backfills)
+    # ─────────────────────────────────────────────
+    def find_unembedded(
+        self,
+        message_ids: Sequence[int] | None = None,
+        limit: int = 100,
+    ) -> List[Tuple[int, str]]:
+        where = [
+            "me.id IS NULL",
+            "m.content IS NOT NULL",
+            "m.content <> ''",
+        ]
+        params = {"limit": limit}
+
+        if message_ids is not None:
+            where.append("m.id = ANY(:ids)")
+            params["ids"] = list(message_ids)
+
+        rows = self.db.execute(
+            text(f"""
+                SELECT m.id, m.content
+                FROM messages m
+                LEFT JOIN message_embeddings me ON me.message_id = m.id
+                WHERE {" AND ".join(where)}
+                ORDER BY m.id
+                LIMIT :limit
+            """),
+            params,
+        ).fetchall()
+
+        return [(r[0], r[1]) for r in rows]
+
+    # ─────────────────────────────────────────────
+    # Batch insert (executemany). Owner columns are
+    # copied from the message's conversation; messages
+    # deleted in the meantime simply insert nothing.
+    # ─────────────────────────────────────────────
+    def save_many(self, items: Iterable[Tuple[int, VectorLike]]) -> None:
+        params = [
+            {"message_id": message_id, "vector": as_vector(v)}
+            for message_id, v in items
+        ]
+        if not params:
+            return
+
+        self.db.execute(
+            text("""
+                INSERT INTO message_embeddings (message_id, conversation_id, user_id, vector)
+                SELECT m.id, m.conversation_id, c.user_id, CAST(:vector AS vector)
+                FROM messages m
+                JOIN conversations c ON c.id = m.conversation_id
+                WHERE m.id = :message_id
+                ON CONFLICT (message_id) DO NOTHING
+            """),
+            params,
+        )
+
+    # ─────────────────────────────────────────────
+    # VECTOR SEARCH over all of a user's conversations
+    # ─────────────────────────────────────────────
+    def search(self, query_vector: VectorLike, top_k: int = 5, *, user_id: int) -> List[Message]:
+        # Bucket predicate inlined so the partial HNSW index matches; the
+        # iterative scan returns rows in relaxed order, so re-sort them
+        widen_bucket_scan(self.db, top_k)
+        rows = self.db.execute(
+            text(f"""
+                WITH nearest AS MATERIALIZED (
+                    SELECT me.message_id, me.vector <-> CAST(:embedding AS vector) AS distance
+                    FROM message_embeddings me
+                    WHERE me.user_id = :user_id
+                      AND me.user_id % {USER_BUCKETS} = {user_bucket(user_id)}
+                    ORDER BY me.vector <-> CAST(:embedding AS vector)
+                    LIMIT :top_k
+                )
+                SELECT message_id FROM nearest ORDER BY distance
+            """),
+            {"embedding": as_vector(query_vector), "top_k": top_k, "user_id": user_id},
+        ).fetchall()
+
+        ids = [r[0] for r in rows]
+        if not ids:
+            return []
+
+        by_id = {m.id: m for m in self.db.query(Message).filter(Message.id.in_(ids)).all()}
+        return [by_id[i] for i in ids if i in by_id]
+
+
+class AsyncMessageEmbeddingRepository:
+    """AsyncSession front for the message-memory search path."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def search(self, query_vector: VectorLike, top_k: int = 5, *, user_id: int) -> List[Message]:
+        return await self.db.run_sync(
+            lambda s: MessageEmbeddingRepository(s).search(query_vector, top_k, user_id=user_id)
+        )
@@ -1,8 +1,44 @@
-from typing import List
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from recallai_backend.domain.models.note import Note
-from recallai_backend.domain.models.embedding import Embedding
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, text
+from recallai_backend.domain.models.note import (
+    SEARCH_TS_CONFIG,
+    SIMHASH_BANDS,
+    NewNote,
+    Note,
+    search_tsquery_text,
+    simhash_band_sql,
+    simhash_bands,
+)
+from recallai_backend.domain.models.embedding import (
+    USER_BUCKETS,
+    Embedding,
+    StoredChunk,
+    user_bucket,
+    widen_bucket_scan,
+)
+from recallai_backend.domain.models.note_hit import NoteHit
+from recallai_backend.domain.models.vector_type import VectorLike, as_vector
+
+# Chunks fetched per requested note before grouping by note, so notes
+# with several close chunks don't crowd the others out of the top k
+CHUNK_CANDIDATES_PER_NOTE = 4
+
+# Hybrid search: notes taken from each ranking (lexical, vector) before
+# fusion, and the RRF constant (score = sum of 1 / (k + rank)). 10 notes
+# x 4 chunks stays within pgvector's default hnsw.ef_search of 40.
+HYBRID_CANDIDATES = 10
+RRF_K = 60
+
+# bulk_create_with_embeddings: embedding columns, in COPY order
+_EMBEDDING_COPY_COLUMNS = ("note_id", "user_id", "chunk_index", "content_hash", "vector")
+_EMBEDDING_COPY_TYPES = ("int4", "int4", "int4", "varchar", "vector")
+
+# (chunk_index, content_hash, char_start, char_end, vector)
+ChunkRow = Tuple[int, str, Optional[int], Optional[int], VectorLike]
+
 
 class NoteRepository:
     def __init__(self, db: Session):
@@ -18,24 +54,207 @@ class NoteRepository:
         return note
 
     # ─────────────────────────────────────────────
-    # UPSERT embedding (fix duplicate key error)
+    # BULK CREATE: N notes + N embeddings in three round trips
+    # ─────────────────────────────────────────────
+    def bulk_create_with_embeddings(self, user_id: int, notes: Sequence[NewNote]) -> List[int]:
+        """
+        Insert single-chunk notes and their chunk-0 embeddings (notes with
+        no vector get none); returns the note ids in input order. Ids are
+        drawn from the sequence up front, so neither insert has to return
+        (or order) anything: one multi-row INSERT for the notes, one binary
+        COPY for the vectors (executemany on drivers without COPY). Flushes
+        nothing through the ORM; the caller commits.
+        """
+        if not notes:
+            return []
+
+        note_ids = list(self.db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('notes', 'id')) FROM generate_series(1, :n)"),
+            {"n": len(notes)},
+        ).scalars())
+
+        self.db.execute(
+            text("""
+                INSERT INTO notes (id, user_id, title, content, source, simhash, duplicate_of)
+                SELECT id, :user_id, title, content, source, simhash, duplicate_of
+                FROM unnest(
+                    CAST(:ids AS integer[]),
+                    CAST(:titles AS text[]),
+                    CAST(:contents AS text[]),
+                    CAST(:sources AS text[]),
+                    CAST(:simhashes AS bigint[]),
+                    CAST(:duplicate_of AS integer[])
+                ) AS t(id, title, content, source, simhash, duplicate_of)
+            """),
+            {
+                "user_id": user_id,
+                "ids": note_ids,
+                "titles": [n.title for n in notes],
+                "contents": [n.content for n in notes],
+                "sources": [n.source for n in notes],
+                "simhashes": [n.simhash for n in notes],
+                "duplicate_of": [n.duplicate_of for n in notes],
+            },
+        )
+
+        rows = [
+            (note_id, user_id, 0, n.content_hash, as_vector(n.vector))
+            for note_id, n in zip(note_ids, notes)
+            if n.vector is not None
+        ]
+        if rows and self.db.get_bind().dialect.driver == "psycopg":
+            self._copy_embeddings(rows)
+        elif rows:
+            self.db.execute(insert(Embedding), [dict(zip(_EMBEDDING_COPY_COLUMNS, row)) for row in rows])
+
+        return note_ids
+
+    # ─────────────────────────────────────────────
+    # NEAR-DUPLICATES: LSH candidates by SimHash band
+    # ─────────────────────────────────────────────
+    def find_simhash_candidates(self, user_id: int, signatures: Sequence[int]) -> List[Tuple[int, int]]:
+        """
+        (note_id, simhash) of the user's canonical notes sharing at least
+        one band with any of `signatures`; one query, one index per band.
+        The caller confirms matches by Hamming distance.
+        """
+        if not signatures:
+            return []
+
+        per_band = list(zip(*(simhash_bands(sig) for sig in signatures)))
+        params = {"user_id": user_id}
+        any_band = []
+        for band in range(SIMHASH_BANDS):
+            params[f"b{band}"] = sorted(set(per_band[band]))
+            any_band.append(f"{simhash_band_sql(band)} = ANY(CAST(:b{band} AS integer[]))")
+
+        rows = self.db.execute(
+            text(f"""
+                SELECT id, simhash
+                FROM notes
+                WHERE user_id = :user_id
+                  AND simhash IS NOT NULL
+                  AND duplicate_of IS NULL
+                  AND ({" OR ".join(any_band)})
+            """),
+            params,
+        ).fetchall()
+        return [(r[0], r[1]) for r in rows]
+
+    def _copy_embeddings(self, rows: List[tuple]) -> None:
+        # Same connection (and transaction) as the session
+        conn = self.db.connection().connection.driver_connection
+        with conn.cursor() as cur:
+            with cur.copy(
+                f"COPY embeddings ({', '.join(_EMBEDDING_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT BINARY)"
+            ) as copy:
+                copy.set_types(_EMBEDDING_COPY_TYPES)
+                for row in rows:
+                    copy.write_row(row)
+
+    # ─────────────────────────────────────────────
+    # UPSERT embedding of a single-chunk note (chunk 0)
     # ─────────────────────────────────────────────
-    def save_embedding(self, note_id: int, vector: list[float]) -> Embedding:
+    def save_embedding(self, note_id: int, vector: VectorLike, content_hash: str | None = None) -> int:
+        """Returns the embedding row id."""
+        # user_id is copied from the note in the same statement
         sql = text("""
-            INSERT INTO embeddings (note_id, vector)
-            VALUES (:note_id, :vector)
-            ON CONFLICT (note_id)
-            DO UPDATE SET vector = EXCLUDED.vector
+            INSERT INTO embeddings (note_id, user_id, chunk_index, content_hash, vector)
+            SELECT n.id, n.user_id, 0, :content_hash, CAST(:vector AS vector)
+            FROM notes n
+            WHERE n.id = :note_id
+            ON CONFLICT (note_id, chunk_index)
+            DO UPDATE SET vector = EXCLUDED.vector, content_hash = EXCLUDED.content_hash
             RETURNING id
         """)
 
-        row = self.db.execute(
+        return self.db.execute(
             sql,
-            {"note_id": note_id, "vector": vector}
-        ).fetchone()
+            {"note_id": note_id, "vector": as_vector(vector), "content_hash": content_hash}
+        ).scalar_one()
+
+    # ─────────────────────────────────────────────
+    # CHUNK embeddings: stored state, upsert, move, trim
+    # ─────────────────────────────────────────────
+    def get_chunks(self, note_ids: Sequence[int]) -> Dict[int, Dict[int, StoredChunk]]:
+        """{note_id: {chunk_index: StoredChunk}} for all given notes, one query."""
+        chunks: Dict[int, Dict[int, StoredChunk]] = {note_id: {} for note_id in note_ids}
+        if not note_ids:
+            return chunks
+
+        rows = self.db.execute(
+            text("""
+                SELECT note_id, chunk_index, content_hash, char_start, char_end
+                FROM embeddings
+                WHERE note_id = ANY(:note_ids)
+            """),
+            {"note_ids": list(note_ids)},
+        ).fetchall()
 
-        # Return ORM object for the embedding
-        return self.db.query(Embedding).filter(Embedding.id == row[0]).first()
+        for note_id, chunk_index, content_hash, char_start, char_end in rows:
+            chunks[note_id][chunk_index] = StoredChunk(content_hash, char_start, char_end)
+        return chunks
+
+    def upsert_chunks(self, note_id: int, chunks: Iterable[ChunkRow]) -> None:
+        """Write chunk rows (vector included) for one note (executemany)."""
+        params = [
+            {
+                "note_id": note_id,
+                "chunk_index": i,
+                "content_hash": h,
+                "char_start": start,
+                "char_end": end,
+                "vector": as_vector(v),
+            }
+            for i, h, start, end, v in chunks
+        ]
+        if not params:
+            return
+
+        self.db.execute(
+            text("""
+                INSERT INTO embeddings (note_id, user_id, chunk_index, content_hash, char_start, char_end, vector)
+                SELECT n.id, n.user_id, :chunk_index, :content_hash, :char_start, :char_end, CAST(:vector AS vector)
+                FROM notes n
+                WHERE n.id = :note_id
+                ON CONFLICT (note_id, chunk_index)
+                DO UPDATE SET vector = EXCLUDED.vector,
+                              content_hash = EXCLUDED.content_hash,
+                              char_start = EXCLUDED.char_start,
+                              char_end = EXCLUDED.char_end
+            """),
+            params,
+        )
+
+    def move_chunks(self, note_id: int, spans: Iterable[Tuple[int, Optional[int], Optional[int]]]) -> None:
+        """New (chunk_index, char_start, char_end) for chunks whose text didn't change."""
+        params = [
+            {"note_id": note_id, "chunk_index": i, "char_start": start, "char_end": end}
+            for i, start, end in spans
+        ]
+        if not params:
+            return
+
+        self.db.execute(
+            text("""
+                UPDATE embeddings
+                SET char_start = :char_start, char_end = :char_end
+                WHERE note_id = :note_id AND chunk_index = :chunk_index
+            """),
+            params,
+        )
+
+    def delete_chunks_from(self, note_id: int, chunk_count: int) -> List[int]:
+        """Drop every chunk at index >= chunk_count in one statement; returns the indexes removed."""
+        rows = self.db.execute(
+            text("""
+                DELETE FROM embeddings
+                WHERE note_id = :note_id AND chunk_index >= :chunk_count
+                RETURNING chunk_index
+            """),
+            {"note_id": note_id, "chunk_count": chunk_count},
+        ).fetchall()
+        return [r[0] for r in rows]
 
     # ─────────────────────────────────────────────
     # GET a single note
@@ -67,10 +286,35 @@ class NoteRepository:
         if content is not None:
             note.content = content
 
-        self.db.commit()
-        self.db.refresh(note)
+        # Committed by the service together with the re-embedded chunks
+        self.db.flush()
         return note
 
+    # ─────────────────────────────────────────────
+    # Hand a note's "link" duplicates to the first of them
+    # ─────────────────────────────────────────────
+    def promote_duplicate(self, note_id: int) -> Optional[Note]:
+        """
+        Make the oldest note linked to `note_id` canonical (duplicate_of
+        NULL) and re-link the others to it. Returns that note, which has
+        no embedding yet, or None if nothing links here. Flushes only.
+        """
+        promoted = (
+            self.db.query(Note)
+            .filter(Note.duplicate_of == note_id)
+            .order_by(Note.id)
+            .first()
+        )
+        if promoted is None:
+            return None
+
+        promoted.duplicate_of = None
+        self.db.query(Note).filter(
+            Note.duplicate_of == note_id, Note.id != promoted.id
+        ).update({Note.duplicate_of: promoted.id}, synchronize_session=False)
+        self.db.flush()
+        return promoted
+
     # ─────────────────────────────────────────────
     # DELETE note + embedding
     # ─────────────────────────────────────────────
@@ -88,26 +332,206 @@ class NoteRepository:
         return True
 
     # ─────────────────────────────────────────────
-    # VECTOR SEARCH
+    # VECTOR SEARCH (user-scoped, filters pushed into SQL)
     # ─────────────────────────────────────────────
-    def search_by_vector(self, query_vector: list[float], top_k: int = 5) -> List[Note]:
-        embedding_str = "[" + ",".join(str(x) for x in query_vector) + "]"
+    def search_by_vector(
+        self,
+        query_vector: VectorLike,
+        top_k: int = 5,
+        *,
+        user_id: int,
+        source: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+    ) -> List[Note]:
+        hits = self.search_chunks(
+            query_vector,
+            top_k,
+            user_id=user_id,
+            source=source,
+            created_after=created_after,
+            created_before=created_before,
+        )
+        return [hit.note for hit in hits]
 
-        sql = text("""
-            SELECT n.id
-            FROM embeddings e
-            JOIN notes n ON n.id = e.note_id
-            ORDER BY e.vector <-> vector(:embedding)
+    def search_chunks(
+        self,
+        query_vector: VectorLike,
+        top_k: int = 5,
+        *,
+        user_id: int,
+        source: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        query_text: str | None = None,
+    ) -> List[NoteHit]:
+        """
+        Notes ranked by their closest chunk (max-sim), each with that
+        chunk's span. Ranking is one query; the notes are loaded after.
+        With `query_text`, the ranking is hybrid: see _search_hybrid.
+        """
+        note_filters, params = self._note_filters(source, created_after, created_before)
+        params.update(embedding=as_vector(query_vector), top_k=top_k, user_id=user_id)
+
+        ts_query = search_tsquery_text(query_text) if query_text else None
+        if ts_query is not None:
+            params["pool"] = max(top_k, HYBRID_CANDIDATES)
+            params["candidates"] = params["pool"] * CHUNK_CANDIDATES_PER_NOTE
+            vector_ranked = f"""
+                SELECT best.*, row_number() OVER (ORDER BY distance) AS rank
+                FROM ({self._best_chunk_per_note_sql(user_id, note_filters)}
+                      ORDER BY distance LIMIT :pool) best
+            """
+            widen_bucket_scan(self.db, params["candidates"])
+            return self._search_hybrid(vector_ranked, ts_query, note_filters, params)
+
+        # Rows are chunks: take the nearest chunks through the ANN index,
+        # keep each note's closest one, then rank notes by it
+        params["candidates"] = top_k * CHUNK_CANDIDATES_PER_NOTE
+        sql = text(f"""
+            {self._best_chunk_per_note_sql(user_id, note_filters)}
+            ORDER BY distance
             LIMIT :top_k
         """)
 
-        rows = self.db.execute(
-            sql,
-            {"embedding": embedding_str, "top_k": top_k}
-        ).fetchall()
+        widen_bucket_scan(self.db, params["candidates"])
+        rows = self.db.execute(sql, params).fetchall()
+
+        return self._hits_in_order([tuple(r) for r in rows])
 
-        note_ids = [r[0] for r in rows]
+    @staticmethod
+    def _note_filters(
+        source: str | None,
+        created_after: datetime | None,
+        created_before: datetime | None,
+    ) -> Tuple[List[str], dict]:
+        """Note-level predicates (over alias n) and their parameters."""
+        where, params = [], {}
+        if source is not None:
+            where.append("n.source = :source")
+            params["source"] = source
+        if created_after is not None:
+            where.append("n.created_at >= :created_after")
+            params["created_after"] = created_after
+        if created_before is not None:
+            where.append("n.created_at < :created_before")
+            params["created_before"] = created_before
+        return where, params
+
+    @staticmethod
+    def _best_chunk_per_note_sql(user_id: int, note_filters: List[str]) -> str:
+        """
+        (note_id, chunk_index, char_start, char_end, distance) of each note's
+        closest chunk among the :candidates nearest, unordered.
+        """
+        # The bucket predicate is inlined (both sides are ints) so the
+        # planner can match it against the per-bucket partial HNSW index.
+        where = [
+            "e.user_id = :user_id",
+            f"e.user_id % {USER_BUCKETS} = {user_bucket(user_id)}",
+            *note_filters,
+        ]
+        # Only join notes when a note-level filter needs it
+        join = "JOIN notes n ON n.id = e.note_id" if note_filters else ""
+
+        return f"""
+            SELECT note_id, chunk_index, char_start, char_end, distance
+            FROM (
+                SELECT DISTINCT ON (note_id) *
+                FROM (
+                    SELECT e.note_id, e.chunk_index, e.char_start, e.char_end,
+                           e.vector <-> CAST(:embedding AS vector) AS distance
+                    FROM embeddings e
+                    {join}
+                    WHERE {" AND ".join(where)}
+                    ORDER BY e.vector <-> CAST(:embedding AS vector)
+                    LIMIT :candidates
+                ) nearest
+                ORDER BY note_id, distance
+            ) best
+        """
+
+    # ─────────────────────────────────────────────
+    # HYBRID: lexical + vector, fused by RRF in SQL
+    # ─────────────────────────────────────────────
+    def _search_hybrid(
+        self,
+        vector_ranked: str,
+        ts_query: str,
+        note_filters: List[str],
+        params: dict,
+    ) -> List[NoteHit]:
+        """
+        `vector_ranked` yields (note_id, chunk_index, char_start, char_end,
+        distance, rank) for the :pool best notes by vector. The :pool best
+        by ts_rank_cd over the GIN-indexed search_tsv are fused with them
+        (reciprocal rank fusion), so an exact identifier or name ranks even
+        when the embedding misses it. A note found only lexically gets its
+        closest chunk's span and distance. One round trip.
+        """
+        where = ["n.user_id = :user_id", "n.duplicate_of IS NULL", "n.search_tsv @@ q.query", *note_filters]
+        params.update(ts_query=ts_query, rrf_k=RRF_K)
 
+        sql = text(f"""
+            WITH vec AS (
+                {vector_ranked}
+            ),
+            lex AS (
+                SELECT n.id AS note_id,
+                       row_number() OVER (ORDER BY ts_rank_cd(n.search_tsv, q.query) DESC, n.id) AS rank
+                FROM notes n, to_tsquery('{SEARCH_TS_CONFIG}', :ts_query) AS q(query)
+                WHERE {" AND ".join(where)}
+                ORDER BY rank
+                LIMIT :pool
+            ),
+            fused AS (
+                SELECT coalesce(v.note_id, l.note_id) AS note_id,
+                       v.chunk_index, v.char_start, v.char_end, v.distance,
+                       coalesce(1.0 / (:rrf_k + v.rank), 0) + coalesce(1.0 / (:rrf_k + l.rank), 0) AS score
+                FROM vec v
+                FULL JOIN lex l ON l.note_id = v.note_id
+                ORDER BY score DESC, note_id
+                LIMIT :top_k
+            )
+            SELECT f.note_id,
+                   coalesce(f.chunk_index, c.chunk_index),
+                   coalesce(f.char_start, c.char_start),
+                   coalesce(f.char_end, c.char_end),
+                   coalesce(f.distance, c.distance)
+            FROM fused f
+            LEFT JOIN LATERAL (
+                SELECT e.chunk_index, e.char_start, e.char_end,
+                       e.vector <-> CAST(:embedding AS vector) AS distance
+                FROM embeddings e
+                WHERE f.distance IS NULL AND e.note_id = f.note_id AND e.vector IS NOT NULL
+                ORDER BY distance
+                LIMIT 1
+            ) c ON true
+            WHERE coalesce(f.distance, c.distance) IS NOT NULL
+            ORDER BY f.score DESC, f.note_id
+        """)
+
+        rows = self.db.execute(sql, params).fetchall()
+
+        return self._hits_in_order([tuple(r) for r in rows])
+
+    # ─────────────────────────────────────────────
+    # Attach notes to ranked (note_id, chunk_index, start, end, distance)
+    # ─────────────────────────────────────────────
+    def _hits_in_order(self, rows: List[Tuple[int, int, Optional[int], Optional[int], float]]) -> List[NoteHit]:
+        notes = self._notes_in_order([r[0] for r in rows])
+        note_map = {n.id: n for n in notes}
+
+        return [
+            NoteHit(note_map[note_id], chunk_index, start, end, distance)
+            for note_id, chunk_index, start, end, distance in rows
+            if note_id in note_map
+        ]
+
+    # ─────────────────────────────────────────────
+    # Load notes preserving the given (ranked) id order
+    # ─────────────────────────────────────────────
+    def _notes_in_order(self, note_ids: List[int]) -> List[Note]:
         if not note_ids:
             return []
 
@@ -115,3 +539,58 @@ class NoteRepository:
         note_map = {n.id: n for n in notes}
 
         return [note_map[nid] for nid in note_ids if nid in note_map]
+
+
+class AsyncNoteRepository:
+    """
+    AsyncSession front for the note search path.
+    `repo_factory` picks the sync backend (pgvector or HNSW) to run.
+    """
+
+    def __init__(self, db: AsyncSession, repo_factory: Callable[[Session], NoteRepository] = NoteRepository):
+        self.db = db
+        self.repo_factory = repo_factory
+
+    async def search_by_vector(
+        self,
+        query_vector: VectorLike,
+        top_k: int = 5,
+        *,
+        user_id: int,
+        source: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+    ) -> List[Note]:
+        return await self.db.run_sync(
+            lambda s: self.repo_factory(s).search_by_vector(
+                query_vector,
+                top_k,
+                user_id=user_id,
+                source=source,
+                created_after=created_after,
+                created_before=created_before,
+            )
+        )
+
+    async def search_chunks(
+        self,
+        query_vector: VectorLike,
+        top_k: int = 5,
+        *,
+        user_id: int,
+        source: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        query_text: str | None = None,
+    ) -> List[NoteHit]:
+        return await self.db.run_sync(
+            lambda s: self.repo_factory(s).search_chunks(
+                query_vector,
+                top_k,
+                user_id=user_id,
+                source=source,
+                created_after=created_after,
+                created_before=created_before,
+                query_text=query_text,
+            )
+        )
@@ -0,0 +1,73 @@
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# (content_hash, file_id, filename)
+UploadedFile = Tuple[str, str, str]
+
+
+class OpenAIFileRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ─────────────────────────────────────────────
+    # Batch lookup of unexpired file_ids
+    # ─────────────────────────────────────────────
+    def get_many(self, content_hashes: Iterable[str], purpose: str) -> Dict[str, str]:
+        hashes = list(set(content_hashes))
+        if not hashes:
+            return {}
+
+        rows = self.db.execute(
+            text("""
+                SELECT content_hash, file_id
+                FROM openai_files
+                WHERE content_hash = ANY(:hashes)
+                  AND purpose = :purpose
+                  AND expires_at > now()
+            """),
+            {"hashes": hashes, "purpose": purpose},
+        ).fetchall()
+
+        return {r[0]: r[1] for r in rows}
+
+    # ─────────────────────────────────────────────
+    # Upsert: a re-upload replaces an expired or
+    # invalidated mapping.
+    # ─────────────────────────────────────────────
+    def put_many(self, files: Iterable[UploadedFile], purpose: str, ttl_seconds: int) -> None:
+        files = list(files)
+        if not files:
+            return
+
+        self.db.execute(
+            text("""
+                INSERT INTO openai_files (content_hash, purpose, file_id, filename, expires_at)
+                SELECT f.content_hash, :purpose, f.file_id, f.filename,
+                       now() + make_interval(secs => :ttl)
+                FROM unnest(CAST(:hashes AS varchar[]), CAST(:file_ids AS varchar[]),
+                            CAST(:filenames AS varchar[]))
+                     AS f(content_hash, file_id, filename)
+                ON CONFLICT (content_hash, purpose) DO UPDATE
+                SET file_id = EXCLUDED.file_id,
+                    filename = EXCLUDED.filename,
+                    created_at = now(),
+                    expires_at = EXCLUDED.expires_at
+            """),
+            {
+                "purpose": purpose,
+                "ttl": ttl_seconds,
+                "hashes": [h for h, _, _ in files],
+                "file_ids": [i for _, i, _ in files],
+                "filenames": [n for _, _, n in files],
+            },
+        )
+
+    def invalidate(self, file_ids: Iterable[str]) -> None:
+        file_ids = list(file_ids)
+        if file_ids:
+            self.db.execute(
+                text("DELETE FROM openai_files WHERE file_id = ANY(:ids)"),
+                {"ids": file_ids},
+            )
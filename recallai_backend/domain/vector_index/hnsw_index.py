@@ -0,0 +1,304 @@
+# recallai_backend/domain/vector_index/hnsw_index.py
+"""
+Process-local HNSW index over note embeddings, partitioned per user.
+
+Each user gets an independent hnswlib graph with one element per note
+chunk, labelled chunk_label(note_id, chunk_index); searches rank notes
+by their closest chunk (search_chunks also says which chunk that was).
+Partitions are built lazily (from a loader callback, normally the
+`embeddings` table) the first time a user is searched, kept up to date
+by HnswNoteRepository after every committed write, and rebuilt once they
+are older than `hnsw_max_age_seconds` so writes made by other processes
+are eventually picked up.
+
+Builds are single-flight per user: concurrent callers wait for the one
+build in progress. Writes committed while a build runs are recorded and
+replayed onto the new partition before it is published, since the
+loader's snapshot may or may not include them (replaying is idempotent).
+Async callers build in a worker thread (AsyncHnswNoteRepository), so a
+build never runs on the event loop.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import hnswlib
+import numpy as np
+
+from recallai_backend.core.config import settings
+
+# (chunk labels, float32 matrix of shape [n, dim])
+VectorLoader = Callable[[int], Tuple[List[int], np.ndarray]]
+
+_MIN_CAPACITY = 64
+
+# Label = note_id * stride + chunk_index (hnswlib labels are uint64)
+CHUNK_LABEL_STRIDE = 1 << 16
+
+# Chunks fetched per requested note before collapsing to notes
+_CHUNKS_PER_NOTE = 4
+
+
+def chunk_label(note_id: int, chunk_index: int) -> int:
+    return note_id * CHUNK_LABEL_STRIDE + chunk_index
+
+
+def label_note_id(label: int) -> int:
+    return label // CHUNK_LABEL_STRIDE
+
+
+def label_chunk_index(label: int) -> int:
+    return label % CHUNK_LABEL_STRIDE
+
+
+class UserHnswPartition:
+    """
+    One user's HNSW graph.
+    hnswlib is not safe for concurrent add/query, so every call is locked.
+    """
+
+    def __init__(self, dim: int, m: int, ef_construction: int, ef_search: int, capacity: int):
+        self.dim = dim
+        self.ef_search = ef_search
+        self.built_at = time.monotonic()
+
+        self._labels: Set[int] = set()
+        self._lock = threading.Lock()
+
+        self._index = hnswlib.Index(space="l2", dim=dim)
+        self._index.init_index(
+            max_elements=max(capacity, _MIN_CAPACITY),
+            M=m,
+            ef_construction=ef_construction,
+        )
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def add_many(self, labels: Sequence[int], vectors: np.ndarray) -> None:
+        if not len(labels):
+            return
+        with self._lock:
+            self._ensure_capacity(len(labels))
+            self._index.add_items(vectors, np.asarray(labels, dtype=np.int64))
+            self._labels.update(labels)
+
+    def upsert(self, label: int, vector: Sequence[float]) -> None:
+        vec = np.asarray(vector, dtype=np.float32).reshape(1, self.dim)
+        with self._lock:
+            self._ensure_capacity(1)
+            # add_items on an existing label updates it in place
+            # (and un-deletes it if it was marked deleted).
+            self._index.add_items(vec, np.asarray([label], dtype=np.int64))
+            self._labels.add(label)
+
+    def remove(self, label: int) -> None:
+        with self._lock:
+            if label in self._labels:
+                self._index.mark_deleted(label)
+                self._labels.discard(label)
+
+    def search(self, vector: Sequence[float], top_k: int) -> List[int]:
+        """Note ids of the nearest chunks, closest first, each note once."""
+        return [label_note_id(label) for label, _ in self.search_chunks(vector, top_k)]
+
+    def search_chunks(self, vector: Sequence[float], top_k: int) -> List[Tuple[int, float]]:
+        """(label, squared L2 distance) of each note's closest chunk, closest first."""
+        vec = np.asarray(vector, dtype=np.float32).reshape(1, self.dim)
+        with self._lock:
+            k = min(top_k * _CHUNKS_PER_NOTE, len(self._labels))
+            if k <= 0:
+                return []
+            # ef must be >= k or hnswlib cannot fill the result set
+            self._index.set_ef(max(self.ef_search, k))
+            labels, distances = self._index.knn_query(vec, k=k)
+
+        best: Dict[int, Tuple[int, float]] = {}
+        for label, distance in zip(labels[0], distances[0]):
+            # Results come closest first: the first chunk seen per note wins
+            best.setdefault(label_note_id(int(label)), (int(label), float(distance)))
+        return list(best.values())[:top_k]
+
+    def _ensure_capacity(self, extra: int) -> None:
+        # Deleted elements still occupy slots, so size by the raw element count
+        needed = self._index.get_current_count() + extra
+        capacity = self._index.get_max_elements()
+        if needed > capacity:
+            self._index.resize_index(max(needed, capacity * 2))
+
+
+class _PartitionBuild:
+    """A build in progress: waiters block on `done`; writes meanwhile go to `pending`."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.partition: UserHnswPartition | None = None
+        self.error: BaseException | None = None
+        # ("upsert", label, vector) | ("remove", label, None), in commit order
+        self.pending: List[Tuple[str, int, Optional[Sequence[float]]]] = []
+
+
+class HnswIndexRegistry:
+    """
+    Holds one UserHnswPartition per user for the lifetime of the process.
+    """
+
+    def __init__(
+        self,
+        dim: int = 1536,
+        m: int | None = None,
+        ef_construction: int | None = None,
+        ef_search: int | None = None,
+        max_age_seconds: int | None = None,
+    ):
+        self.dim = dim
+        self.m = m or settings.hnsw_m
+        self.ef_construction = ef_construction or settings.hnsw_ef_construction
+        self.ef_search = ef_search or settings.hnsw_ef_search
+        self.max_age_seconds = (
+            max_age_seconds if max_age_seconds is not None else settings.hnsw_max_age_seconds
+        )
+
+        self._partitions: Dict[int, UserHnswPartition] = {}
+        self._builds: Dict[int, _PartitionBuild] = {}
+        self._lock = threading.Lock()
+
+    # ─────────────────────────────────────────────
+    # Partition lifecycle
+    # ─────────────────────────────────────────────
+    def build(self, user_id: int, loader: VectorLoader) -> UserHnswPartition:
+        """(Re)build the user's partition, or wait for the build already running."""
+        with self._lock:
+            build = self._builds.get(user_id)
+            owner = build is None
+            if owner:
+                # Registered before loading: anything committed from here
+                # on is recorded, anything earlier is in the snapshot
+                build = self._builds[user_id] = _PartitionBuild()
+
+        if not owner:
+            build.done.wait()
+            if build.error is not None:
+                raise build.error
+            return build.partition
+
+        try:
+            partition = self._load(user_id, loader)
+        except BaseException as e:
+            with self._lock:
+                del self._builds[user_id]
+            build.error = e
+            build.done.set()
+            raise
+
+        with self._lock:
+            for op, label, vector in build.pending:
+                if op == "upsert":
+                    partition.upsert(label, vector)
+                else:
+                    partition.remove(label)
+            self._partitions[user_id] = partition
+            del self._builds[user_id]
+        build.partition = partition
+        build.done.set()
+        return partition
+
+    def _load(self, user_id: int, loader: VectorLoader) -> UserHnswPartition:
+        labels, vectors = loader(user_id)
+
+        partition = UserHnswPartition(
+            dim=self.dim,
+            m=self.m,
+            ef_construction=self.ef_construction,
+            ef_search=self.ef_search,
+            capacity=len(labels),
+        )
+        partition.add_many(labels, vectors)
+        return partition
+
+    def cached(self, user_id: int) -> UserHnswPartition | None:
+        """The user's partition if it is built and fresh, without building."""
+        with self._lock:
+            partition = self._partitions.get(user_id)
+        if partition is None or self._is_stale(partition):
+            return None
+        return partition
+
+    def get_or_build(self, user_id: int, loader: VectorLoader) -> UserHnswPartition:
+        return self.cached(user_id) or self.build(user_id, loader)
+
+    def invalidate(self, user_id: int | None = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._partitions.clear()
+            else:
+                self._partitions.pop(user_id, None)
+
+    def _is_stale(self, partition: UserHnswPartition) -> bool:
+        if self.max_age_seconds <= 0:
+            return False
+        return time.monotonic() - partition.built_at > self.max_age_seconds
+
+    # ─────────────────────────────────────────────
+    # Incremental maintenance
+    # Partitions that were never built are skipped:
+    # the lazy build will read the row from the DB.
+    # Writes during a build are replayed after it.
+    # ─────────────────────────────────────────────
+    def upsert(self, user_id: int, label: int, vector: Sequence[float]) -> None:
+        with self._lock:
+            partition = self._partitions.get(user_id)
+            build = self._builds.get(user_id)
+            if build is not None:
+                build.pending.append(("upsert", label, vector))
+        if partition is not None:
+            partition.upsert(label, vector)
+
+    def remove(self, user_id: int, labels: Sequence[int]) -> None:
+        with self._lock:
+            partition = self._partitions.get(user_id)
+            build = self._builds.get(user_id)
+            if build is not None:
+                build.pending.extend(("remove", label, None) for label in labels)
+        if partition is not None:
+            for label in labels:
+                partition.remove(label)
+
+    # ─────────────────────────────────────────────
+    # Query
+    # ─────────────────────────────────────────────
+    def search(
+        self,
+        user_id: int,
+        vector: Sequence[float],
+        top_k: int,
+        loader: VectorLoader,
+    ) -> List[int]:
+        return self.get_or_build(user_id, loader).search(vector, top_k)
+
+    def search_chunks(
+        self,
+        user_id: int,
+        vector: Sequence[float],
+        top_k: int,
+        loader: VectorLoader,
+    ) -> List[Tuple[int, float]]:
+        return self.get_or_build(user_id, loader).search_chunks(vector, top_k)
+
+
+_registry: HnswIndexRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_hnsw_registry() -> HnswIndexRegistry:
+    """
+    Process-wide registry (repositories are transient, the index is not).
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = HnswIndexRegistry()
+        return _registry
@@ -15,12 +15,14 @@ if PROJECT_ROOT not in sys.path:
 
 # 3) Import modules
 from recallai_backend.core.db import Base, engine
+from recallai_backend.business.services.embedding_cache import embedding_cache_stats
 from recallai_backend.api.v1 import (
     notes_controller,
     chat_controller,
     bulk_controller,
     auth_controller,
     conversation_controller,
+    jobs_controller,
 )
 
 # 4) Create app (docs mounted at fixed /api/*)
@@ -38,6 +40,10 @@ app = FastAPI(
 def health():
     return {"status": "ok", "stage": STAGE_BASE}
 
+@app.get("/stats", tags=["system"])
+def stats():
+    return {"embedding_cache": embedding_cache_stats()}
+
 # 6) CORS
 app.add_middleware(
     CORSMiddleware,
@@ -53,6 +59,7 @@ app.include_router(notes_controller.router, prefix="/api")
 app.include_router(chat_controller.router, prefix="/api")
 app.include_router(bulk_controller.router, prefix="/api")
 app.include_router(conversation_controller.router, prefix="/api")
+app.include_router(jobs_controller.router, prefix="/api")
 
 # 8) Lambda adapter
 handler = Mangum(app)
@@ -0,0 +1,50 @@
+-- 001_embeddings_user_scope.sql
+--
+-- Scope vector search to a single user:
+--   * denormalize notes.user_id onto embeddings (backfilled here,
+--     written by NoteRepository.save_embedding from then on)
+--   * btree on user_id: exact scan of one user's rows for small corpora
+--   * one partial HNSW index per user bucket (user_id % 16), so an ANN
+--     scan only covers ~1/16 of the table before the user filter applies
+--
+-- The bucket count must match USER_BUCKETS in domain/models/embedding.py.
+--
+-- On a large live table run the CREATE INDEX statements one by one
+-- with CONCURRENTLY (outside a transaction) instead.
+--
+-- Requires pgvector >= 0.8: searches set hnsw.iterative_scan and
+-- hnsw.ef_search per transaction (embedding.widen_bucket_scan) so a
+-- filtered ANN scan keeps going until enough rows pass the user filter.
+
+BEGIN;
+
+ALTER TABLE embeddings
+    ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id) ON DELETE CASCADE;
+
+UPDATE embeddings e
+SET user_id = n.user_id
+FROM notes n
+WHERE n.id = e.note_id
+  AND e.user_id IS NULL;
+
+-- Orphans (note already gone) cannot be attributed to a user
+DELETE FROM embeddings WHERE user_id IS NULL;
+
+ALTER TABLE embeddings ALTER COLUMN user_id SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS ix_embeddings_user_id ON embeddings (user_id);
+
+DO $$
+BEGIN
+    FOR bucket IN 0..15 LOOP
+        EXECUTE format(
+            'CREATE INDEX IF NOT EXISTS ix_embeddings_vector_hnsw_b%s '
+            'ON embeddings USING hnsw (vector vector_l2_ops) '
+            'WHERE user_id %% 16 = %s',
+            bucket, bucket
+        );
+    END LOOP;
+END
+$$;
+
+COMMIT;
@@ -0,0 +1,13 @@
+-- 002_embedding_cache.sql
+--
+-- Persistent tier of the embedding cache (see EmbeddingService).
+-- Keyed on the embedding model and sha256 of the normalized input text,
+-- so identical content is only ever sent to OpenAI once per model.
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model       VARCHAR(100) NOT NULL,
+    text_hash   VARCHAR(64)  NOT NULL,
+    vector      vector(1536) NOT NULL,
+    created_at  TIMESTAMPTZ  DEFAULT now(),
+    PRIMARY KEY (model, text_hash)
+);
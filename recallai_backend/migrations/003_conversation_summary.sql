@@ -0,0 +1,9 @@
+-- 003_conversation_summary.sql
+--
+-- Rolling per-conversation summary (see ConversationSummarizer).
+-- `summary` covers every message with id <= summary_message_id; chat
+-- sends it plus the unsummarized tail instead of the full transcript.
+
+ALTER TABLE conversations
+    ADD COLUMN IF NOT EXISTS summary TEXT,
+    ADD COLUMN IF NOT EXISTS summary_message_id INTEGER;
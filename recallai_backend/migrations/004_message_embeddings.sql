@@ -0,0 +1,35 @@
+-- 004_message_embeddings.sql
+--
+-- Long-term chat memory: embeddings of past messages, searched across all
+-- of a user's conversations (MessageEmbeddingRepository.search).
+-- Rows are written after the message commits, by MessageEmbeddingWorker.
+--
+-- Same per-user-bucket partial HNSW layout as 001; the bucket count must
+-- match USER_BUCKETS in domain/models/embedding.py.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS message_embeddings (
+    id               SERIAL PRIMARY KEY,
+    message_id       INTEGER NOT NULL UNIQUE REFERENCES messages(id) ON DELETE CASCADE,
+    conversation_id  INTEGER NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
+    user_id          INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    vector           vector(1536) NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_message_embeddings_user_id ON message_embeddings (user_id);
+
+DO $$
+BEGIN
+    FOR bucket IN 0..15 LOOP
+        EXECUTE format(
+            'CREATE INDEX IF NOT EXISTS ix_message_embeddings_vector_hnsw_b%s '
+            'ON message_embeddings USING hnsw (vector vector_l2_ops) '
+            'WHERE user_id %% 16 = %s',
+            bucket, bucket
+        );
+    END LOOP;
+END
+$$;
+
+COMMIT;
@@ -0,0 +1,53 @@
+-- 005_ingestion_jobs.sql
+--
+-- Durable background ingestion: POST /jobs stores the uploads here and
+-- IngestionWorker processes them (claim with FOR UPDATE SKIP LOCKED,
+-- lease, per-chunk checkpoint in ingestion_job_files.chunks_done).
+-- Plain Postgres; nothing here needs an extension.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS ingestion_jobs (
+    id            SERIAL PRIMARY KEY,
+    user_id       INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    source        VARCHAR(255),
+
+    status        VARCHAR(16) NOT NULL DEFAULT 'queued',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL DEFAULT 3,
+    run_after     TIMESTAMPTZ NOT NULL DEFAULT now(),
+    locked_by     VARCHAR(64),
+    locked_until  TIMESTAMPTZ,
+    error         TEXT,
+
+    total_files   INTEGER NOT NULL DEFAULT 0,
+    files_done    INTEGER NOT NULL DEFAULT 0,
+    chunks_done   INTEGER NOT NULL DEFAULT 0,
+
+    created_at    TIMESTAMPTZ DEFAULT now(),
+    updated_at    TIMESTAMPTZ DEFAULT now(),
+    finished_at   TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS ix_ingestion_jobs_id ON ingestion_jobs (id);
+CREATE INDEX IF NOT EXISTS ix_ingestion_jobs_user_id ON ingestion_jobs (user_id);
+CREATE INDEX IF NOT EXISTS ix_ingestion_jobs_claimable
+    ON ingestion_jobs (run_after, id)
+    WHERE status IN ('queued', 'running');
+
+CREATE TABLE IF NOT EXISTS ingestion_job_files (
+    id              SERIAL PRIMARY KEY,
+    job_id          INTEGER NOT NULL REFERENCES ingestion_jobs(id) ON DELETE CASCADE,
+    position        INTEGER NOT NULL,
+    filename        VARCHAR(255) NOT NULL,
+    content_type    VARCHAR(255),
+    data            BYTEA,
+    extracted_text  TEXT,
+    status          VARCHAR(16) NOT NULL DEFAULT 'queued',
+    chunks_done     INTEGER NOT NULL DEFAULT 0,
+    error           TEXT
+);
+
+CREATE INDEX IF NOT EXISTS ix_ingestion_job_files_job_id ON ingestion_job_files (job_id);
+
+COMMIT;
@@ -0,0 +1,30 @@
+-- 006_note_chunk_embeddings.sql
+--
+-- Notes are embedded per chunk (iter_note_chunks) instead of as one
+-- vector: `embeddings` gets one row per (note_id, chunk_index), each with
+-- the chunk's content hash, so an edit only re-embeds changed chunks.
+--
+-- Existing rows become chunk 0 with no hash; they stay searchable and are
+-- replaced by real chunks the next time their note is edited.
+
+BEGIN;
+
+ALTER TABLE embeddings
+    ADD COLUMN IF NOT EXISTS chunk_index INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE embeddings
+    ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+-- One row per note no longer holds
+ALTER TABLE embeddings DROP CONSTRAINT IF EXISTS embeddings_note_id_key;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_embeddings_note_chunk') THEN
+        ALTER TABLE embeddings
+            ADD CONSTRAINT uq_embeddings_note_chunk UNIQUE (note_id, chunk_index);
+    END IF;
+END
+$$;
+
+COMMIT;
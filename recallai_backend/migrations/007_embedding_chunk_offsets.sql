@@ -0,0 +1,16 @@
+-- 007_embedding_chunk_offsets.sql
+--
+-- Character span of each note chunk within notes.content, so search can
+-- return the matching slice of a note instead of the whole note.
+-- NULL (single-chunk notes, rows from before this migration) means the
+-- chunk covers the whole note.
+
+BEGIN;
+
+ALTER TABLE embeddings
+    ADD COLUMN IF NOT EXISTS char_start INTEGER;
+
+ALTER TABLE embeddings
+    ADD COLUMN IF NOT EXISTS char_end INTEGER;
+
+COMMIT;
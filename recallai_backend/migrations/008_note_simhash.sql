@@ -0,0 +1,31 @@
+-- 008_note_simhash.sql
+--
+-- Near-duplicate chunk detection at ingest. Each ingested note stores the
+-- 64-bit SimHash of its text; LSH lookup goes through one expression index
+-- per 16-bit band (a candidate shares at least one band). Chunks kept in
+-- "link" mode point at the note they repeat and have no embedding.
+--
+-- Band layout must match business/services/near_duplicates.py.
+
+BEGIN;
+
+ALTER TABLE notes
+    ADD COLUMN IF NOT EXISTS simhash BIGINT;
+
+ALTER TABLE notes
+    ADD COLUMN IF NOT EXISTS duplicate_of INTEGER REFERENCES notes(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS ix_notes_simhash_band0
+    ON notes (user_id, ((simhash >> 48) & 65535))
+    WHERE simhash IS NOT NULL AND duplicate_of IS NULL;
+CREATE INDEX IF NOT EXISTS ix_notes_simhash_band1
+    ON notes (user_id, ((simhash >> 32) & 65535))
+    WHERE simhash IS NOT NULL AND duplicate_of IS NULL;
+CREATE INDEX IF NOT EXISTS ix_notes_simhash_band2
+    ON notes (user_id, ((simhash >> 16) & 65535))
+    WHERE simhash IS NOT NULL AND duplicate_of IS NULL;
+CREATE INDEX IF NOT EXISTS ix_notes_simhash_band3
+    ON notes (user_id, (simhash & 65535))
+    WHERE simhash IS NOT NULL AND duplicate_of IS NULL;
+
+COMMIT;
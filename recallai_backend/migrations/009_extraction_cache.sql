@@ -0,0 +1,19 @@
+-- 009_extraction_cache.sql
+--
+-- Persistent cache of extracted file text (PDF/DOCX/PPTX parsing, image
+-- OCR), keyed by the sha256 of the uploaded bytes and the extractor id
+-- (engine + version). Text is stored zlib-compressed; a re-uploaded file
+-- then costs a hash and one lookup. Shared by every app instance.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS extraction_cache (
+    content_hash  VARCHAR(64) NOT NULL,
+    extractor     VARCHAR(64) NOT NULL,
+    text_z        BYTEA NOT NULL,
+    chars         INTEGER NOT NULL,
+    created_at    TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (content_hash, extractor)
+);
+
+COMMIT;
@@ -0,0 +1,22 @@
+-- 010_openai_files.sql
+--
+-- Content hash → OpenAI file_id for chat attachments (PDFs sent as
+-- {"type": "file"} blocks). A PDF attached again within
+-- OPENAI_FILE_TTL_SECONDS reuses its file_id instead of being uploaded
+-- again; rows past expires_at are ignored and overwritten on re-upload.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS openai_files (
+    content_hash  VARCHAR(64) NOT NULL,
+    purpose       VARCHAR(32) NOT NULL,
+    file_id       VARCHAR(64) NOT NULL,
+    filename      VARCHAR(255),
+    created_at    TIMESTAMPTZ DEFAULT now(),
+    expires_at    TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (content_hash, purpose)
+);
+
+CREATE INDEX IF NOT EXISTS ix_openai_files_file_id ON openai_files (file_id);
+
+COMMIT;
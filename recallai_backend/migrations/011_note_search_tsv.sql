@@ -0,0 +1,22 @@
+-- 011_note_search_tsv.sql
+--
+-- Hybrid (lexical + vector) note search. search_tsv is a generated
+-- tsvector of title (weight A) and content (weight B), GIN-indexed;
+-- NoteRepository.search_chunks fuses its ranking with the vector one by
+-- reciprocal rank fusion when given the query text.
+--
+-- Adding a stored generated column rewrites the notes table once.
+-- Expression must match SEARCH_TSV_SQL in domain/models/note.py.
+
+BEGIN;
+
+ALTER TABLE notes
+    ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', content), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_notes_search_tsv ON notes USING GIN (search_tsv);
+
+COMMIT;
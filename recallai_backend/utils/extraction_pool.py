@@ -0,0 +1,191 @@
+"""
+Parallel text extraction for multi-file uploads.
+
+pdfplumber / python-docx / python-pptx parsing is CPU-bound, so each file
+is extracted in a shared process pool (one worker per available core)
+instead of on the event loop. A PDF is further split into page ranges
+that become tasks of their own, so one large PDF still uses every core.
+Workers read the upload from a path and write the text to a file next
+to it, so neither the document nor its text is ever pickled across the
+process boundary.
+
+A file that times out while a worker is still parsing it gets its pool
+recycled: the pool is replaced and its worker processes are killed, so a
+parser stuck on a hostile document can't hold a core forever. Other
+files that were running in that pool fail as "worker died".
+
+Where process pools can't start (AWS Lambda has no /dev/shm, so
+multiprocessing semaphores fail) the pool falls back to threads: parsing
+then shares the GIL, but still runs off the event loop.
+"""
+
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterator, List, Optional, Sequence, Tuple
+
+from recallai_backend.utils.file_extractor import TEXT_READ_CHARS, extract_text_local
+from recallai_backend.utils.pdf_extractor import (
+    DEFAULT_PDF_BACKEND,
+    extract_page_range_to_file,
+    page_ranges,
+    pdf_page_count,
+)
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[Executor] = None
+_pool_workers = 1
+_pool_lock = threading.Lock()
+
+
+def available_cores() -> int:
+    try:
+        # Respects container CPU pinning, unlike os.cpu_count()
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def get_extraction_pool(workers: int | None = None) -> Executor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None:
+            workers = _pool_workers = workers or available_cores()
+            try:
+                # spawn: the app process has DB connections and threads that
+                # must not be forked into workers
+                _pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+            except (OSError, NotImplementedError) as e:
+                logger.warning("Process pool unavailable (%s); extracting in threads", e)
+                _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract")
+        return _pool
+
+
+def _reset_pool(broken: Executor) -> None:
+    """Drop a pool whose worker died so the next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _recycle_pool(stuck: Executor) -> None:
+    """
+    Replace a pool with a hung job and kill its worker processes (threads
+    can't be killed: a thread pool is only replaced, the hung thread
+    finishes on its own).
+    """
+    # shutdown() clears _processes, so take them first
+    processes = list((getattr(stuck, "_processes", None) or {}).values())
+    _reset_pool(stuck)
+    for process in processes:
+        process.terminate()
+
+
+def _extract_to_file(src_path: str, filename: str, out_path: str, pdf_backend: str) -> int:
+    """Worker entry point: stream the document's text into out_path, return chars written."""
+    written = 0
+    with open(out_path, "w", encoding="utf-8") as out:
+        for piece in extract_text_local(src_path, filename, pdf_backend):
+            out.write(piece)
+            written += len(piece)
+    return written
+
+
+@dataclass
+class ExtractionResult:
+    filename: str
+    text_paths: List[str] = field(default_factory=list)  # in document order
+    chars: int = 0
+    error: Optional[str] = None
+    index: int = 0  # position in the `files` given to extract_files
+
+    def iter_text(self) -> Iterator[str]:
+        """The extracted text, read back in pieces (for iter_chunks)."""
+        for path in self.text_paths:
+            with open(path, "r", encoding="utf-8") as f:
+                while True:
+                    piece = f.read(TEXT_READ_CHARS)
+                    if not piece:
+                        break
+                    yield piece
+
+
+async def extract_files(
+    files: Sequence[Tuple[str, str]],
+    out_dir: str,
+    timeout: float,
+    workers: int | None = None,
+    pdf_backend: str = DEFAULT_PDF_BACKEND,
+) -> AsyncIterator[ExtractionResult]:
+    """
+    Extract (path, filename) pairs in the pool and yield results as each
+    file finishes. A file that fails or exceeds `timeout` seconds (counted
+    from submission, so time queued behind other uploads counts too)
+    yields a result with `error` set instead of failing the batch.
+    `workers` only sizes the pool when this call creates it; `pdf_backend`
+    is passed through to pdf_extractor.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_extraction_pool(workers)
+
+    def submit(index: int, path: str, filename: str) -> List[Tuple[Future, str]]:
+        if filename.lower().endswith(".pdf"):
+            ranges = page_ranges(pdf_page_count(path), _pool_workers)
+            if len(ranges) > 1:
+                jobs = []
+                for start, stop in ranges:
+                    out_path = os.path.join(out_dir, f"{index}-{start:06d}.txt")
+                    jobs.append((
+                        pool.submit(extract_page_range_to_file, path, pdf_backend, start, stop, out_path),
+                        out_path,
+                    ))
+                return jobs
+
+        out_path = os.path.join(out_dir, f"{index}.txt")
+        return [(pool.submit(_extract_to_file, path, filename, out_path, pdf_backend), out_path)]
+
+    async def run(index: int, path: str, filename: str) -> ExtractionResult:
+        jobs: List[Tuple[Future, str]] = []
+        try:
+            # Counting pages opens the PDF; keep that off the event loop too
+            jobs = await loop.run_in_executor(None, submit, index, path, filename)
+            chars = await asyncio.wait_for(
+                asyncio.gather(*(asyncio.wrap_future(f, loop=loop) for f, _ in jobs)), timeout
+            )
+            return ExtractionResult(filename, [out for _, out in jobs], sum(chars), index=index)
+        except asyncio.TimeoutError:
+            # Queued jobs just cancel; one already running can't be
+            # interrupted, so its worker goes down with the pool
+            running = [f for f, _ in jobs if not f.cancel() and not f.done()]
+            if running:
+                logger.warning("Recycling extraction pool: %s hung past %gs", filename, timeout)
+                _recycle_pool(pool)
+            return ExtractionResult(filename, error=f"extraction timed out after {timeout:g}s", index=index)
+        except BrokenProcessPool as e:
+            _reset_pool(pool)
+            return ExtractionResult(filename, error=f"extraction worker died: {e}", index=index)
+        except Exception as e:
+            for future, _ in jobs:
+                future.cancel()
+            return ExtractionResult(filename, error=f"{type(e).__name__}: {e}", index=index)
+
+    tasks: List[asyncio.Task] = [
+        asyncio.create_task(run(i, path, filename)) for i, (path, filename) in enumerate(files)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            if result.error:
+                logger.warning("Skipping %s: %s", result.filename, result.error)
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
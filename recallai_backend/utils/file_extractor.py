@@ -1,71 +1,423 @@
+import asyncio
+import base64
+import codecs
+import hashlib
 import io
+import os
+import re
+import secrets
 import zipfile
-from typing import List
+import zlib
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
-import pdfplumber
 import docx              # python-docx
 from pptx import Presentation   # python-pptx
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from recallai_backend.core.config import settings
+from recallai_backend.domain.interfaces.i_extraction_cache_repository import IExtractionCacheRepository
+from recallai_backend.utils.image_preprocessor import prepare_image
+from recallai_backend.utils.pdf_extractor import DEFAULT_PDF_BACKEND, iter_pdf_pages
+
 client = OpenAI()
+async_client = AsyncOpenAI()
+
+# Raw bytes, a path, or an open binary file (e.g. UploadFile.file, which
+# Starlette spools to disk past 1 MB). File objects are rewound, not closed.
+Source = Union[bytes, str, os.PathLike, BinaryIO]
+
+# Plain-text reads are yielded in pieces of this many characters
+TEXT_READ_CHARS = 1 << 20
+
+# Yielded instead of text when a format isn't supported
+UNSUPPORTED_TEXT = "Unable to extract text locally."
+
+
+@contextmanager
+def _open_binary(source: Source) -> Iterator[BinaryIO]:
+    if isinstance(source, (bytes, bytearray)):
+        yield io.BytesIO(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield f
+    else:
+        source.seek(0)
+        yield source
+
+
+def _iter_text(binary: BinaryIO) -> Iterator[str]:
+    reader = io.TextIOWrapper(binary, encoding="utf-8", errors="ignore")
+    try:
+        while True:
+            piece = reader.read(TEXT_READ_CHARS)
+            if not piece:
+                return
+            yield piece
+    finally:
+        # Don't let the wrapper close a file we don't own
+        reader.detach()
 
 
 # --------------------------------------------------
 # LOCAL EXTRACTION (NO GPT)
 # --------------------------------------------------
-def extract_text_local(file_bytes: bytes, filename: str) -> str:
+def extract_text_local(
+    source: Source,
+    filename: str,
+    pdf_backend: str = DEFAULT_PDF_BACKEND,
+) -> Iterator[str]:
+    """
+    Yield the document's text one page / slide / paragraph / read at a
+    time, so callers can clean, chunk and embed it without ever holding
+    the whole text. Pieces carry their own line breaks; concatenated they
+    give the full document text. `pdf_backend` picks the PDF engine
+    (see pdf_extractor; "pdfplumber" for layout-sensitive documents).
+    """
     ext = filename.lower().split(".")[-1]
 
-    # ----- PDF -----
-    if ext == "pdf":
-        text_parts = []
-        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text() or ""
-                text_parts.append(text)
-        return "\n".join(text_parts)
-
-    # ----- DOCX -----
-    if ext == "docx":
-        try:
-            doc_obj = docx.Document(io.BytesIO(file_bytes))
-            return "\n".join([p.text for p in doc_obj.paragraphs])
-        except Exception as e:
-            return f"[DOCX extraction error] {e}"
-
-    # ----- PPTX -----
-    if ext == "pptx":
-        try:
-            prs = Presentation(io.BytesIO(file_bytes))
-            text = []
-            for slide in prs.slides:
-                for shape in slide.shapes:
-                    if hasattr(shape, "text"):
-                        text.append(shape.text)
-            return "\n".join(text)
-        except Exception as e:
-            return f"[PPTX extraction error] {e}"
-
-    # ----- TXT -----
-    if ext == "txt":
-        return file_bytes.decode("utf-8", errors="ignore")
-
-    # ----- ZIP (TXT files only) -----
-    if ext == "zip":
-        try:
-            with zipfile.ZipFile(io.BytesIO(file_bytes)) as z:
-                texts = []
-                for name in z.namelist():
-                    if name.lower().endswith(".txt"):
-                        texts.append(
-                            z.read(name).decode("utf-8", errors="ignore")
-                        )
-            return "\n".join(texts)
-        except Exception as e:
-            return f"[ZIP extraction error] {e}"
+    with _open_binary(source) as f:
+        # ----- PDF -----
+        if ext == "pdf":
+            yield from iter_pdf_pages(f, pdf_backend)
+            return
+
+        # ----- DOCX -----
+        if ext == "docx":
+            try:
+                doc_obj = docx.Document(f)
+                for p in doc_obj.paragraphs:
+                    yield p.text + "\n"
+            except Exception as e:
+                yield f"[DOCX extraction error] {e}"
+            return
+
+        # ----- PPTX -----
+        if ext == "pptx":
+            try:
+                prs = Presentation(f)
+                for slide in prs.slides:
+                    texts = [shape.text for shape in slide.shapes if getattr(shape, "text", "")]
+                    if texts:
+                        yield "\n".join(texts) + "\n"
+            except Exception as e:
+                yield f"[PPTX extraction error] {e}"
+            return
+
+        # ----- TXT -----
+        if ext == "txt":
+            yield from _iter_text(f)
+            return
+
+        # ----- ZIP (TXT files only) -----
+        if ext == "zip":
+            try:
+                with zipfile.ZipFile(f) as z:
+                    for name in z.namelist():
+                        if name.lower().endswith(".txt"):
+                            with z.open(name) as member:
+                                yield from _iter_text(member)
+                            yield "\n"
+            except Exception as e:
+                yield f"[ZIP extraction error] {e}"
+            return
 
     # Fallback
-    return "Unable to extract text locally."
+    yield UNSUPPORTED_TEXT
+
+
+def extract_text_to_string(
+    source: Source,
+    filename: str,
+    max_chars: int | None = None,
+    cache: Optional["ExtractionCache"] = None,
+) -> str:
+    """
+    extract_text_local joined into one string, optionally stopping after
+    `max_chars` (for prompts, which are bounded anyway). With a cache, a
+    file seen before isn't parsed again; a new one is only cached if it
+    was read to the end.
+    """
+    pieces = cache.extract(source, filename) if cache else extract_text_local(source, filename)
+    parts: List[str] = []
+    size = 0
+    for piece in pieces:
+        if max_chars is not None and size + len(piece) >= max_chars:
+            parts.append(piece[: max_chars - size])
+            break
+        parts.append(piece)
+        size += len(piece)
+    return "".join(parts).strip()
+
+
+# --------------------------------------------------
+# IMAGES (GPT OCR)
+# --------------------------------------------------
+IMAGE_EXTS = ["png", "jpg", "jpeg", "gif", "webp"]
+
+
+def is_image(filename: str, content_type: str | None) -> bool:
+    ext = filename.lower().split(".")[-1]
+    return ext in IMAGE_EXTS or bool(content_type and content_type.startswith("image/"))
+
+
+OCR_MODEL = "gpt-4o"
+OCR_PROMPT = "Extract text from this image. Output raw text."
+OCR_BATCH_PROMPT = (
+    "Extract the text from each of the {n} images. Every image is preceded by "
+    "its label. For each image, in the order given, output its label exactly "
+    "as written on a line of its own, then that image's raw text. Output "
+    "nothing else; an image without text gets its label and nothing after it."
+)
+
+
+def _image_block(image_url: str) -> dict:
+    return {"type": "image_url", "image_url": {"url": image_url}}
+
+
+def ocr_image(file_bytes: bytes, mime: str, prepare: bool = True) -> str | None:
+    if prepare:
+        # Downsized and re-encoded: the model sees no more than this anyway
+        image_url = prepare_image(file_bytes, mime).data_url
+    else:
+        image_url = f"data:{mime};base64,{base64.b64encode(file_bytes).decode()}"
+
+    completion = client.chat.completions.create(
+        model=OCR_MODEL,
+        messages=[
+            {"role": "system", "content": OCR_PROMPT},
+            {"role": "user", "content": [_image_block(image_url)]},
+        ],
+    )
+    return completion.choices[0].message.content
+
+
+# --------------------------------------------------
+# BATCHED OCR: several images per request, requests run concurrently
+# --------------------------------------------------
+def _ocr_label(nonce: str, n: int) -> str:
+    # The nonce keeps text that happens to look like a label from matching
+    return f"<<<IMAGE {nonce} {n}>>>"
+
+
+def parse_ocr_batch(content: str, nonce: str, count: int) -> List[str | None]:
+    """
+    Split a batched answer at its labels. An image whose label is missing,
+    repeated or out of range gets None (and is asked for on its own).
+    """
+    parts = re.split(rf"<<<IMAGE {nonce} (\d+)>>>", content or "")
+    found: Dict[int, str] = {}
+    repeated = set()
+    for n, text in zip(parts[1::2], parts[2::2]):
+        i = int(n) - 1
+        if i in found:
+            repeated.add(i)
+        found[i] = text.strip()
+    return [found[i] if i in found and i not in repeated else None for i in range(count)]
+
+
+async def _ocr_request(image_urls: List[str]) -> List[str | None]:
+    if len(image_urls) == 1:
+        messages = [
+            {"role": "system", "content": OCR_PROMPT},
+            {"role": "user", "content": [_image_block(image_urls[0])]},
+        ]
+    else:
+        nonce = secrets.token_hex(4)
+        content = []
+        for n, url in enumerate(image_urls, start=1):
+            content += [{"type": "text", "text": _ocr_label(nonce, n)}, _image_block(url)]
+        messages = [
+            {"role": "system", "content": OCR_BATCH_PROMPT.format(n=len(image_urls))},
+            {"role": "user", "content": content},
+        ]
+
+    completion = await async_client.chat.completions.create(model=OCR_MODEL, messages=messages)
+    answer = completion.choices[0].message.content
+    if len(image_urls) == 1:
+        return [answer]
+    return parse_ocr_batch(answer, nonce, len(image_urls))
+
+
+def ocr_batches(sizes: Sequence[int], max_images: int, max_bytes: int) -> List[List[int]]:
+    """Greedy, in order: indexes grouped by image count and data URL bytes."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_bytes = 0
+    for i, size in enumerate(sizes):
+        if current and (len(current) >= max_images or current_bytes + size > max_bytes):
+            batches.append(current)
+            current, current_bytes = [], 0
+        current.append(i)
+        current_bytes += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def ocr_images(images: Sequence[Tuple[bytes, str]]) -> List[str | None]:
+    """
+    OCR for many (bytes, mime) images; results in input order. Images are
+    prepared in threads, grouped OCR_BATCH_IMAGES to a request with a
+    labelled section per image in the answer, and the requests run
+    concurrently, at most OCR_CONCURRENCY at a time. An image the model's
+    answer can't be mapped back to is asked for on its own.
+    """
+    if not images:
+        return []
+
+    prepared = await asyncio.gather(*(asyncio.to_thread(prepare_image, data, mime) for data, mime in images))
+    urls = [image.data_url for image in prepared]
+    results: List[str | None] = [None] * len(images)
+    limiter = asyncio.Semaphore(settings.ocr_concurrency)
+
+    async def run(batch: List[int]) -> None:
+        async with limiter:
+            texts = await _ocr_request([urls[i] for i in batch])
+        unmapped = []
+        for i, text in zip(batch, texts):
+            if text is None and len(batch) > 1:
+                unmapped.append(i)
+            results[i] = text
+        await asyncio.gather(*(run([i]) for i in unmapped))
+
+    batches = ocr_batches([len(u) for u in urls], settings.ocr_batch_images, settings.ocr_batch_max_bytes)
+    await asyncio.gather(*(run(batch) for batch in batches))
+    return results
+
+
+# --------------------------------------------------
+# EXTRACTION CACHE: (sha256 of the bytes, extractor id) → compressed text
+# --------------------------------------------------
+# Bump when extracted text changes for the same bytes (parser upgrade, new
+# cleanup); entries of older versions are then never hit again.
+EXTRACTOR_VERSION = 1
+OCR_EXTRACTOR = f"ocr/{OCR_MODEL}@{EXTRACTOR_VERSION}"
+
+HASH_READ_BYTES = 1 << 20
+_COMPRESS_LEVEL = 6
+
+# (content_hash, extractor)
+CacheKey = Tuple[str, str]
+
+
+def extractor_id(filename: str, pdf_backend: str = DEFAULT_PDF_BACKEND) -> str:
+    ext = filename.lower().split(".")[-1]
+    engine = f"pdf/{pdf_backend}" if ext == "pdf" else ext
+    return f"{engine}@{EXTRACTOR_VERSION}"
+
+
+def sha256_source(source: Source) -> str:
+    h = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray)):
+        h.update(source)
+    else:
+        with _open_binary(source) as f:
+            while chunk := f.read(HASH_READ_BYTES):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def iter_compressed_text(text_z: bytes) -> Iterator[str]:
+    """Decompress a cached entry back into text pieces, a slice at a time."""
+    inflate = zlib.decompressobj()
+    decode = codecs.getincrementaldecoder("utf-8")()
+    for start in range(0, len(text_z), HASH_READ_BYTES):
+        piece = decode.decode(inflate.decompress(text_z[start:start + HASH_READ_BYTES]))
+        if piece:
+            yield piece
+    tail = decode.decode(inflate.flush(), final=True)
+    if tail:
+        yield tail
+
+
+def _is_failure(piece: str) -> bool:
+    # Error / fallback placeholders are never cached: a fix should apply next time
+    return piece == UNSUPPORTED_TEXT or (piece.startswith("[") and "extraction error]" in piece[:40])
+
+
+class ExtractionCache:
+    """
+    Read-through cache of extracted text over an IExtractionCacheRepository.
+    Writes only flush; the caller's commit persists new entries.
+    """
+
+    def __init__(self, repo: IExtractionCacheRepository):
+        self.repo = repo
+
+    def lookup(self, keys: Iterable[CacheKey]) -> Dict[CacheKey, bytes]:
+        return self.repo.get_many(keys)
+
+    def store(self, key: CacheKey, pieces: Iterable[str]) -> Iterator[str]:
+        """
+        Pass `pieces` through, compressing them on the way; the entry is
+        written once they are exhausted (a caller that stops early, or an
+        extraction that fails, stores nothing).
+        """
+        deflate = zlib.compressobj(_COMPRESS_LEVEL)
+        parts: List[bytes] = []
+        chars = 0
+        failed = False
+        for piece in pieces:
+            failed = failed or _is_failure(piece)
+            parts.append(deflate.compress(piece.encode("utf-8")))
+            chars += len(piece)
+            yield piece
+        parts.append(deflate.flush())
+        if not failed:
+            self.repo.put(key[0], key[1], b"".join(parts), chars)
+
+    def extract(self, source: Source, filename: str, pdf_backend: str = DEFAULT_PDF_BACKEND) -> Iterator[str]:
+        """extract_text_local, unless these bytes were extracted the same way before."""
+        key = (sha256_source(source), extractor_id(filename, pdf_backend))
+        cached = self.lookup([key]).get(key)
+        if cached is not None:
+            return iter_compressed_text(cached)
+        return self.store(key, extract_text_local(source, filename, pdf_backend))
+
+    def ocr(self, file_bytes: bytes, mime: str) -> str | None:
+        """ocr_image, paid for once per distinct image."""
+        key = (hashlib.sha256(file_bytes).hexdigest(), OCR_EXTRACTOR)
+        cached = self.lookup([key]).get(key)
+        if cached is not None:
+            return "".join(iter_compressed_text(cached))
+
+        text = ocr_image(file_bytes, mime)
+        self._put_text(key, text)
+        return text
+
+    async def ocr_many(self, images: Sequence[Tuple[bytes, str]]) -> List[str | None]:
+        """ocr_images for the (bytes, mime) images not cached yet; one lookup, results in input order."""
+        keys = [(hashlib.sha256(data).hexdigest(), OCR_EXTRACTOR) for data, _ in images]
+        cached = await asyncio.to_thread(self.lookup, keys)
+        texts: List[str | None] = [
+            "".join(iter_compressed_text(cached[key])) if key in cached else None for key in keys
+        ]
+
+        # Each distinct missing image is read once
+        misses: Dict[CacheKey, int] = {}
+        for i, key in enumerate(keys):
+            if key not in cached:
+                misses.setdefault(key, i)
+        fresh = await ocr_images([images[i] for i in misses.values()])
+
+        found = dict(zip(misses, fresh))
+        for i, key in enumerate(keys):
+            if key in found:
+                texts[i] = found[key]
+
+        def put_all() -> None:
+            for key, text in found.items():
+                self._put_text(key, text)
+
+        await asyncio.to_thread(put_all)
+        return texts
+
+    def _put_text(self, key: CacheKey, text: str | None) -> None:
+        if text and text.strip():
+            # Consumed for its side effect: compress + put
+            for _ in self.store(key, [text]):
+                pass
 
 
 # --------------------------------------------------
@@ -97,9 +449,14 @@ def clean_text_gpt(raw_text: str) -> str:
 # --------------------------------------------------
 # MAIN ENTRY: Combine Local + (optional) GPT cleaning
 # --------------------------------------------------
-def extract_text_gpt(file_bytes_list: List[bytes], filenames: List[str]) -> str:
-    raw = extract_text_local(file_bytes_list[0], filenames[0])
+def extract_text_gpt(
+    source: Source,
+    filename: str,
+    max_chars: int | None = None,
+    cache: Optional[ExtractionCache] = None,
+) -> str:
+    raw = extract_text_to_string(source, filename, max_chars, cache)
 
     # OPTIONAL: clean text with GPT
     # (Remove this if you want PURE raw extraction)
-    return extract_text_local(raw)
\ No newline at end of file
+    return raw
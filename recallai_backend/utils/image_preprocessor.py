@@ -0,0 +1,166 @@
+"""
+Image preparation before a vision call: decode → downsize → re-encode.
+
+A phone photo is sent as a base64 data URL, so every byte costs 4/3 in
+the request. gpt-4o never looks at more than 2048 px on the long side
+and 768 px on the short side (high detail), so anything larger is sent
+to be thrown away. prepare_image:
+
+    decode    EXIF orientation applied; JPEGs are decoded at reduced scale
+              (draft mode) when they will be shrunk anyway
+    resize    down to IMAGE_MAX_LONG_SIDE / IMAGE_MAX_SHORT_SIDE
+    encode    IMAGE_FORMAT (jpeg or webp; webp whenever there is alpha)
+              at IMAGE_QUALITY, written without EXIF/XMP/ICC metadata
+
+Every stage is timed. Results are cached in-process by sha256 of the
+input (byte-bounded LRU), so the same image attached again costs a hash.
+Input Pillow can't decode is passed through unchanged.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from recallai_backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MIME = {"jpeg": "image/jpeg", "webp": "image/webp"}
+_ALPHA_MODES = ("RGBA", "LA", "PA")
+
+
+@dataclass
+class PreparedImage:
+    data: bytes
+    mime: str
+    width: int
+    height: int
+    original_bytes: int
+    timings_ms: Dict[str, float] = field(default_factory=dict)  # stage → ms
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime};base64,{base64.b64encode(self.data).decode()}"
+
+
+def target_size(width: int, height: int, max_long: int, max_short: int) -> Tuple[int, int]:
+    """Largest size within both limits, aspect ratio kept; never upscales."""
+    scale = min(1.0, max_long / max(width, height), max_short / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _has_alpha(img: Image.Image) -> bool:
+    return img.mode in _ALPHA_MODES or (img.mode == "P" and "transparency" in img.info)
+
+
+def _prepare(data: bytes, mime: str) -> PreparedImage:
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    def lap(stage: str) -> None:
+        nonlocal started
+        now = time.perf_counter()
+        timings[stage] = (now - started) * 1000
+        started = now
+
+    try:
+        img = Image.open(io.BytesIO(data))
+        size = target_size(*img.size, settings.image_max_long_side, settings.image_max_short_side)
+        if img.format == "JPEG" and size != img.size:
+            # Let libjpeg decode at 1/2, 1/4 or 1/8 scale, still >= size
+            img.draft("RGB", size)
+        img = ImageOps.exif_transpose(img)  # also loads the (first) frame
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        logger.warning("image prep: can't decode %s (%s), sending it as is", mime, e)
+        return PreparedImage(data, mime, 0, 0, len(data), timings)
+    lap("decode")
+
+    size = target_size(*img.size, settings.image_max_long_side, settings.image_max_short_side)
+    if size != img.size:
+        img = img.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    lap("resize")
+
+    fmt = "webp" if _has_alpha(img) else settings.image_format
+    img = img.convert("RGBA" if fmt == "webp" and _has_alpha(img) else "RGB")
+    out = io.BytesIO()
+    # Nothing from img.info is passed on: EXIF (GPS etc.), XMP and ICC are dropped
+    if fmt == "webp":
+        img.save(out, "WEBP", quality=settings.image_quality, method=4)
+    else:
+        img.save(out, "JPEG", quality=settings.image_quality, optimize=True, progressive=True)
+    lap("encode")
+
+    return PreparedImage(out.getvalue(), _MIME[fmt], img.width, img.height, len(data), timings)
+
+
+class _LruImageCache:
+    """Byte-bounded LRU of prepared images."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, PreparedImage]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> PreparedImage | None:
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+            return image
+
+    def put(self, key: str, image: PreparedImage) -> None:
+        cost = len(image.data)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.data)
+            self._entries[key] = image
+            self._bytes += cost
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# Process-wide, like the embedding LRU
+image_cache = _LruImageCache(settings.image_cache_max_bytes)
+
+
+def prepare_image(data: bytes, mime: str) -> PreparedImage:
+    """`data` made ready for a vision call (see module docstring); cached by content hash."""
+    started = time.perf_counter()
+    key = hashlib.sha256(data).hexdigest()
+    hash_ms = (time.perf_counter() - started) * 1000
+
+    cached = image_cache.get(key)
+    if cached is not None:
+        logger.debug("image prep: cache hit %s (%.1f ms)", key[:12], hash_ms)
+        return cached
+
+    image = _prepare(data, mime)
+    image.timings_ms = {"hash": hash_ms, **image.timings_ms}
+    image_cache.put(key, image)
+
+    logger.info(
+        "image prep: %s %d KB → %s %dx%d %d KB (%s)",
+        mime, len(data) // 1024, image.mime, image.width, image.height, len(image.data) // 1024,
+        " ".join(f"{stage}={ms:.1f}ms" for stage, ms in image.timings_ms.items()),
+    )
+    return image
@@ -0,0 +1,201 @@
+"""
+PDF text extraction engine: selectable backends, page-range parallelism.
+
+Backends, fastest first:
+
+    pdfium      pypdfium2 (PDFium, C++). Reading-order text, no layout
+                analysis. The default.
+    pdfminer    pdfminer.six low-level API (PDFPageInterpreter +
+                TextConverter), without pdfplumber's object model on top.
+    pdfplumber  Slowest; keeps pdfplumber's layout-aware text grouping for
+                documents where column/table order matters.
+
+A document is split into page ranges that are extracted independently,
+each range opening the file on its own, so ranges can run in separate
+worker processes (extract_pdf_parallel, or the shared bulk-upload pool in
+extraction_pool). Every page is yielded as its text plus "\\n".
+"""
+
+import io
+import math
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Tuple, Union
+
+PdfSource = Union[str, os.PathLike, BinaryIO]
+
+PDF_BACKENDS = ("pdfium", "pdfminer", "pdfplumber")
+DEFAULT_PDF_BACKEND = "pdfium"
+
+# Smallest range worth a task of its own (each task re-opens the document)
+MIN_PAGES_PER_TASK = 8
+
+# PDFium is not thread-safe; serialize calls within a process (a no-op
+# cost in process workers, required in the thread-pool fallback)
+_PDFIUM_LOCK = threading.Lock()
+
+
+def _check_backend(backend: str) -> None:
+    if backend not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend {backend!r}; expected one of {', '.join(PDF_BACKENDS)}")
+
+
+@contextmanager
+def _open_pdf(source: PdfSource) -> Iterator[BinaryIO]:
+    """Path → opened file; file object → rewound, left open."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield f
+    else:
+        source.seek(0)
+        yield source
+
+
+# ─────────────────────────────────────────────
+# BACKENDS (one page range, in-process)
+# ─────────────────────────────────────────────
+def _pages_pdfium(source: PdfSource, start: int, stop: int | None) -> Iterator[str]:
+    import pypdfium2 as pdfium
+
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(source)
+    try:
+        stop = len(pdf) if stop is None else min(stop, len(pdf))
+        for i in range(start, stop):
+            with _PDFIUM_LOCK:
+                page = pdf[i]
+                textpage = page.get_textpage()
+                text = textpage.get_text_range()
+                textpage.close()
+                page.close()
+            yield text.replace("\r\n", "\n") + "\n"
+    finally:
+        with _PDFIUM_LOCK:
+            pdf.close()
+
+
+def _pages_pdfminer(source: PdfSource, start: int, stop: int | None) -> Iterator[str]:
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    resources = PDFResourceManager(caching=True)
+    laparams = LAParams()
+    pagenos = None if stop is None else set(range(start, stop))
+
+    with _open_pdf(source) as f:
+        for i, page in enumerate(PDFPage.get_pages(f, pagenos=pagenos)):
+            if stop is None and i < start:
+                continue
+            out = io.StringIO()
+            device = TextConverter(resources, out, laparams=laparams)
+            PDFPageInterpreter(resources, device).process_page(page)
+            device.close()
+            # TextConverter ends each page with a form feed
+            yield out.getvalue().rstrip("\x0c") + "\n"
+
+
+def _pages_pdfplumber(source: PdfSource, start: int, stop: int | None) -> Iterator[str]:
+    import pdfplumber
+
+    pages = None if stop is None else list(range(start + 1, stop + 1))
+    with pdfplumber.open(source, pages=pages) as pdf:
+        for page in pdf.pages:
+            if page.page_number <= start:
+                continue
+            yield (page.extract_text() or "") + "\n"
+            # Drop parsed layout objects before the next page
+            page.close()
+
+
+_BACKENDS = {
+    "pdfium": _pages_pdfium,
+    "pdfminer": _pages_pdfminer,
+    "pdfplumber": _pages_pdfplumber,
+}
+
+
+def iter_pdf_pages(
+    source: PdfSource,
+    backend: str = DEFAULT_PDF_BACKEND,
+    start: int = 0,
+    stop: int | None = None,
+) -> Iterator[str]:
+    """Yield the text of pages [start, stop) one page at a time, in this process."""
+    _check_backend(backend)
+    if not isinstance(source, (str, os.PathLike)):
+        source.seek(0)
+    return _BACKENDS[backend](source, start, stop)
+
+
+# ─────────────────────────────────────────────
+# PAGE RANGES (for parallel workers)
+# ─────────────────────────────────────────────
+def pdf_page_count(source: PdfSource) -> int:
+    import pypdfium2 as pdfium
+
+    if not isinstance(source, (str, os.PathLike)):
+        source.seek(0)
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(source)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+
+def page_ranges(page_count: int, workers: int, min_pages: int = MIN_PAGES_PER_TASK) -> List[Tuple[int, int]]:
+    """Split [0, page_count) into at most `workers` contiguous ranges of at least `min_pages`."""
+    if page_count <= 0:
+        return []
+    size = max(min_pages, math.ceil(page_count / max(workers, 1)))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def extract_page_range(path: str, backend: str, start: int, stop: int) -> List[str]:
+    """Worker entry point: the pages of one range as a list."""
+    return list(iter_pdf_pages(path, backend, start, stop))
+
+
+def extract_page_range_to_file(path: str, backend: str, start: int, stop: int, out_path: str) -> int:
+    """Worker entry point: stream one range's text into out_path, return chars written."""
+    written = 0
+    with open(out_path, "w", encoding="utf-8") as out:
+        for page in iter_pdf_pages(path, backend, start, stop):
+            out.write(page)
+            written += len(page)
+    return written
+
+
+def extract_pdf_parallel(
+    path: str,
+    backend: str = DEFAULT_PDF_BACKEND,
+    workers: int | None = None,
+    executor: Executor | None = None,
+) -> Iterator[str]:
+    """
+    Extract one PDF with its page ranges spread over `workers` processes
+    (or a caller's executor) and yield pages in document order.
+    """
+    _check_backend(backend)
+    workers = workers or os.cpu_count() or 1
+    ranges = page_ranges(pdf_page_count(path), workers)
+
+    if len(ranges) <= 1:
+        yield from iter_pdf_pages(path, backend)
+        return
+
+    own = executor is None
+    if own:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=mp.get_context("spawn"))
+    try:
+        futures = [executor.submit(extract_page_range, path, backend, start, stop) for start, stop in ranges]
+        for future in futures:
+            yield from future.result()
+    finally:
+        if own:
+            executor.shutdown(cancel_futures=True)
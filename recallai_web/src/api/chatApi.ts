@@ -42,7 +42,7 @@ export async function uploadNotes(files: File[], user_id: number) {
     },
   });
 
-  return response.data; // List<NoteResponseDTO>
+  return response.data; // BulkUploadResponseDTO: { notes, errors: [{ filename, error }] }
 }
 
 export async function uploadChat(
@@ -50,9 +50,16 @@ export function UploadNotes({ setNotes }: UploadNotesProps) {
     setStatus("Processing files...");
 
     try {
-      const uploadedNotes = await uploadNotes(files, user.id);
-
-      setStatus("Notes imported successfully!");
+      const { notes: uploadedNotes, errors } = await uploadNotes(files, user.id);
+
+      if (errors && errors.length) {
+        const failed = errors
+          .map((e: { filename: string; error: string }) => `${e.filename} (${e.error})`)
+          .join(", ");
+        setStatus(`Imported with errors. Not imported: ${failed}`);
+      } else {
+        setStatus("Notes imported successfully!");
+      }
 
       // Notify parent to update UI
       if (setNotes && uploadedNotes) {
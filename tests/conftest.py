@@ -0,0 +1,56 @@
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from recallai_backend.business.services import chunker, tokenizer
+from recallai_backend.core.db import SessionLocal
+
+
+@pytest.fixture
+def db():
+    """A session on DATABASE_URL (migrations applied); skips the test without one."""
+    session = SessionLocal()
+    try:
+        session.execute(text("SELECT 1"))
+    except OperationalError:
+        pytest.skip("no database at DATABASE_URL")
+    yield session
+    session.close()
+
+
+def create_user(db, user_id: int) -> None:
+    db.execute(
+        text("INSERT INTO users (id, email, password) VALUES (:id, :email, 'x')"),
+        {"id": user_id, "email": f"test-{uuid.uuid4().hex}@example.invalid"},
+    )
+
+
+class WordEncoding:
+    """Stand-in for a tiktoken encoding: one token per whitespace-separated word."""
+
+    def __init__(self):
+        self._ids = {}
+        self._words = []
+
+    def encode(self, text, disallowed_special=()):
+        tokens = []
+        for word in text.split():
+            if word not in self._ids:
+                self._ids[word] = len(self._words)
+                self._words.append(word)
+            tokens.append(self._ids[word])
+        return tokens
+
+    def decode(self, tokens):
+        return " ".join(self._words[t] for t in tokens)
+
+
+@pytest.fixture
+def word_tokens(monkeypatch):
+    """Token counting without tiktoken's BPE download (see WordEncoding)."""
+    enc = WordEncoding()
+    monkeypatch.setattr(tokenizer, "get_encoding", lambda model=None: enc)
+    monkeypatch.setattr(chunker, "get_encoding", lambda model=None: enc)
+    return enc
@@ -0,0 +1,51 @@
+"""
+Filtered ANN search on a shared user bucket (needs Postgres + pgvector >= 0.8
+at DATABASE_URL with the migrations applied; skipped otherwise).
+"""
+
+import numpy as np
+from sqlalchemy import text
+
+from conftest import create_user
+from recallai_backend.domain.models.embedding import USER_BUCKETS
+from recallai_backend.domain.models.note import NewNote
+from recallai_backend.domain.repositories.note_repository import NoteRepository
+
+DIM = 1536
+HEAVY_NOTES = 400
+LIGHT_NOTES = 30
+
+
+def test_user_sharing_bucket_with_heavier_user_gets_top_k(db):
+    base = db.execute(text("SELECT coalesce(max(id), 0) + 1000 FROM users")).scalar_one()
+    heavy = base - base % USER_BUCKETS + USER_BUCKETS
+    light = heavy + USER_BUCKETS  # same bucket
+    rng = np.random.default_rng(0)
+    query = np.ones(DIM, dtype=np.float32)
+
+    try:
+        create_user(db, heavy)
+        create_user(db, light)
+        repo = NoteRepository(db)
+        # The heavy user's chunks all sit closer to the query than the light user's
+        repo.bulk_create_with_embeddings(heavy, [
+            NewNote("h", f"heavy {i}", "test", query + rng.normal(0, 0.01, DIM).astype(np.float32))
+            for i in range(HEAVY_NOTES)
+        ])
+        repo.bulk_create_with_embeddings(light, [
+            NewNote("l", f"light {i}", "test", query + rng.normal(0, 1.0, DIM).astype(np.float32))
+            for i in range(LIGHT_NOTES)
+        ])
+        db.commit()
+
+        # Make the planner use the bucket's HNSW index even on a small table
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+        hits = repo.search_chunks(query, 15, user_id=light)
+
+        assert len(hits) == 15
+        assert all(h.note.user_id == light for h in hits)
+    finally:
+        db.rollback()
+        db.execute(text("DELETE FROM notes WHERE user_id IN (:a, :b)"), {"a": heavy, "b": light})
+        db.execute(text("DELETE FROM users WHERE id IN (:a, :b)"), {"a": heavy, "b": light})
+        db.commit()
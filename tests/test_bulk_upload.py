@@ -0,0 +1,57 @@
+"""
+/notes/bulk reports files that produced no notes instead of dropping them.
+"""
+
+import asyncio
+import io
+
+from starlette.datastructures import Headers, UploadFile
+
+from recallai_backend.api.v1.bulk_controller import upload_bulk_notes
+from recallai_backend.contracts.note_dtos import NoteResponseDTO
+
+
+class FakeNoteService:
+    def ingest_document(self, user_id, filename, pieces, source):
+        content = "".join(pieces)
+        return [NoteResponseDTO(id=1, user_id=user_id, title=filename, content=content, source=source)]
+
+    def create_notes(self, dtos):
+        return []
+
+
+class FakeExtractionCache:
+    def lookup(self, keys):
+        return {}
+
+    def store(self, key, pieces):
+        return pieces
+
+    async def ocr_many(self, images):
+        return [None for _ in images]
+
+
+class FakeContainer:
+    def notes(self):
+        return FakeNoteService()
+
+    def extraction_cache(self):
+        return FakeExtractionCache()
+
+
+def _upload(filename, data, mime):
+    return UploadFile(io.BytesIO(data), filename=filename, headers=Headers({"content-type": mime}))
+
+
+def test_failed_files_are_reported():
+    files = [
+        _upload("ok.txt", b"plain text note", "text/plain"),
+        _upload("broken.pdf", b"not a pdf", "application/pdf"),
+        _upload("blank.png", b"\x89PNG", "image/png"),
+    ]
+
+    response = asyncio.run(upload_bulk_notes(user_id=1, files=files, c=FakeContainer()))
+
+    assert [n.title for n in response.notes] == ["ok.txt"]
+    assert [e.filename for e in response.errors] == ["broken.pdf", "blank.png"]
+    assert all(e.error for e in response.errors)
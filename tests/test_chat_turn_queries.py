@@ -0,0 +1,141 @@
+"""
+Query count of one ChatService.ask() turn (needs Postgres + pgvector at
+DATABASE_URL with the migrations applied; skipped otherwise).
+
+OpenAI is replaced by deterministic in-process fakes, so only the
+database work is counted. The measured turn is a follow-up in an
+existing conversation whose prompt embedding is already in the
+in-process cache, with one note and some past messages to find:
+
+    conversation  SELECT conversation, SELECT unsummarized tail      2
+    retrieval     set_config + note search, note load                3
+                  set_config + message ANN, message load             3
+    write         INSERT user + assistant ... RETURNING              1
+                                                                   ---
+                                                                     9
+
+The set_config round trips widen the HNSW scan on the user's shared
+bucket (embedding.widen_bucket_scan). On failure every statement is
+listed.
+"""
+
+import asyncio
+import base64
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+from sqlalchemy import event, text
+
+from conftest import create_user
+from recallai_backend.core.config import settings
+from recallai_backend.core.db import async_engine
+from recallai_backend.business.services import chat_service, embedding_service
+from recallai_backend.business.services.chat_service import ChatService
+from recallai_backend.business.services.message_embedding_worker import get_message_embedding_worker
+from recallai_backend.contracts.chat_dtos import ChatRequestDTO
+from recallai_backend.domain.domain_installer import DomainInstaller
+from recallai_backend.domain.repositories.note_repository import NoteRepository
+
+EXPECTED_STATEMENTS = 9
+
+DIM = 1536
+
+
+# ─────────────────────────────────────────────
+# OpenAI fakes (no network, fixed outputs)
+# ─────────────────────────────────────────────
+def _embedding_response(inputs: List[str]):
+    rng = np.random.default_rng(len(inputs))
+    data = [
+        SimpleNamespace(
+            index=i,
+            embedding=base64.b64encode(rng.standard_normal(DIM).astype("<f4").tobytes()).decode(),
+        )
+        for i in range(len(inputs))
+    ]
+    return SimpleNamespace(data=data)
+
+
+async def _acreate_embedding(*, model, input, encoding_format):
+    return _embedding_response(input)
+
+
+def _create_embedding(*, model, input, encoding_format):
+    return _embedding_response(input)
+
+
+async def _acreate_completion(*, model, messages, **kwargs):
+    message = SimpleNamespace(content="test answer")
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _install_fakes(monkeypatch) -> None:
+    monkeypatch.setattr(chat_service, "async_client", SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=_acreate_completion))
+    ))
+    monkeypatch.setattr(embedding_service, "async_client", SimpleNamespace(
+        embeddings=SimpleNamespace(create=_acreate_embedding)
+    ))
+    monkeypatch.setattr(embedding_service, "client", SimpleNamespace(
+        embeddings=SimpleNamespace(create=_create_embedding)
+    ))
+
+
+async def _measure(service: ChatService, user_id: int) -> List[str]:
+    prompt = "what did I write down?"
+
+    # Warm-up turn: creates the conversation and caches the prompt vector
+    first = await service.ask(ChatRequestDTO(user_id=user_id, prompt=prompt))
+
+    # Give long-term memory something to find
+    get_message_embedding_worker().embed([first.message_id])
+
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await service.ask(
+            ChatRequestDTO(user_id=user_id, conversation_id=first.conversation_id, prompt=prompt)
+        )
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    return statements
+
+
+def test_chat_turn_statement_count(db, monkeypatch):
+    # The configuration the expected count is written for
+    monkeypatch.setattr(settings, "vector_search_backend", "pgvector")
+    monkeypatch.setattr(settings, "chat_memory_top_k", max(settings.chat_memory_top_k, 1))
+    _install_fakes(monkeypatch)
+
+    user_id = db.execute(text("SELECT coalesce(max(id), 0) + 1000 FROM users")).scalar_one()
+    try:
+        create_user(db, user_id)
+        repo = NoteRepository(db)
+        note = repo.create_note(user_id, "test", "a note to retrieve", "test")
+        repo.save_embedding(note.id, np.ones(DIM, dtype=np.float32))
+        db.commit()
+
+        domain = DomainInstaller(db)
+        chat = ChatService(
+            db=db,
+            conv_repo=domain.get_conversation_repository(),
+            note_repo=domain.get_note_repository(),
+            embedding_service=domain.get_embedding_service(),
+            async_domain=domain.get_async_domain(),
+        )
+        statements = asyncio.run(_measure(chat, user_id))
+
+        listing = "\n".join(f"{i:2d}. {s[:160]}" for i, s in enumerate(statements, 1))
+        assert len(statements) == EXPECTED_STATEMENTS, listing
+    finally:
+        db.rollback()
+        db.execute(text("DELETE FROM conversations WHERE user_id = :u"), {"u": user_id})
+        db.execute(text("DELETE FROM notes WHERE user_id = :u"), {"u": user_id})
+        db.execute(text("DELETE FROM users WHERE id = :u"), {"u": user_id})
+        db.commit()
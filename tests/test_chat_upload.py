@@ -0,0 +1,74 @@
+"""
+ChatService.handle_file_upload keeps the event loop free while it works.
+"""
+
+import asyncio
+import io
+import threading
+import time
+import types
+
+from starlette.datastructures import Headers, UploadFile
+
+from recallai_backend.business.services import chat_service
+from recallai_backend.business.services.chat_service import ChatService
+
+
+class FakeSession:
+    def __init__(self):
+        self.commit_threads = []
+
+    def commit(self):
+        self.commit_threads.append(threading.get_ident())
+
+
+class FakeConversationRepository:
+    def add_messages(self, conv_id, messages):
+        time.sleep(0.05)
+        return [types.SimpleNamespace(id=i) for i, _ in enumerate(messages, 1)]
+
+
+def test_upload_does_not_block_the_event_loop(monkeypatch):
+    def slow_extract(source, filename, max_chars, cache):
+        time.sleep(0.2)
+        return "extracted"
+
+    async def complete(*, model, messages):
+        await asyncio.sleep(0.05)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=types.SimpleNamespace(content="ok"))])
+
+    monkeypatch.setattr(chat_service, "extract_text_gpt", slow_extract)
+    monkeypatch.setattr(chat_service, "async_client", types.SimpleNamespace(
+        chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=complete))
+    ))
+    db = FakeSession()
+    service = ChatService(
+        db=db,
+        conv_repo=FakeConversationRepository(),
+        note_repo=object(),
+        embedding_service=object(),
+        async_domain=object(),
+        file_repo=object(),
+    )
+    upload = UploadFile(io.BytesIO(b"notes"), filename="notes.txt", headers=Headers({"content-type": "text/plain"}))
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beat = asyncio.create_task(ticker())
+        response = await service.handle_file_upload(1, "summarize", [upload])
+        beat.cancel()
+        return response, ticks
+
+    response, ticks = asyncio.run(run())
+
+    assert response.answer == "ok" and response.message_id == 2
+    # The loop kept running through the 0.3s of blocking work
+    assert ticks >= 15
+    assert db.commit_threads and threading.get_ident() not in db.commit_threads
@@ -0,0 +1,94 @@
+"""
+Streaming text cleanup and token-sized chunking (business/services/chunker.py).
+"""
+
+import pytest
+
+from recallai_backend.business.services.chunker import (
+    iter_chunks,
+    iter_clean_lines,
+    iter_note_chunks,
+    locate_chunks,
+)
+from recallai_backend.business.services.ingestion_service import clean_text
+
+
+@pytest.mark.parametrize("raw, cleaned", [
+    ("a\r\nb\rc", "a\nb\nc"),
+    ("  a  \n\n\n\nb  ", "a\n\nb"),
+    # Whitespace-only lines are blank lines, so the whole run collapses
+    # (the pre-streaming clean_text kept them: "a\n\n\nb")
+    ("a\n  \n  \nb", "a\n\nb"),
+    ("\n \n\ta\n \n", "a"),
+    ("", ""),
+])
+def test_clean_text(raw, cleaned):
+    assert clean_text(raw) == cleaned
+
+
+def test_lines_and_crlf_may_span_pieces():
+    assert list(iter_clean_lines(["a\r", "\n  \n", "  \nb", "c  \n\n"])) == ["a", "", "bc"]
+
+
+# ─────────────────────────────────────────────
+# Chunking (word_tokens: one token per word)
+# ─────────────────────────────────────────────
+INTRO = "Intro sentence one. Intro sentence two."
+BODY = "Body one is here. Body two is here. Body three is here."
+
+
+def _tokens(text):
+    return len(text.split())
+
+
+def test_chunks_stay_within_the_token_bound(word_tokens):
+    text = f"{INTRO}\n\n{BODY}\n\n" + "word " * 25
+
+    chunks = list(iter_chunks([text], max_tokens=8))
+
+    assert chunks and all(_tokens(c) <= 8 for c in chunks)
+    # Nothing dropped: only whitespace differs from the input
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_oversized_sentence_is_cut_at_token_boundaries(word_tokens):
+    ten, five = " ".join(["word"] * 10), " ".join(["word"] * 5)
+    assert list(iter_chunks(["word " * 25], max_tokens=10)) == [ten, ten, five]
+
+
+def test_paragraph_boundaries_win_over_sentences(word_tokens):
+    text = "a b c.\n\nd e f.\n\ng h i."
+    assert list(iter_chunks([text], max_tokens=7)) == ["a b c.\n\nd e f.", "g h i."]
+
+
+def test_heading_starts_a_new_chunk(word_tokens):
+    text = f"{INTRO}\n\n# Heading\n\nBody one is here."
+    # All of it would fit in one chunk
+    assert list(iter_chunks([text], max_tokens=20)) == [INTRO, "# Heading\n\nBody one is here."]
+
+
+def test_overlap_repeats_trailing_sentences(word_tokens):
+    chunks = list(iter_chunks([BODY], max_tokens=10, overlap_tokens=4))
+
+    assert chunks == [
+        "Body one is here. Body two is here.",
+        "Body two is here. Body three is here.",
+    ]
+
+
+def test_overlap_is_not_carried_across_a_heading(word_tokens):
+    text = f"{INTRO}\n\n# Heading\n\n{BODY}"
+    chunks = list(iter_chunks([text], max_tokens=10, overlap_tokens=4))
+
+    assert chunks[1].startswith("# Heading")
+
+
+def test_located_spans_round_trip_to_the_source(word_tokens):
+    text = "First para  here.\n\n\n  Second   para\r\nline two.\n\nThird.  "
+    chunks = list(iter_note_chunks([text], max_tokens=4))
+    spans = locate_chunks(text, chunks)
+
+    assert len(chunks) > 1 and None not in spans
+    for chunk, (start, end) in zip(chunks, spans):
+        assert text[start:end].split() == chunk.split()
+    assert [start for start, _ in spans] == sorted(start for start, _ in spans)
@@ -0,0 +1,104 @@
+"""
+ConversationSummarizer.update against an in-memory conversation repository.
+"""
+
+import asyncio
+import contextlib
+import types
+
+from recallai_backend.business.services.conversation_summarizer import ConversationSummarizer
+from recallai_backend.core.config import settings
+
+
+class FakeConversationRepository:
+    def __init__(self, message_ids):
+        self.conv = types.SimpleNamespace(summary=None, summary_message_id=None)
+        self.messages = [types.SimpleNamespace(id=i, role="user", content=f"m{i}") for i in message_ids]
+
+    async def claim_for_summary(self, conv_id):
+        return self.conv
+
+    async def get_messages_after(self, conv_id, after_id, limit, oldest_first=False):
+        rows = [m for m in self.messages if after_id is None or m.id > after_id]
+        return rows[:limit] if oldest_first else rows[-limit:]
+
+    async def update_summary(self, conv_id, summary, through_message_id, previous_message_id):
+        if self.conv.summary_message_id != previous_message_id:
+            return False
+        self.conv.summary, self.conv.summary_message_id = summary, through_message_id
+        return True
+
+
+class FakeSession:
+    async def commit(self):
+        pass
+
+
+class FakeDomain:
+    def __init__(self, repo):
+        self.repo = repo
+
+    @contextlib.asynccontextmanager
+    async def new_session(self):
+        yield FakeSession()
+
+    def get_conversation_repository(self, db):
+        return self.repo
+
+
+def _summarizer(repo, folded):
+    summarizer = ConversationSummarizer(FakeDomain(repo), model="test")
+
+    async def summarize(previous, messages):
+        folded.append([m.id for m in messages])
+        return f"through {messages[-1].id}"
+
+    summarizer._summarize = summarize
+    return summarizer
+
+
+def test_long_backlog_is_folded_oldest_first(monkeypatch):
+    monkeypatch.setattr(settings, "chat_history_fetch_limit", 10)
+    monkeypatch.setattr(settings, "chat_summary_keep_recent", 4)
+    repo = FakeConversationRepository(range(1, 36))
+    folded = []
+
+    assert asyncio.run(_summarizer(repo, folded).update(1))
+
+    assert folded == [list(range(1, 11)), list(range(11, 21)), list(range(21, 31)), [31]]
+    assert repo.conv.summary_message_id == 31
+
+
+def test_short_tail_is_left_alone(monkeypatch):
+    monkeypatch.setattr(settings, "chat_summary_keep_recent", 8)
+    repo = FakeConversationRepository(range(1, 9))
+    folded = []
+
+    assert not asyncio.run(_summarizer(repo, folded).update(1))
+    assert folded == []
+
+
+def test_finish_bounds_the_update(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "chat_summary_trigger_messages", 2)
+    monkeypatch.setattr(settings, "chat_summary_grace_seconds", 0.05)
+    summarizer = ConversationSummarizer(FakeDomain(FakeConversationRepository([])), model="test")
+    cancelled = asyncio.Event()
+
+    async def hang(conversation_id):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    summarizer.update = hang
+
+    async def turn():
+        assert summarizer.start(1, 2) is None
+        task = summarizer.start(1, 3)
+        await summarizer.finish(task)
+        return task
+
+    task = asyncio.run(turn())
+    assert task.cancelled() and cancelled.is_set()
+    assert "cancelled (conversation 1 summary)" in caplog.text
@@ -0,0 +1,26 @@
+"""
+Recycling the extraction pool when a job hangs.
+"""
+
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from recallai_backend.utils import extraction_pool
+
+
+def test_recycle_kills_hung_workers(monkeypatch):
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn"))
+    monkeypatch.setattr(extraction_pool, "_pool", pool)
+
+    hung = pool.submit(time.sleep, 60)
+    while not hung.running():
+        time.sleep(0.01)
+    processes = list(pool._processes.values())
+
+    extraction_pool._recycle_pool(pool)
+
+    for process in processes:
+        process.join(5)
+        assert not process.is_alive()
+    assert extraction_pool._pool is None
@@ -0,0 +1,71 @@
+"""
+HnswIndexRegistry partition builds: single-flight, and writes made while
+a build is running.
+"""
+
+import threading
+
+import numpy as np
+
+from recallai_backend.domain.vector_index.hnsw_index import HnswIndexRegistry, chunk_label
+
+DIM = 8
+
+
+def _vector(seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).random(DIM, dtype=np.float32)
+
+
+class BlockingLoader:
+    """Returns notes 1-3; the first call waits until `release` is set."""
+
+    def __init__(self):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, user_id):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        labels = [chunk_label(n, 0) for n in (1, 2, 3)]
+        return labels, np.stack([_vector(n) for n in (1, 2, 3)])
+
+
+def _start(target, *args):
+    thread = threading.Thread(target=target, args=args)
+    thread.start()
+    return thread
+
+
+def test_concurrent_callers_share_one_build():
+    registry = HnswIndexRegistry(dim=DIM, max_age_seconds=0)
+    loader = BlockingLoader()
+    results = []
+
+    threads = [_start(lambda: results.append(registry.get_or_build(7, loader))) for _ in range(4)]
+    loader.started.wait(5)
+    loader.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert loader.calls == 1
+    assert len(results) == 4 and all(p is results[0] for p in results)
+
+
+def test_writes_during_a_build_are_replayed():
+    registry = HnswIndexRegistry(dim=DIM, max_age_seconds=0)
+    loader = BlockingLoader()
+
+    thread = _start(registry.get_or_build, 7, loader)
+    loader.started.wait(5)
+    # Committed after the loader's snapshot was taken
+    registry.upsert(7, chunk_label(4, 0), _vector(4))
+    registry.remove(7, [chunk_label(2, 0)])
+    loader.release.set()
+    thread.join(5)
+
+    partition = registry.cached(7)
+    assert len(partition) == 3
+    assert partition.search(_vector(4), 1) == [4]
+    assert 2 not in partition.search(_vector(2), 3)
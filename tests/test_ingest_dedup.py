@@ -0,0 +1,64 @@
+"""
+Near-duplicate handling in ingestion_service.iter_ingest.
+"""
+
+import types
+
+import numpy as np
+
+from recallai_backend.business.services.ingestion_service import iter_ingest
+from recallai_backend.core.config import Settings, settings
+
+
+class FakeEmbeddingService:
+    def embed_many(self, texts):
+        return [np.ones(4, dtype=np.float32) for _ in texts]
+
+
+class FakeNoteRepository:
+    def __init__(self):
+        self.notes = []
+
+    def find_simhash_candidates(self, user_id, signatures):
+        return [(i, n.simhash) for i, n in enumerate(self.notes, 1) if n.simhash in signatures]
+
+    def bulk_create_with_embeddings(self, user_id, notes):
+        start = len(self.notes) + 1
+        self.notes.extend(notes)
+        return list(range(start, start + len(notes)))
+
+
+def _ingest(text, mode):
+    repo = FakeNoteRepository()
+    batches = list(iter_ingest(
+        embedding_service=FakeEmbeddingService(),
+        note_repo=repo,
+        user_id=1,
+        source_filename="doc.txt",
+        pieces=[text],
+        dedup_mode=mode,
+    ))
+    return repo, sum(b.duplicates for b in batches)
+
+
+def test_default_mode_keeps_duplicates_linked():
+    # "skip" loses the text for good once the note it matched is deleted
+    assert Settings.model_fields["ingest_dedup_mode"].default == "link"
+
+
+def test_wordless_chunks_are_not_deduplicated(monkeypatch, word_tokens):
+    monkeypatch.setattr(settings, "chunk_max_tokens", 2)
+    repo, duplicates = _ingest("---\n\n***\n\n===\n\n---", "skip")
+
+    assert duplicates == 0
+    assert [n.content for n in repo.notes] == ["---", "***", "===", "---"]
+    assert all(n.simhash == 0 and n.vector is not None for n in repo.notes)
+
+
+def test_repeated_chunk_is_linked(monkeypatch, word_tokens):
+    monkeypatch.setattr(settings, "chunk_max_tokens", 8)
+    text = "the quick brown fox jumps over it\n\nthe quick brown fox jumps over it"
+    repo, duplicates = _ingest(text, "link")
+
+    assert duplicates == 1
+    assert [(n.vector is None, n.duplicate_of) for n in repo.notes] == [(False, None), (True, 1)]
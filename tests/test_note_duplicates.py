@@ -0,0 +1,49 @@
+"""
+Deleting a note that "link"-mode duplicates point at (needs Postgres +
+pgvector at DATABASE_URL with the migrations applied; skipped otherwise).
+"""
+
+import numpy as np
+from sqlalchemy import text
+
+from conftest import create_user
+from recallai_backend.business.services.note_service import NoteService
+from recallai_backend.domain.models.note import NewNote, Note
+from recallai_backend.domain.repositories.note_repository import NoteRepository
+
+DIM = 1536
+
+
+class FakeEmbeddingService:
+    def embed_many(self, texts):
+        return [np.ones(DIM, dtype=np.float32) for _ in texts]
+
+
+def test_deleting_canonical_note_promotes_first_duplicate(db):
+    user_id = db.execute(text("SELECT coalesce(max(id), 0) + 1000 FROM users")).scalar_one()
+
+    try:
+        create_user(db, user_id)
+        repo = NoteRepository(db)
+        [canonical] = repo.bulk_create_with_embeddings(
+            user_id, [NewNote("c", "same text", "test", np.ones(DIM, dtype=np.float32))]
+        )
+        first, second = repo.bulk_create_with_embeddings(user_id, [
+            NewNote("d1", "same text.", "test", None, duplicate_of=canonical),
+            NewNote("d2", "same text!", "test", None, duplicate_of=canonical),
+        ])
+        db.commit()
+
+        service = NoteService(db=db, embedding_service=FakeEmbeddingService(), note_repo=repo)
+        assert service.delete_note(canonical)
+
+        db.expire_all()
+        assert db.get(Note, first).duplicate_of is None
+        assert db.get(Note, second).duplicate_of == first
+        assert repo.get_chunks([first])[first]
+        assert [h.note.id for h in repo.search_chunks(np.ones(DIM), 5, user_id=user_id)] == [first]
+    finally:
+        db.rollback()
+        db.execute(text("DELETE FROM notes WHERE user_id = :u"), {"u": user_id})
+        db.execute(text("DELETE FROM users WHERE id = :u"), {"u": user_id})
+        db.commit()